@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+En İyi Motor Seçimli (auto) PDF Sıkıştırma
+Ghostscript (görsel ağırlıklı taramalarda) ve QPDF (metin ağırlıklı vektör
+belgelerde) farklı belgelerde öne çıkar. Bu betik iki motoru ortak bir süre
+bütçesiyle eşzamanlı çalıştırır, net bir kazanan belli olduğunda kaybedeni
+durdurur ve geçerli en küçük çıktıyı hangi motorun ürettiği bilgisiyle döndürür.
+Diğer sıkıştırma betikleri gibi ön analiz iki motorun da işe yaramayacağını
+gösterirse yarış atlanır; kazananın çıktısı küçülmediyse orijinal döndürülür.
+
+Kullanım: python3 auto_compressor.py <base64_data> <compression_level> [--time-budget SANİYE]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+import metrics
+import tool_scheduler
+from transport import Transport, ArgumentParser
+from pdf_analyzer import preflight, annotate
+from pdf_compressor import build_gs_command, pdfsettings_for_level
+from qpdf_compressor import build_qpdf_command
+
+# Varsayılan ortak süre bütçesi (saniye)
+DEFAULT_TIME_BUDGET = 120.0
+
+# Biten bir motorun çıktısı orijinalin bu oranının altındaysa diğeri beklenmez
+CLEAR_WIN_RATIO = 0.5
+
+# Süreçlerin durumunu kontrol etme aralığı (saniye)
+POLL_INTERVAL = 0.05
+
+
+def is_valid_pdf(path):
+    """
+    Çıktının eksiksiz bir PDF gibi görünüp görünmediğini hızlıca kontrol eder
+    (başlık ve dosya sonu işareti)
+    """
+    try:
+        size = os.path.getsize(path)
+        if size < 16:
+            return False
+        with open(path, "rb") as f:
+            if not f.read(5) == b"%PDF-":
+                return False
+            f.seek(max(0, size - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+class EngineRun:
+    """Yarışta çalışan tek bir motor süreci"""
+
+    def __init__(self, name, command, output_path, work_dir, slot):
+        self.name = name
+        self.output_path = output_path
+        self.stderr_file = tempfile.TemporaryFile(dir=work_dir)
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.status = "running"
+        self.size = None
+        self.error = None
+        self.process = slot.popen(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=self.stderr_file
+        )
+
+    def poll(self):
+        """Süreç bittiyse durumu günceller; bittiyse True döndürür"""
+        if self.status != "running":
+            return True
+        returncode = self.process.poll()
+        if returncode is None:
+            return False
+
+        self.elapsed = time.perf_counter() - self.started
+        if returncode == 0 and is_valid_pdf(self.output_path):
+            self.status = "finished"
+            self.size = os.path.getsize(self.output_path)
+        else:
+            self.status = "failed"
+            self.stderr_file.seek(0)
+            message = self.stderr_file.read().decode("utf-8", "replace").strip()
+            self.error = message or f"çıkış kodu {returncode}"
+        return True
+
+    def partial_size(self):
+        """Çalışan motorun o ana kadar yazdığı çıktı boyutu"""
+        try:
+            return os.path.getsize(self.output_path)
+        except OSError:
+            return 0
+
+    def cancel(self):
+        """Çalışan süreci durdurur"""
+        if self.status == "running":
+            self.process.kill()
+            self.process.wait()
+            self.elapsed = time.perf_counter() - self.started
+            self.status = "cancelled"
+
+    def close(self):
+        self.cancel()
+        self.stderr_file.close()
+
+    def summary(self):
+        info = {"status": self.status}
+        if self.elapsed is not None:
+            info["elapsed_ms"] = round(self.elapsed * 1000, 2)
+        if self.size is not None:
+            info["size"] = self.size
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+def compress_pdf_auto(input_path, output_path, compression_level="medium", time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Ghostscript ve QPDF'i yarıştırarak PDF'i sıkıştırır
+
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        time_budget: İki motor için ortak süre bütçesi (saniye)
+
+    Returns:
+        Kazanan motor, boyut bilgileri ve motor bazında durum özeti
+    """
+    original_size = os.path.getsize(input_path)
+    # Motor seçimi yarışa bırakılır; ön analizden yalnızca atlama kararı kullanılır
+    plan, preflight_info = preflight("ghostscript", compression_level, pdf_path=input_path)
+    if plan and plan["engine"] is None:
+        shutil.copyfile(input_path, output_path)
+        result = {"original_size": original_size, "compressed_size": original_size}
+        return annotate(result, preflight_info, None, True)
+
+    # İki motor aynı anda çalıştığından zamanlayıcıdan ikisi için birlikte yer alınır
+    with tool_scheduler.admit("race", original_size) as slot, metrics.stage("race"):
+        result = _race(input_path, output_path, compression_level, time_budget, original_size, slot)
+    result["scheduler"] = slot.info()
+
+    # Kazanan da küçültemediyse orijinal döndürülür
+    original_returned = result["compressed_size"] >= original_size
+    if original_returned:
+        shutil.copyfile(input_path, output_path)
+        result["compressed_size"] = original_size
+    return annotate(result, preflight_info, result["engine"], original_returned)
+
+
+def _race(input_path, output_path, compression_level, time_budget, original_size, slot):
+    work_dir = tempfile.mkdtemp()
+    runs = []
+
+    try:
+        gs_output = os.path.join(work_dir, "ghostscript.pdf")
+        qpdf_output = os.path.join(work_dir, "qpdf.pdf")
+        runs.append(EngineRun(
+            "ghostscript",
+            build_gs_command(input_path, gs_output, pdfsettings_for_level(compression_level)),
+            gs_output, work_dir, slot
+        ))
+        runs.append(EngineRun(
+            "qpdf",
+            build_qpdf_command(input_path, qpdf_output, compression_level),
+            qpdf_output, work_dir, slot
+        ))
+
+        deadline = time.perf_counter() + min(time_budget, slot.timeout)
+        best = None
+
+        while True:
+            for run in runs:
+                if run.poll() and run.status == "finished":
+                    if best is None or run.size < best.size:
+                        best = run
+
+            running = [run for run in runs if run.status == "running"]
+            if not running:
+                break
+
+            if best is not None:
+                # Yeterince küçük bir sonuç varsa diğer motoru bekleme
+                if best.size <= original_size * CLEAR_WIN_RATIO:
+                    break
+                # Çalışan motor şimdiden daha büyük çıktı yazdıysa kazanamaz
+                for run in running:
+                    if run.partial_size() >= best.size:
+                        run.cancel()
+                if all(run.status != "running" for run in runs):
+                    break
+
+            if time.perf_counter() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+
+        for run in runs:
+            run.cancel()
+
+        if best is None:
+            errors = "; ".join(f"{run.name}: {run.error or run.status}" for run in runs)
+            raise RuntimeError(f"Hiçbir motor geçerli çıktı üretmedi ({errors})")
+
+        best.status = "winner"
+        shutil.move(best.output_path, output_path)
+
+        return {
+            "original_size": original_size,
+            "compressed_size": os.path.getsize(output_path),
+            "engine": best.name,
+            "engines": {run.name: run.summary() for run in runs}
+        }
+
+    finally:
+        for run in runs:
+            run.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """
+    Komut satırından çağrıldığında çalışır.
+
+    Base64 yerine --stdin veya --input <yol> ile ham PDF, --output <yol> veya
+    --binary-stdout ile ham çıktı kullanılabilir (bkz. transport.py).
+    """
+    transport = None
+    temp_dir = tempfile.mkdtemp()
+    try:
+        transport = Transport()
+        parser = ArgumentParser(description="Ghostscript ve QPDF'i yarıştırarak PDF sıkıştırma")
+        parser.add_argument("compression_level", nargs="?", default="medium")
+        parser.add_argument("--time-budget", type=float, default=DEFAULT_TIME_BUDGET)
+        args = parser.parse_args(transport.args)
+
+        if not transport.has_input:
+            raise ValueError("PDF içeriği verilmedi")
+
+        # Girdi zaten diskteyse doğrudan kullan, değilse geçici dosyaya yaz
+        if transport.input_path:
+            input_path = transport.input_path
+        else:
+            input_path = os.path.join(temp_dir, "input.pdf")
+            transport.write_input_file(input_path)
+
+        output_path = transport.output_path or os.path.join(temp_dir, "output.pdf")
+
+        with metrics.stage("compress"):
+            result = compress_pdf_auto(input_path, output_path, args.compression_level, args.time_budget)
+        transport.emit_file(result, output_path, "compressed_pdf")
+
+    except Exception as e:
+        error_result = {"error": str(e)}
+        if transport is not None:
+            transport.emit(error_result)
+        else:
+            print(json.dumps(error_result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
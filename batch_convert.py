@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Toplu Belge Dönüştürme
+Bir klasör dolusu belgeyi her dosya için ayrı bir Python süreci başlatmadan,
+çekirdek sayısı kadar işçiden oluşan bir süreç havuzunda `convert_to_pdf` ile
+dönüştürür. Sonuç tek bir ZIP arşivi (her belge ayrı PDF) veya tüm belgelerin
+sırasıyla birleştirildiği tek bir PDF olarak döner. Hatalı bir dosya diğerlerinin
+dönüştürülmesini engellemez; her dosyanın durumu ve süresi manifestoda raporlanır.
+
+Manifesto formatı (JSON):
+    {"format": "zip", "files": [
+        {"id": "1", "input_path": "/yol/a.docx", "mime_type": "...", "file_name": "a.docx"},
+        {"id": "2", "data": "<base64>", "mime_type": "text/plain", "file_name": "b.txt"}
+    ]}
+    "files" listesi doğrudan kök eleman olarak da verilebilir. "mime_type"
+    verilmezse dosya adından tahmin edilir.
+
+Kullanım: python3 batch_convert.py <base64_manifest> [--format zip|pdf] [--workers N]
+    Manifesto --stdin veya --input <yol> ile, sonuç --output <yol> veya
+    --binary-stdout ile de aktarılabilir (bkz. transport.py).
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import zipfile
+import tempfile
+import mimetypes
+import contextlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+import doc_converter_all
+from transport import Transport, ArgumentParser
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+OUTPUT_FORMATS = ("zip", "pdf")
+
+# Uzun süre çalışan işçilerin bellek kullanımını sınırlar; havuz her
+# işçi sayısı x MAX_JOBS_PER_WORKER işte bir yeniden kurulur
+MAX_JOBS_PER_WORKER = 50
+
+WORKER_DIED_ERROR = "İşçi süreç beklenmedik şekilde sonlandı"
+
+
+def _init_worker():
+    """Dönüştürücülerin tanılama çıktıları sonuç akışını bozmasın"""
+    sys.stdout = sys.stderr
+
+
+def _guess_mime_type(file_name):
+    mime_type, _ = mimetypes.guess_type(file_name)
+    return mime_type or "application/octet-stream"
+
+
+def load_manifest(raw):
+    """
+    Manifesto içeriğini çözümler ve dosya girdilerini doğrular
+
+    Args:
+        raw (bytes): JSON manifesto
+
+    Returns:
+        (dosya girdileri listesi, manifestodaki çıktı formatı veya None)
+    """
+    manifest = json.loads(raw.decode("utf-8"))
+    output_format = None
+    if isinstance(manifest, dict):
+        output_format = manifest.get("format")
+        manifest = manifest.get("files")
+    if not isinstance(manifest, list) or not manifest:
+        raise ValueError("Manifesto boş olmayan bir 'files' listesi içermeli")
+
+    entries = []
+    for index, entry in enumerate(manifest):
+        if not isinstance(entry, dict) or not (entry.get("data") or entry.get("input_path")):
+            raise ValueError(f"{index}. girdi 'data' veya 'input_path' alanı içermeli")
+        file_name = entry.get("file_name") or os.path.basename(entry.get("input_path") or f"belge_{index + 1}")
+        entries.append({
+            "id": entry.get("id", str(index + 1)),
+            "input_path": entry.get("input_path"),
+            "data": entry.get("data"),
+            "file_name": file_name,
+            "mime_type": entry.get("mime_type") or _guess_mime_type(file_name)
+        })
+    return entries, output_format
+
+
+def convert_entry(job):
+    """
+    Tek bir manifesto girdisini dönüştürür ve PDF'i çalışma dizinine yazar.
+    Hatalar yakalanır ve sonuç sözlüğünde raporlanır.
+
+    Args:
+        job: (sıra, girdi sözlüğü, PDF çıktı yolu, ölçümler eklensin mi)
+
+    Returns:
+        Dosyanın durum sözlüğü
+    """
+    index, entry, output_path, include_metrics = job
+    with metrics.request_scope("batch_convert.file", include_metrics) as collector:
+        status = _convert_entry(index, entry, output_path)
+        collector.record("ok" if status["success"] else "error")
+        return collector.attach(status)
+
+
+def _convert_entry(index, entry, output_path):
+    start = time.perf_counter()
+    status = {
+        "index": index,
+        "id": entry["id"],
+        "file_name": entry["file_name"],
+        "mime_type": entry["mime_type"]
+    }
+    try:
+        with metrics.stage("read_input"):
+            if entry.get("input_path"):
+                with open(entry["input_path"], "rb") as f:
+                    file_content = f.read()
+            else:
+                file_content = base64.b64decode(entry["data"])
+        metrics.add_bytes_in(len(file_content))
+
+        pdf_bytes, cache_info = doc_converter_all.convert_to_pdf_cached(
+            file_content, entry["mime_type"], entry["file_name"]
+        )
+        metrics.add_bytes_out(len(pdf_bytes))
+        with metrics.stage("write_output"), open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+
+        status.update({
+            "success": True,
+            "original_size": len(file_content),
+            "pdf_size": len(pdf_bytes)
+        })
+        if cache_info:
+            status["cache"] = cache_info
+    except Exception as e:
+        status.update({"success": False, "error": str(e)})
+    status["seconds"] = round(time.perf_counter() - start, 4)
+    return status
+
+
+def run_batch(entries, work_dir, workers=DEFAULT_WORKERS):
+    """
+    Girdileri süreç havuzunda dönüştürür
+
+    Args:
+        entries: load_manifest ile çözümlenmiş girdiler
+        work_dir: Ara PDF'lerin yazılacağı dizin
+        workers: En fazla paralel işçi süreç sayısı
+
+    Returns:
+        Manifesto sırasıyla (durum sözlüğü, PDF yolu) listesi
+    """
+    # Ölçüm isteği (--metrics) işçi süreçlere iş ile birlikte aktarılır
+    include_metrics = metrics.current().include
+    jobs = [
+        (index, entry, os.path.join(work_dir, f"{index:05d}.pdf"), include_metrics)
+        for index, entry in enumerate(entries)
+    ]
+
+    # Süreç havuzu içinde (ör. converter_worker işçileri) alt süreç açılamaz
+    parallel = len(jobs) > 1 and workers > 1 and not multiprocessing.current_process().daemon
+    if parallel:
+        # Arka uçları bir kez yükle; fork ile başlatılan işçiler hazır devralır
+        doc_converter_all.preload_backends()
+        statuses = _run_pool(jobs, min(workers, len(jobs)))
+    else:
+        with contextlib.redirect_stdout(sys.stderr):
+            statuses = [convert_entry(job) for job in jobs]
+
+    return [(status, job[2]) for status, job in zip(statuses, jobs)]
+
+
+def _run_pool(jobs, workers):
+    """
+    İşleri süreç havuzunda çalıştırır. Aynı anda en fazla işçi sayısı kadar iş
+    gönderilir; bir işçi çökerse (ör. bellek yetmezliği) o an çalışan işler
+    başarısız sayılır, kalanlar yeni bir havuzda devam eder.
+
+    Returns:
+        İş sırasıyla durum sözlükleri
+    """
+    statuses = [None] * len(jobs)
+    queue = deque(jobs)
+    while queue:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            running = {}
+            submitted = 0
+            broken = False
+            while queue or running:
+                while (queue and not broken and len(running) < workers
+                       and submitted < workers * MAX_JOBS_PER_WORKER):
+                    job = queue.popleft()
+                    running[executor.submit(convert_entry, job)] = job
+                    submitted += 1
+                if not running:
+                    # İş sınırı doldu veya havuz çöktü: kalanlar yeni havuzda
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, entry = running.pop(future)[:2]
+                    try:
+                        statuses[index] = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        statuses[index] = _failed_status(index, entry, WORKER_DIED_ERROR)
+                    except Exception as e:
+                        statuses[index] = _failed_status(index, entry, str(e))
+    return statuses
+
+
+def _failed_status(index, entry, error):
+    """İşçide üretilemeyen durum sözlüğünün yerine geçer"""
+    return {
+        "index": index,
+        "id": entry["id"],
+        "file_name": entry["file_name"],
+        "mime_type": entry["mime_type"],
+        "success": False,
+        "error": error
+    }
+
+
+def _unique_pdf_name(file_name, used):
+    """Arşiv içinde çakışmayan bir PDF dosya adı üretir"""
+    base = os.path.splitext(os.path.basename(file_name))[0] or "belge"
+    name = f"{base}.pdf"
+    counter = 2
+    while name in used:
+        name = f"{base}_{counter}.pdf"
+        counter += 1
+    used.add(name)
+    return name
+
+
+def write_zip(results, output_path):
+    """
+    Başarılı dönüşümleri ve manifestoyu ZIP arşivine yazar.
+    PDF'ler zaten sıkıştırılmış olduğundan arşive sıkıştırılmadan eklenir.
+    """
+    used = set()
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for status, pdf_path in results:
+            if status["success"]:
+                status["archive_name"] = _unique_pdf_name(status["file_name"], used)
+                archive.write(pdf_path, status["archive_name"])
+        manifest = [status for status, _ in results]
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+def write_combined_pdf(results, output_path):
+    """
+    Başarılı dönüşümleri sırasıyla tek PDF'te birleştirir; her belge için
+    içindekiler tablosuna bir yer imi eklenir
+    """
+    import pymupdf
+
+    toc = []
+    with pymupdf.open() as merged:
+        for status, pdf_path in results:
+            if not status["success"]:
+                continue
+            with pymupdf.open(pdf_path) as document:
+                status["first_page"] = merged.page_count + 1
+                toc.append([1, status["file_name"], merged.page_count + 1])
+                merged.insert_pdf(document)
+        merged.set_toc(toc)
+        merged.save(output_path, garbage=1, deflate=True)
+
+
+def main():
+    """
+    Ana fonksiyon - Node.js'den çağrılacak
+
+    Çıktı: Sonuç JSON'u (dosya bazında durumları içeren "files" listesi) ve
+    seçilen formata göre ZIP arşivi veya birleştirilmiş PDF
+    """
+    transport = None
+    work_dir = tempfile.mkdtemp(prefix="batch_convert_")
+    try:
+        transport = Transport()
+        parser = ArgumentParser(description="Toplu PDF dönüştürme")
+        parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None)
+        parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+        args = parser.parse_args(transport.args)
+
+        if not transport.has_input:
+            raise ValueError("Manifesto verilmedi")
+        if args.workers < 1:
+            raise ValueError("--workers pozitif olmalı")
+
+        entries, manifest_format = load_manifest(transport.read_input_bytes())
+        output_format = args.format or manifest_format or "zip"
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Desteklenmeyen çıktı formatı: {output_format}")
+
+        start = time.perf_counter()
+        with metrics.stage("convert_files"):
+            results = run_batch(entries, work_dir, args.workers)
+
+        statuses = [status for status, _ in results]
+        succeeded = sum(1 for status in statuses if status["success"])
+        if succeeded == 0:
+            transport.emit({"success": False, "error": "Hiçbir dosya dönüştürülemedi", "files": statuses})
+            sys.exit(1)
+
+        output_path = os.path.join(work_dir, f"batch.{output_format}")
+        with metrics.stage("package"):
+            if output_format == "zip":
+                write_zip(results, output_path)
+            else:
+                write_combined_pdf(results, output_path)
+
+        result = {
+            "success": True,
+            "format": output_format,
+            "total": len(statuses),
+            "succeeded": succeeded,
+            "failed": len(statuses) - succeeded,
+            "seconds": round(time.perf_counter() - start, 4),
+            "output_size": os.path.getsize(output_path),
+            "files": statuses
+        }
+        transport.emit_file(result, output_path, "archive_base64" if output_format == "zip" else "pdf_base64")
+
+    except Exception as e:
+        error_result = {"success": False, "error": str(e)}
+        if transport is not None:
+            transport.emit(error_result)
+        else:
+            print(json.dumps(error_result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
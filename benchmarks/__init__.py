@@ -0,0 +1,8 @@
+"""
+Performans Karşılaştırmaları
+corpus: Sabit tohumlu sentetik belge derlemi
+run: Tüm dönüştürücü/sıkıştırıcıları ölçen ve temel sonuçla karşılaştıran çalıştırıcı
+
+Tekil karşılaştırma betikleri (table_layout_bench, scan_decode_bench) doğrudan
+çalıştırılabilir.
+"""
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sentetik Karşılaştırma Derlemi
+Dönüştürücüleri ve sıkıştırıcıları ölçmek için sabit tohumla (her seferinde
+aynı içerik) örnek belgeler üretir: DOCX, XLSX, çeşitli boyutlarda CSV, PPTX,
+HTML, RTF, TXT, yalnızca metin içeren ve görsel ağırlıklı PDF'ler ile tarama
+görselleri. Biçimin kütüphanesi yüklü değilse o biçim atlanır.
+
+Kullanım: python3 -m benchmarks.corpus <dizin> [--scale small|medium|large]
+"""
+
+import os
+import io
+import sys
+import json
+import random
+import argparse
+import importlib.util
+
+# Ölçeğe göre derlem parametreleri
+SCALES = {
+    "small": {
+        "paragraphs": 50, "tables": 2, "table_rows": 10, "table_cols": 4,
+        "xlsx_rows": 500, "xlsx_cols": 10, "xlsx_sheets": 2,
+        "csv_rows": (1000, 10000), "csv_cols": 8,
+        "slides": 10, "text_pages": 10,
+        "image_pages": 3, "image_size": (1600, 1200),
+        "scans": 3, "scan_size": (3000, 2250),
+    },
+    "medium": {
+        "paragraphs": 500, "tables": 10, "table_rows": 30, "table_cols": 5,
+        "xlsx_rows": 5000, "xlsx_cols": 20, "xlsx_sheets": 3,
+        "csv_rows": (10000, 100000), "csv_cols": 10,
+        "slides": 50, "text_pages": 100,
+        "image_pages": 10, "image_size": (3000, 2250),
+        "scans": 10, "scan_size": (4000, 3000),
+    },
+    "large": {
+        "paragraphs": 3000, "tables": 40, "table_rows": 50, "table_cols": 6,
+        "xlsx_rows": 50000, "xlsx_cols": 20, "xlsx_sheets": 4,
+        "csv_rows": (100000, 500000), "csv_cols": 12,
+        "slides": 200, "text_pages": 500,
+        "image_pages": 40, "image_size": (4000, 3000),
+        "scans": 40, "scan_size": (8000, 6000),
+    },
+}
+
+SEED = 20240601
+
+_WORDS = (
+    "belge dönüştürme sıkıştırma sayfa tablo görsel metin rapor fatura sözleşme "
+    "müşteri ürün sipariş tarih tutar adres açıklama özet bölüm madde ek not "
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor"
+).split()
+
+MIME_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "csv": "text/csv",
+    "html": "text/html",
+    "rtf": "application/rtf",
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+}
+
+
+def _available(module_name):
+    return importlib.util.find_spec(module_name) is not None
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng):
+    return " ".join(_sentence(rng, rng.randint(6, 16)) for _ in range(rng.randint(2, 5)))
+
+
+def _cell(rng, column):
+    if column % 3 == 0:
+        return rng.randint(0, 10 ** 6)
+    if column % 3 == 1:
+        return round(rng.uniform(0, 10000), 2)
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+
+
+def write_txt(path, params, rng):
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(params["paragraphs"]):
+            f.write(_paragraph(rng) + "\n\n")
+
+
+def write_docx(path, params, rng):
+    import docx
+
+    document = docx.Document()
+    per_table = max(1, params["paragraphs"] // max(1, params["tables"]))
+    tables = 0
+    for index in range(params["paragraphs"]):
+        if index % 20 == 0:
+            document.add_heading(_sentence(rng, 4), level=1)
+        document.add_paragraph(_paragraph(rng))
+        if index % per_table == per_table - 1 and tables < params["tables"]:
+            table = document.add_table(rows=params["table_rows"], cols=params["table_cols"])
+            for row_index, row in enumerate(table.rows):
+                for column, cell in enumerate(row.cells):
+                    cell.text = f"Sütun {column + 1}" if row_index == 0 else str(_cell(rng, column))
+            tables += 1
+    document.save(path)
+
+
+def write_xlsx(path, params, rng):
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_index in range(params["xlsx_sheets"]):
+        sheet = workbook.create_sheet(f"Sayfa {sheet_index + 1}")
+        sheet.append([f"Sütun {column + 1}" for column in range(params["xlsx_cols"])])
+        for _ in range(params["xlsx_rows"]):
+            sheet.append([_cell(rng, column) for column in range(params["xlsx_cols"])])
+    workbook.save(path)
+
+
+def write_csv(path, rows, params, rng):
+    import csv
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([f"sutun_{column + 1}" for column in range(params["csv_cols"])])
+        for _ in range(rows):
+            writer.writerow([_cell(rng, column) for column in range(params["csv_cols"])])
+
+
+def write_pptx(path, params, rng):
+    import pptx
+
+    presentation = pptx.Presentation()
+    layout = presentation.slide_layouts[1]
+    for _ in range(params["slides"]):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = _sentence(rng, 4)
+        body = slide.placeholders[1].text_frame
+        body.text = _sentence(rng)
+        for _ in range(rng.randint(2, 5)):
+            body.add_paragraph().text = _sentence(rng)
+    presentation.save(path)
+
+
+def write_html(path, params, rng):
+    parts = ["<!DOCTYPE html><html><head><meta charset='utf-8'><title>Örnek Rapor</title></head><body>"]
+    for index in range(params["paragraphs"]):
+        if index % 20 == 0:
+            parts.append(f"<h2>{_sentence(rng, 4)}</h2>")
+        parts.append(f"<p>{_paragraph(rng)}</p>")
+    parts.append("<table>")
+    for _ in range(params["table_rows"]):
+        cells = "".join(f"<td>{_cell(rng, column)}</td>" for column in range(params["table_cols"]))
+        parts.append(f"<tr>{cells}</tr>")
+    parts.append("</table></body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+
+def write_rtf(path, params, rng):
+    parts = [r"{\rtf1\ansi\deff0{\fonttbl{\f0 Helvetica;}}\f0\fs24"]
+    for _ in range(params["paragraphs"]):
+        # RTF 7 bit; Türkçe karakterler ASCII karşılıklarıyla yazılır
+        text = _paragraph(rng).encode("ascii", "replace").decode("ascii")
+        parts.append(text + r"\par")
+    parts.append("}")
+    with open(path, "w", encoding="ascii") as f:
+        f.write("\n".join(parts))
+
+
+def write_text_pdf(path, params, rng):
+    import pymupdf
+
+    with pymupdf.open() as document:
+        for _ in range(params["text_pages"]):
+            page = document.new_page()
+            text = "\n\n".join(_paragraph(rng) for _ in range(6))
+            page.insert_textbox(pymupdf.Rect(50, 50, page.rect.width - 50, page.rect.height - 50), text, fontsize=10)
+        document.save(path, garbage=1, deflate=True)
+
+
+def _noise_image(rng, size):
+    """Fotoğrafa benzer (degrade + gürültü) RGB görsel üretir"""
+    import numpy as np
+    from PIL import Image
+
+    width, height = size
+    generator = np.random.default_rng(rng.randint(0, 2 ** 31))
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    base = np.stack([200 * x * y + 30, 180 * (1 - x) * y + 40, 160 * x * (1 - y) + 50], axis=-1)
+    noise = generator.normal(0, 18, (height, width, 3)).astype(np.float32)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+
+
+def write_image_pdf(path, params, rng):
+    import pymupdf
+
+    with pymupdf.open() as document:
+        for _ in range(params["image_pages"]):
+            buffer = io.BytesIO()
+            _noise_image(rng, params["image_size"]).save(buffer, "JPEG", quality=92)
+            page = document.new_page()
+            page.insert_image(pymupdf.Rect(36, 36, page.rect.width - 36, page.rect.height / 2), stream=buffer.getvalue())
+            page.insert_textbox(pymupdf.Rect(36, page.rect.height / 2 + 20, page.rect.width - 36, page.rect.height - 36),
+                                _paragraph(rng), fontsize=10)
+        document.save(path, garbage=1, deflate=True)
+
+
+def write_scans(directory, params, rng):
+    paths = []
+    for index in range(params["scans"]):
+        path = os.path.join(directory, f"scan_{index + 1:03d}.jpg")
+        _noise_image(rng, params["scan_size"]).save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def generate_corpus(directory, scale="small"):
+    """
+    Derlemi üretir (aynı ölçek için her seferinde aynı içerik)
+
+    Args:
+        directory: Dosyaların yazılacağı dizin
+        scale: "small", "medium" veya "large"
+
+    Returns:
+        Derlem açıklaması: belge adı -> {"path", "mime_type"} ve tarama görsel yolları
+    """
+    params = SCALES[scale]
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(SEED)
+    documents = {}
+
+    def add(name, extension, writer, *args, requires=None):
+        if requires and not _available(requires):
+            print(f"{name} atlandı: {requires} yüklü değil", file=sys.stderr)
+            return
+        path = os.path.join(directory, f"{name}.{extension}")
+        writer(path, *args)
+        documents[name] = {"path": path, "mime_type": MIME_TYPES[extension]}
+
+    add("text", "txt", write_txt, params, rng)
+    add("document", "docx", write_docx, params, rng, requires="docx")
+    add("workbook", "xlsx", write_xlsx, params, rng, requires="openpyxl")
+    for rows in params["csv_rows"]:
+        add(f"table_{rows}", "csv", write_csv, rows, params, rng)
+    add("slides", "pptx", write_pptx, params, rng, requires="pptx")
+    add("page", "html", write_html, params, rng)
+    add("letter", "rtf", write_rtf, params, rng)
+    add("text_pdf", "pdf", write_text_pdf, params, rng, requires="pymupdf")
+    add("image_pdf", "pdf", write_image_pdf, params, rng, requires="pymupdf")
+
+    scans = write_scans(directory, params, rng) if _available("numpy") else []
+    return {"scale": scale, "documents": documents, "scans": scans}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik karşılaştırma derlemi üretir")
+    parser.add_argument("directory")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    args = parser.parse_args()
+    print(json.dumps(generate_corpus(args.directory, args.scale), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
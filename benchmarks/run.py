@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Karşılaştırma Çalıştırıcısı
+Sentetik derlem üzerinde tüm dönüştürücü ve sıkıştırıcı fonksiyonlarını her
+seviyede çalıştırır; her ölçüm ayrı bir süreçte yapılır ve duvar saati süresi,
+CPU süresi (alt süreçler dahil), en yüksek RSS ve çıktı boyutu JSON olarak
+kaydedilir. Kaydedilmiş bir temel sonuçla karşılaştırıp gerilemeleri raporlar.
+
+Kullanım:
+    python3 -m benchmarks.run [--scale small] [--output sonuc.json]
+        [--baseline temel.json] [--save-baseline temel.json]
+        [--repeat N] [--filter METIN] [--threshold 1.25] [--fail-on-regression]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import resource
+import tempfile
+import statistics
+import importlib
+import contextlib
+import multiprocessing
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from metrics import peak_rss_mb
+from benchmarks.corpus import SCALES, generate_corpus
+
+# Gerileme sayılması için süre farkının en az bu kadar olması gerekir (ms)
+MIN_REGRESSION_MS = 5.0
+
+DEFAULT_THRESHOLD = 1.25
+
+# Ölçülen belgeler: modül -> dönüştürebildiği derlem belgeleri
+CONVERTER_DOCUMENTS = {
+    "doc_converter_all": None,  # tüm belgeler
+    "doc_converter": ("text", "document", "workbook", "table_", "page", "letter"),
+}
+
+GS_QUALITIES = ("screen", "ebook", "printer", "prepress")
+LEVELS = ("light", "medium", "high")
+PDF_DOCUMENTS = ("text_pdf", "image_pdf")
+
+
+def _cpu_seconds():
+    """Bu sürecin ve beklenmiş alt süreçlerin (gs, qpdf) toplam CPU süresi"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def build_cases(corpus):
+    """
+    Derlem için çalıştırılacak ölçüm durumlarını oluşturur
+
+    Returns:
+        Durum sözlükleri listesi (name, module, function, kind, input, params, requires)
+    """
+    documents = corpus["documents"]
+    cases = []
+
+    for module, prefixes in CONVERTER_DOCUMENTS.items():
+        for name, document in documents.items():
+            if prefixes is not None and not name.startswith(prefixes):
+                continue
+            if module == "doc_converter" and document["mime_type"] == "application/pdf":
+                continue
+            cases.append({
+                "name": f"{module}.convert_to_pdf[{name}]",
+                "module": module, "function": "convert_to_pdf", "kind": "convert",
+                "input": document["path"], "params": [document["mime_type"], os.path.basename(document["path"])]
+            })
+
+    for name in PDF_DOCUMENTS:
+        if name not in documents:
+            continue
+        path = documents[name]["path"]
+        for quality in GS_QUALITIES:
+            cases.append({
+                "name": f"compress_pdf.compress_pdf[{name},{quality}]",
+                "module": "compress_pdf", "function": "compress_pdf", "kind": "file",
+                "input": path, "params": [quality], "requires": "gs"
+            })
+        for level in LEVELS:
+            cases.append({
+                "name": f"pdf_compressor.compress_pdf[{name},{level}]",
+                "module": "pdf_compressor", "function": "compress_pdf", "kind": "file",
+                "input": path, "params": [level], "requires": "gs"
+            })
+            cases.append({
+                "name": f"qpdf_compressor.qpdf_compress_file[{name},{level}]",
+                "module": "qpdf_compressor", "function": "qpdf_compress_file", "kind": "file",
+                "input": path, "params": [level], "requires": "qpdf"
+            })
+            cases.append({
+                "name": f"image_compressor.images_compress_file[{name},{level}]",
+                "module": "image_compressor", "function": "images_compress_file", "kind": "file",
+                "input": path, "params": [level]
+            })
+
+    if corpus["scans"]:
+        cases.append({
+            "name": "scan_to_pdf.image_to_pdf[scan_001]",
+            "module": "scan_to_pdf", "function": "image_to_pdf", "kind": "file",
+            "input": corpus["scans"][0], "params": []
+        })
+        cases.append({
+            "name": f"scan_to_pdf.images_to_pdf[{len(corpus['scans'])} scans]",
+            "module": "scan_to_pdf", "function": "images_to_pdf", "kind": "file",
+            "input": corpus["scans"], "params": []
+        })
+    return cases
+
+
+def _run_case(case, work_dir):
+    """
+    Tek bir ölçüm durumunu çalıştırır (ayrı süreçte çağrılır)
+
+    Returns:
+        Ölçüm sözlüğü
+    """
+    # Modül yükleme süresi ölçüme dahil edilmez
+    with contextlib.redirect_stdout(sys.stderr):
+        function = getattr(importlib.import_module(case["module"]), case["function"])
+    output_path = os.path.join(work_dir, f"output_{os.getpid()}.pdf")
+
+    baseline_rss = peak_rss_mb()
+    cpu_start = _cpu_seconds()
+    start = time.perf_counter()
+    try:
+        # Dönüştürücülerin tanılama çıktıları sonuç akışına karışmasın
+        with contextlib.redirect_stdout(sys.stderr):
+            if case["kind"] == "convert":
+                with open(case["input"], "rb") as f:
+                    data = f.read()
+                output_size = len(function(data, *case["params"]))
+            else:
+                result = function(case["input"], output_path, *case["params"])
+                if result is False:
+                    raise RuntimeError("fonksiyon başarısız oldu")
+                output_size = os.path.getsize(output_path)
+        status, error = "ok", None
+    except Exception as e:
+        output_size, status, error = None, "error", str(e)
+    wall = time.perf_counter() - start
+    cpu = _cpu_seconds() - cpu_start
+    peak = peak_rss_mb()
+
+    if os.path.exists(output_path):
+        os.unlink(output_path)
+
+    measurement = {
+        "status": status,
+        "wall_ms": round(wall * 1000, 2),
+        "cpu_ms": round(cpu * 1000, 2),
+        "peak_rss_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - baseline_rss, 1),
+        "output_size": output_size
+    }
+    if error:
+        measurement["error"] = error
+    return measurement
+
+
+def _case_process(connection, case, work_dir):
+    connection.send(_run_case(case, work_dir))
+    connection.close()
+
+
+def _run_in_process(case, work_dir):
+    """
+    Durumu yeni bir süreçte çalıştırır. Havuz işçileri daemon olduğundan ve
+    dönüştürücüler daemon süreçte kendi süreç havuzlarını açmadığından düz
+    Process kullanılır.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_case_process, args=(sender, case, work_dir))
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        return {"status": "error", "error": f"süreç beklenmedik şekilde sonlandı (çıkış kodu {process.exitcode})"}
+    finally:
+        process.join()
+        receiver.close()
+
+
+def run_case(case, work_dir, repeat=1):
+    """
+    Durumu her tekrar için yeni bir süreçte çalıştırır ve sonuçları özetler
+    (süreler için ortanca, bellek için en yüksek değer)
+    """
+    if case.get("requires") and not shutil.which(case["requires"]):
+        return {"status": "skipped", "error": f"{case['requires']} bulunamadı"}
+
+    runs = []
+    for _ in range(repeat):
+        runs.append(_run_in_process(case, work_dir))
+        if runs[-1]["status"] != "ok":
+            return runs[-1]
+
+    return {
+        "status": "ok",
+        "wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 2),
+        "cpu_ms": round(statistics.median(run["cpu_ms"] for run in runs), 2),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+        "rss_growth_mb": max(run["rss_growth_mb"] for run in runs),
+        "output_size": runs[-1]["output_size"],
+        "runs": len(runs)
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Sonuçları temel sonuçla karşılaştırır
+
+    Args:
+        results: Bu çalıştırmanın "results" sözlüğü
+        baseline: Temel çalıştırmanın "results" sözlüğü
+        threshold: Gerileme sayılacak oran (ör. 1.25 = %25 daha yavaş/büyük)
+
+    Returns:
+        Durum bazında oranlar ve gerileme listesi
+    """
+    cases = {}
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or current.get("status") != "ok" or previous.get("status") != "ok":
+            continue
+
+        entry = {}
+        for metric in ("wall_ms", "cpu_ms", "peak_rss_mb", "output_size"):
+            before, after = previous.get(metric), current.get(metric)
+            if before and after is not None:
+                entry[metric] = round(after / before, 3)
+        cases[name] = entry
+
+        slower = entry.get("wall_ms", 1) > threshold and current["wall_ms"] - previous["wall_ms"] >= MIN_REGRESSION_MS
+        for metric in ("wall_ms", "peak_rss_mb", "output_size"):
+            if entry.get(metric, 1) > threshold and (metric != "wall_ms" or slower):
+                regressions.append({"case": name, "metric": metric, "ratio": entry[metric]})
+
+    missing = sorted(set(baseline) - set(results))
+    return {"threshold": threshold, "cases": cases, "regressions": regressions, "missing": missing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dönüştürücü ve sıkıştırıcı karşılaştırmaları")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--corpus-dir", help="Derlem dizini (varsayılan: geçici dizin)")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak temel sonuç dosyası")
+    parser.add_argument("--save-baseline", help="Sonuçları temel olarak bu dosyaya kaydet")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--filter", help="Yalnızca adında bu metni içeren durumları çalıştır")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    # Önbellek ölçümleri bozmasın
+    os.environ["NOVAPDF_CACHE"] = "0"
+
+    temp_dir = tempfile.mkdtemp(prefix="benchmarks_")
+    try:
+        corpus_dir = args.corpus_dir or os.path.join(temp_dir, "corpus")
+        corpus = generate_corpus(corpus_dir, args.scale)
+        work_dir = os.path.join(temp_dir, "work")
+        os.makedirs(work_dir)
+
+        cases = [case for case in build_cases(corpus) if not args.filter or args.filter in case["name"]]
+        results = {}
+        for case in cases:
+            results[case["name"]] = run_case(case, work_dir, max(1, args.repeat))
+            print(f"{case['name']}: {json.dumps(results[case['name']])}", file=sys.stderr)
+
+        report = {
+            "meta": {
+                "scale": args.scale,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "corpus": {name: os.path.getsize(document["path"]) for name, document in corpus["documents"].items()}
+            },
+            "results": results
+        }
+
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+            if args.filter:
+                baseline = {name: value for name, value in baseline.items() if args.filter in name}
+            report["comparison"] = compare(results, baseline, args.threshold)
+
+        for path in (args.output, args.save_baseline):
+            if path:
+                with open(path, "w") as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+
+        print(json.dumps(report, ensure_ascii=False))
+
+        if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+            sys.exit(1)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
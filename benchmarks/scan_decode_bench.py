@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tarama Çözme Karşılaştırması
+Büyük bir JPEG taramayı eski yöntemle (tam çözme + convert + küçültme) ve
+scan_to_pdf.open_scaled ile (draft ile düşük çözünürlükte çözme) hazırlar;
+her ölçüm ayrı bir süreçte yapılır ve çözme süresi ile en yüksek RSS JSON
+olarak yazdırılır.
+
+Kullanım: python3 benchmarks/scan_decode_bench.py [--megapixels N] [--dpi N] [--image YOL]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+import scan_to_pdf
+from metrics import peak_rss_mb
+
+
+def make_scan(path, megapixels):
+    """4:3 oranında, gürültülü degrade içeren örnek bir JPEG tarama üretir"""
+    height = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    width = int(height * 4 / 3)
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 200, width, dtype=np.float32)
+    row = np.stack([gradient, gradient[::-1], np.full(width, 128, np.float32)], axis=-1)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    # Satır blokları halinde üret, üretim sırasında bellek şişmesin
+    for start in range(0, height, 512):
+        block = min(512, height - start)
+        noise = rng.normal(0, 20, (block, width, 3)).astype(np.float32)
+        image[start:start + block] = np.clip(row + noise, 0, 255)
+    Image.fromarray(image).save(path, quality=90)
+
+
+def decode_full(path, dpi):
+    """Eski yöntem: tüm bit eşlemi çöz, sonra hedef boyuta küçült"""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        target = scan_to_pdf.target_pixel_size(img.width, img.height, dpi)
+        return img.resize(target, Image.LANCZOS).size
+
+
+def decode_scaled(path, dpi):
+    """Yeni yöntem: yalnızca gereken çözünürlükte çöz"""
+    with Image.open(path) as img:
+        return scan_to_pdf.open_scaled(img, dpi).convert("RGB").size
+
+
+def _measure(args):
+    name, path, dpi = args
+    function = decode_full if name == "full" else decode_scaled
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    size = function(path, dpi)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    return {
+        "decode_ms": round(elapsed * 1000, 1),
+        "peak_rss_mb": round(peak, 1),
+        "peak_rss_growth_mb": round(peak - baseline, 1),
+        "output_size": list(size)
+    }
+
+
+def measure(name, path, dpi):
+    """Ölçümü yeni bir süreçte çalıştırır (en yüksek RSS süreç ömrü boyunca tutulur)"""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_measure, ((name, path, dpi),))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tarama çözme karşılaştırması")
+    parser.add_argument("--megapixels", type=float, default=48)
+    parser.add_argument("--dpi", type=int, default=scan_to_pdf.DEFAULT_DPI)
+    parser.add_argument("--image", help="Üretilen örnek yerine kullanılacak JPEG")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = args.image
+        if not path:
+            path = os.path.join(temp_dir, "scan.jpg")
+            make_scan(path, args.megapixels)
+
+        with Image.open(path) as img:
+            source_size = list(img.size)
+
+        before = measure("full", path, args.dpi)
+        after = measure("scaled", path, args.dpi)
+        print(json.dumps({
+            "source_size": source_size,
+            "dpi": args.dpi,
+            "before": before,
+            "after": after,
+            "decode_speedup": round(before["decode_ms"] / after["decode_ms"], 2),
+            "rss_reduction_mb": round(before["peak_rss_growth_mb"] - after["peak_rss_growth_mb"], 1)
+        }))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
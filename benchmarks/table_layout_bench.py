@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tablo Yerleşim Karşılaştırması
+Eski hücre hücre `iterrows` + `pdf.cell` döngüsü ile table_layout motorunun
+aynı tabloyu yazma hızını (satır/saniye) ölçer ve sonucu JSON olarak yazdırır.
+Her iki yol da CSV/XLSX dönüştürücüleri gibi SegmentedPDF üzerine yazar.
+
+Kullanım: python3 benchmarks/table_layout_bench.py [--rows N] [--columns N] [--repeat N]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from pdf_spool import SegmentedPDF
+from table_layout import TableRenderer, SAMPLE_ROWS, ROW_HEIGHT, PAGE_BOTTOM_MARGIN
+
+
+def make_frame(rows, columns, seed=0):
+    """Karışık uzunlukta metin ve sayılardan oluşan örnek tablo üretir"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for index in range(columns):
+        if index % 2:
+            data[f"sayi_{index}"] = rng.integers(0, 10 ** 6, rows)
+        else:
+            lengths = rng.integers(3, 25, rows)
+            data[f"metin_{index}"] = ["şçğ(x)"[: n % 6] + "a" * n for n in lengths]
+    return pd.DataFrame(data)
+
+
+def render_iterrows(frame):
+    """Eski yöntem: her hücre için str(), latin-1 dönüşümü, kısaltma ve pdf.cell"""
+    with SegmentedPDF() as document:
+        document.add_page()
+        col_width = min(40, 180 / len(frame.columns))
+
+        def write_header():
+            document.pdf.set_font("Arial", 'B', size=12)
+            for header in frame.columns:
+                document.pdf.cell(col_width, ROW_HEIGHT, str(header)[:15], border=1)
+            document.pdf.ln()
+            document.pdf.set_font("Arial", size=10)
+
+        write_header()
+        for _, row in frame.iterrows():
+            if document.pdf.get_y() + ROW_HEIGHT > document.pdf.h - PAGE_BOTTOM_MARGIN:
+                document.add_page()
+                write_header()
+            for value in row:
+                text = str(value).encode('latin-1', 'replace').decode('latin-1')
+                if len(text) > 15:
+                    text = text[:12] + "..."
+                document.pdf.cell(col_width, ROW_HEIGHT, text, border=1)
+            document.pdf.ln()
+        return document.getvalue()
+
+
+def render_vectorized(frame):
+    """table_layout motoru: sütun bazında biçimlendirme, sayfa başına tek yazım"""
+    with SegmentedPDF() as document:
+        document.add_page()
+        renderer = TableRenderer(document, list(frame.columns), frame.head(SAMPLE_ROWS))
+        renderer.write_header()
+        renderer.write_frame(frame)
+        return document.getvalue()
+
+
+def measure(function, frame, repeat):
+    """En iyi süreyi (saniye) ve çıktı boyutunu döndürür"""
+    best = None
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(function(frame))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tablo yerleşim motoru karşılaştırması")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows, args.columns)
+    results = {"rows": args.rows, "columns": args.columns}
+    for name, function in (("iterrows", render_iterrows), ("table_layout", render_vectorized)):
+        seconds, size = measure(function, frame, args.repeat)
+        results[name] = {
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(args.rows / seconds, 1),
+            "pdf_size": size
+        }
+    results["speedup"] = round(results["iterrows"]["seconds"] / results["table_layout"]["seconds"], 2)
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sıkıştırma Akışı
+compress_pdf.py, pdf_compressor.py ve qpdf_compressor.py betiklerinin ortak
+adımları: ön analiz, motor seçimi, seçilen motorun (önbellekli) çalıştırılması,
+çıktı küçülmediyse orijinalin döndürülmesi, sonucun işaretlenmesi ve yazılması.
+
+Betikler yalnızca argümanları ayrıştırır ve kendi motorlarını ve Ghostscript
+ayarlarını vererek compress_document'ı çağırır.
+"""
+
+import os
+
+# Motor modülleri bu modülü içe aktardığı için işlevleri çağrı anında
+# modül üzerinden okunur (from ... import döngüsel içe aktarmada başarısız olur)
+import pdf_compressor
+import qpdf_compressor
+from pdf_analyzer import preflight, annotate
+from result_cache import cached_file_operation, cached_bytes_operation, tool_version
+
+
+def _compress_file(engine, input_path, output_path, compression_level, pdfsettings, progress):
+    """Motoru dosyadan dosyaya çalıştırır, sonuca eklenecek bilgileri döndürür"""
+    if engine == "qpdf":
+        sizes = qpdf_compressor.qpdf_compress_file(input_path, output_path, compression_level, progress)
+        return {key: sizes[key] for key in ("qpdf_stats", "cache") if key in sizes}
+    cache_info = cached_file_operation(
+        "ghostscript", pdfsettings, tool_version("gs"), input_path, output_path,
+        lambda src, dst: pdf_compressor.ghostscript_to_file(src, dst, pdfsettings, progress)
+    )
+    return {"cache": cache_info} if cache_info else {}
+
+
+def _compress_bytes(engine, input_data, input_path, compression_level, pdfsettings, progress):
+    """Motoru bellekteki girdiyle çalıştırır; (PDF baytları, sonuca eklenecek bilgiler) döndürür"""
+    if engine == "qpdf":
+        pdf_bytes, sizes = qpdf_compressor.qpdf_compress_bytes(input_data, compression_level, input_path, progress)
+        return pdf_bytes, {key: sizes[key] for key in ("qpdf_stats", "cache") if key in sizes}
+    pdf_bytes, cache_info = cached_bytes_operation(
+        "ghostscript", pdfsettings, tool_version("gs"), input_data,
+        lambda: pdf_compressor.ghostscript_to_bytes(input_data, pdfsettings, input_path, progress)
+    )
+    return pdf_bytes, ({"cache": cache_info} if cache_info else {})
+
+
+def compress_document(transport, engine, compression_level, pdfsettings=None, extra=None):
+    """
+    Transport'tan gelen PDF'i sıkıştırır ve sonucu transport ile yazar.
+    Aynı girdi ve ayar daha önce işlendiyse sonuç önbellekten alınır. Ön analiz
+    motoru seçer veya sıkıştırmanın işe yaramayacağı belgeyi olduğu gibi döndürür.
+
+    Args:
+        transport: Girdi ve çıktıyı taşıyan Transport
+        engine: Betiğin kendi motoru ("ghostscript" veya "qpdf")
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        pdfsettings: Ghostscript ayarı (None ise pdf_compressor'ın seviye eşlemesi)
+        extra: Sonuç JSON'una eklenecek sabit alanlar
+
+    Returns:
+        dict: Yazılan sonuç
+    """
+    if pdfsettings is None:
+        pdfsettings = pdf_compressor.pdfsettings_for_level(compression_level)
+    progress = transport.progress_callback()
+
+    if transport.input_path and transport.output_path:
+        # Girdi ve çıkış zaten diskte: motor dosyadan dosyaya çalışır
+        plan, preflight_info = preflight(engine, compression_level, pdfsettings, pdf_path=transport.input_path)
+        engine = plan["engine"] if plan else engine
+        original_size = os.path.getsize(transport.input_path)
+        info = {}
+        if engine is not None:
+            info = _compress_file(engine, transport.input_path, transport.output_path,
+                                  compression_level, pdfsettings, progress)
+        # Çıktı küçülmediyse orijinal döndürülür
+        original_returned = engine is None or os.path.getsize(transport.output_path) >= original_size
+        output_path = transport.input_path if original_returned else transport.output_path
+        result = dict(original_size=original_size, compressed_size=os.path.getsize(output_path), **info)
+        annotate(result, preflight_info, engine, original_returned)
+        result.update(extra or {})
+        transport.emit_file(result, output_path, "compressed_pdf")
+        return result
+
+    # Geçici dosya yok: girdi bellekteki dosyadan, çıktı borudan veya bellekteki dosyadan
+    input_data = transport.read_input()
+    plan, preflight_info = preflight(engine, compression_level, pdfsettings,
+                                     pdf_path=transport.input_path, data=input_data)
+    engine = plan["engine"] if plan else engine
+    pdf_bytes, info = input_data, {}
+    if engine is not None:
+        pdf_bytes, info = _compress_bytes(engine, input_data, transport.input_path,
+                                          compression_level, pdfsettings, progress)
+    # Çıktı küçülmediyse orijinal döndürülür
+    original_returned = engine is None or len(pdf_bytes) >= len(input_data)
+    if original_returned:
+        pdf_bytes = input_data
+    result = dict(original_size=len(input_data), compressed_size=len(pdf_bytes), **info)
+    annotate(result, preflight_info, engine, original_returned)
+    result.update(extra or {})
+    transport.emit(result, pdf_bytes, "compressed_pdf")
+    return result
@@ -1,11 +1,13 @@
 import sys
 import os
-import subprocess
-import json
-import base64
-import tempfile
 
-def compress_pdf(input_file, output_file, quality="printer"):
+from transport import Transport
+from tool_io import run_tool
+from progress import GhostscriptProgress
+from pdf_compressor import build_gs_command
+from compress_dispatch import compress_document
+
+def compress_pdf(input_file, output_file, quality="printer", progress=None):
     """
     Ghostscript kullanarak PDF dosyasını sıkıştır
     
@@ -13,20 +15,14 @@ def compress_pdf(input_file, output_file, quality="printer"):
         input_file: Giriş PDF dosya yolu
         output_file: Çıkış PDF dosya yolu
         quality: Sıkıştırma kalitesi (screen, ebook, printer, prepress)
+        progress: Verilirse ilerleme olaylarını alan fonksiyon (bkz. progress.py)
     """
-    command = [
-        "gs",
-        "-sDEVICE=pdfwrite",
-        "-dCompatibilityLevel=1.4",
-        f"-dPDFSETTINGS=/{quality}",
-        "-dNOPAUSE",
-        "-dQUIET",
-        "-dBATCH",
-        f"-sOutputFile={output_file}",
-        input_file
-    ]
+    reporter = GhostscriptProgress(progress, output_file) if progress is not None else None
+    command = build_gs_command(input_file, output_file, f"/{quality}", quiet=reporter is None)
     
-    subprocess.run(command, check=True)
+    run_tool(command, input_size=os.path.getsize(input_file), on_message=reporter.feed if reporter else None)
+    if reporter:
+        reporter.finish()
     print(f"{output_file} başarıyla sıkıştırıldı.", file=sys.stderr)
 
 def main():
@@ -36,14 +32,23 @@ def main():
     2 parametre alır:
     1. Base64 formatında PDF içeriği
     2. Sıkıştırma seviyesi (light, medium, high)
+    
+    Base64 yerine --stdin veya --input <yol> ile ham PDF, --output <yol> veya
+    --binary-stdout ile ham çıktı kullanılabilir (bkz. transport.py).
     """
-    if len(sys.argv) < 3:
+    try:
+        transport = Transport()
+    except ValueError as e:
+        print(f"Hata: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    
+    if not transport.has_input or len(transport.args) < 1:
         print("Kullanım: python compress_pdf.py <base64_data> <compression_level>", file=sys.stderr)
+        print("         python compress_pdf.py (--stdin | --input <pdf>) <compression_level> [--output <pdf> | --binary-stdout]", file=sys.stderr)
         sys.exit(1)
     
     # Parametreleri al
-    base64_data = sys.argv[1]
-    compression_level = sys.argv[2]
+    compression_level = transport.args[0]
     
     # Sıkıştırma kalitesini belirle
     if compression_level == "light":
@@ -56,53 +61,17 @@ def main():
         quality = "prepress"   # Varsayılan
     
     try:
-        # Geçici dosyaları oluştur
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_input:
-            temp_input_path = temp_input.name
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_output:
-            temp_output_path = temp_output.name
-        
-        try:
-            # Base64 içeriği çöz ve giriş dosyasına yaz
-            pdf_data = base64.b64decode(base64_data)
-            with open(temp_input_path, 'wb') as f:
-                f.write(pdf_data)
-            
-            # Orijinal boyutu al
-            original_size = len(pdf_data)
-            
-            # PDF'i sıkıştır
-            compress_pdf(temp_input_path, temp_output_path, quality)
-            
-            # Sıkıştırılmış PDF'i oku
-            with open(temp_output_path, 'rb') as f:
-                compressed_data = f.read()
-            
-            # Sıkıştırılmış boyutu al
-            compressed_size = len(compressed_data)
-            
-            # Sonucu JSON olarak döndür
-            result = {
-                "compressed_pdf": base64.b64encode(compressed_data).decode('utf-8'),
-                "original_size": original_size,
-                "compressed_size": compressed_size
-            }
-            
-            print(json.dumps(result))
-            
-        finally:
-            # Geçici dosyaları temizle
-            if os.path.exists(temp_input_path):
-                os.unlink(temp_input_path)
-            if os.path.exists(temp_output_path):
-                os.unlink(temp_output_path)
+        # PDF'i kendi kalite eşlemesiyle sıkıştır (bkz. compress_dispatch)
+        compress_document(transport, "ghostscript", compression_level, f"/{quality}")
     
     except Exception as e:
         print(f"Hata: {str(e)}", file=sys.stderr)
         error_result = {"error": str(e)}
-        print(json.dumps(error_result))
+        transport.emit(error_result)
         sys.exit(1)
+    
+    finally:
+        transport.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
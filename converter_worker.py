@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Kalıcı Dönüştürücü İşçi Modu
+Node.js tarafı her yükleme için yeni bir Python süreci başlatmak yerine bu betiği
+bir kez başlatır ve istekleri stdin/stdout üzerinden JSON satırları olarak gönderir.
+Kütüphaneler önceden yüklenmiş işçi havuzu sayesinde yorumlayıcı başlatma ve
+import maliyeti her istekte tekrar ödenmez.
+
+İstek formatı (her satırda bir JSON nesnesi):
+    {"id": "istek-1", "data": "<base64>", "mime_type": "text/plain", "file_name": "a.txt"}
+
+Yanıt formatı (her satırda bir JSON nesnesi, tamamlanma sırasına göre):
+    {"id": "istek-1", "success": true, "pdf_base64": "...", "original_size": 10, "pdf_size": 900}
+    {"id": "istek-1", "success": false, "error": "..."}
+
+Büyük dosyalarda base64 yerine dosya yolları kullanılabilir: "data" yerine
+"input_path" verilirse girdi dosyadan okunur, "output_path" verilirse PDF o yola
+yazılır ve yanıtta "pdf_base64" yerine "output_path" döner.
+
+İstekte "metrics": true verilirse (veya NOVAPDF_METRICS=1 ise) yanıta aşama
+süreleri ve bayt sayıları "metrics" anahtarıyla eklenir (bkz. metrics.py).
+
+Kullanım: python3 converter_worker.py [--workers N] [--max-jobs M]
+"""
+
+import sys
+import os
+import base64
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+import doc_converter_all
+from transport import ArgumentParser
+
+# Varsayılan havuz ayarları
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+DEFAULT_MAX_JOBS = 200
+
+WORKER_DIED_ERROR = "İşçi süreç beklenmedik şekilde sonlandı"
+
+
+def _init_worker():
+    """
+    İşçi süreci başlatıcısı.
+    Dönüştürücülerin tanılama çıktıları protokol akışını bozmasın diye
+    stdout stderr'e yönlendirilir.
+    """
+    sys.stdout = sys.stderr
+
+
+def _convert_job(request):
+    """
+    Tek bir dönüştürme isteğini işçi sürecinde çalıştırır
+
+    Args:
+        request: İstek sözlüğü (id, data veya input_path, mime_type, file_name, output_path)
+
+    Returns:
+        Yanıt sözlüğü
+    """
+    with metrics.request_scope("converter_worker", request.get("metrics") or None) as collector:
+        response = _run_job(request)
+        collector.record("ok" if response["success"] else "error")
+        return collector.attach(response)
+
+
+def _run_job(request):
+    request_id = request.get("id")
+    try:
+        with metrics.stage("read_input"):
+            if request.get("input_path"):
+                with open(request["input_path"], "rb") as f:
+                    file_content = f.read()
+            else:
+                file_content = base64.b64decode(request["data"])
+        metrics.add_bytes_in(len(file_content))
+
+        stats = {}
+        pdf_bytes, cache_info = doc_converter_all.convert_to_pdf_cached(
+            file_content,
+            request.get("mime_type", ""),
+            request.get("file_name", ""),
+            stats
+        )
+
+        response = {
+            "id": request_id,
+            "success": True,
+            "original_size": len(file_content),
+            "pdf_size": len(pdf_bytes)
+        }
+        if cache_info:
+            response["cache"] = cache_info
+        if stats:
+            response["stats"] = stats
+        metrics.add_bytes_out(len(pdf_bytes))
+        with metrics.stage("emit"):
+            if request.get("output_path"):
+                with open(request["output_path"], "wb") as f:
+                    f.write(pdf_bytes)
+                response["output_path"] = request["output_path"]
+            else:
+                response["pdf_base64"] = base64.b64encode(pdf_bytes).decode('utf-8')
+        return response
+    except Exception as e:
+        return {
+            "id": request_id,
+            "success": False,
+            "error": str(e)
+        }
+
+
+class ResponseWriter:
+    """Yanıtları stdout'a satır satır ve iş parçacığı güvenli şekilde yazar"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def write(self, response):
+        line = json.dumps(response)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class WorkerPool:
+    """
+    İşçi süreç havuzu. Aynı anda en fazla işçi sayısı kadar istek gönderilir;
+    bir işçi çökerse (ör. bellek yetmezliği) o an çalışan istekler hata ile
+    yanıtlanır ve sonraki istekler yeni bir havuzda çalışır. Havuz her
+    işçi sayısı x max_jobs istekte bir yeniden kurularak bellek sınırlanır.
+    """
+
+    def __init__(self, workers, max_jobs, writer):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.writer = writer
+        self.slots = threading.Semaphore(workers)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.submitted = 0
+
+    def _current(self):
+        with self.lock:
+            if self.executor is None or self.submitted >= self.workers * self.max_jobs:
+                self._retire()
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                self.submitted = 0
+            self.submitted += 1
+            return self.executor
+
+    def _retire(self, executor=None):
+        """Havuzu yeni istek almayacak şekilde bırakır; çalışan istekler biter"""
+        executor = executor or self.executor
+        if executor is not None and executor is self.executor:
+            self.executor = None
+            executor.shutdown(wait=False)
+
+    def submit(self, request):
+        """İsteği boş bir işçi olana kadar bekleyip gönderir"""
+        self.slots.acquire()
+        request_id = request.get("id")
+        executor = self._current()
+        try:
+            future = executor.submit(_convert_job, request)
+        except BrokenProcessPool:
+            with self.lock:
+                self._retire(executor)
+            executor = self._current()
+            future = executor.submit(_convert_job, request)
+        future.add_done_callback(lambda done: self._finish(done, request_id, executor))
+
+    def _finish(self, future, request_id, executor):
+        try:
+            response = future.result()
+        except BrokenProcessPool:
+            with self.lock:
+                self._retire(executor)
+            response = {"id": request_id, "success": False, "error": WORKER_DIED_ERROR}
+        except Exception as e:
+            response = {"id": request_id, "success": False, "error": str(e)}
+        self.slots.release()
+        self.writer.write(response)
+
+    def close(self):
+        """Bekleyen isteklerin bitmesini bekler"""
+        for _ in range(self.workers):
+            self.slots.acquire()
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def serve(workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS, input_stream=None, output_stream=None):
+    """
+    stdin'den gelen istekleri işçi havuzuna dağıtır ve yanıtları stdout'a yazar.
+    Girdi akışı kapandığında bekleyen işler tamamlanır ve havuz kapatılır.
+
+    Args:
+        workers: Havuzdaki işçi süreç sayısı
+        max_jobs: Bir işçinin yeniden başlatılmadan önce işleyeceği en fazla iş sayısı
+        input_stream: İsteklerin okunacağı akış (varsayılan stdin)
+        output_stream: Yanıtların yazılacağı akış (varsayılan stdout)
+    """
+    input_stream = input_stream or sys.stdin
+    writer = ResponseWriter(output_stream or sys.stdout)
+
+    # Arka uçları üst süreçte bir kez yükle; fork ile başlatılan (ve yeniden
+    # başlatılan) işçiler modülleri hazır devralır
+    missing = doc_converter_all.preload_backends()
+    if missing:
+        print(f"Yüklenemeyen arka uçlar: {', '.join(missing)}", file=sys.stderr)
+
+    pool = WorkerPool(workers, max_jobs, writer)
+
+    try:
+        for line in input_stream:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict) or not (request.get("data") or request.get("input_path")):
+                    raise ValueError("İstek 'data' veya 'input_path' alanı içeren bir JSON nesnesi olmalı")
+            except ValueError as e:
+                writer.write({"id": None, "success": False, "error": f"Geçersiz istek: {e}"})
+                continue
+
+            pool.submit(request)
+    finally:
+        # Bekleyen işlerin bitmesini bekle
+        pool.close()
+
+
+def main():
+    """
+    Ana fonksiyon - Node.js tarafından uzun ömürlü süreç olarak başlatılır
+    """
+    parser = ArgumentParser(description="Kalıcı PDF dönüştürücü işçi havuzu")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Önceden ısıtılmış işçi süreç sayısı")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS,
+                        help="Bellek sızıntılarını sınırlamak için işçi başına en fazla iş sayısı")
+    try:
+        args = parser.parse_args()
+    except ValueError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.workers < 1 or args.max_jobs < 1:
+        print("Hata: --workers ve --max-jobs pozitif olmalı", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"İşçi havuzu hazır: {args.workers} işçi, işçi başına en fazla {args.max_jobs} iş", file=sys.stderr)
+    serve(args.workers, args.max_jobs)
+
+
+if __name__ == "__main__":
+    main()
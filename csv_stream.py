@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Akış Tabanlı CSV'den PDF'e Dönüştürme
+CSV dosyası tamamen belleğe alınmadan parça parça okunur, satırlar sayfalara
+yerleştirilir ve dolan sayfalar parçalar halinde diske boşaltılır. Böylece bellek
+kullanımı satır sayısından bağımsız olarak sabit kalır. Tablo, her parça için
+sütun bazında toplu çalışan table_layout motoruyla yazılır.
+"""
+
+import io
+import sys
+import time
+
+import pandas as pd
+
+from pdf_fonts import font_family, pdf_text
+from pdf_spool import SegmentedPDF
+from table_layout import TableRenderer, SAMPLE_ROWS
+
+# pandas ile bir seferde okunacak satır sayısı
+CSV_CHUNK_ROWS = 5000
+
+
+def stream_csv_to_pdf(input_data, title="CSV Verileri", stats=None, output_path=None):
+    """
+    CSV içeriğini sabit bellekle PDF tablosuna dönüştürür
+
+    Args:
+        input_data (bytes): CSV dosya içeriği
+        title: İlk sayfanın başlığı
+        stats: Verilirse satır sayısı, sayfa sayısı, süre ve satır/saniye ile doldurulur
+        output_path: Verilirse PDF belleğe alınmadan bu dosyaya yazılır
+
+    Returns:
+        bytes: PDF içeriği (output_path verildiyse None)
+    """
+    start = time.perf_counter()
+
+    # Tüm içeriği tek bir str'e çözmeden satır satır oku
+    text_stream = io.TextIOWrapper(io.BytesIO(input_data), encoding='utf-8', errors='replace', newline='')
+    reader = pd.read_csv(
+        text_stream,
+        chunksize=CSV_CHUNK_ROWS,
+        dtype=str,
+        keep_default_na=False
+    )
+
+    row_count = 0
+    with SegmentedPDF() as document:
+        document.add_page()
+
+        # Başlık
+        document.pdf.set_font(font_family(document.pdf), 'B', size=16)
+        document.pdf.cell(0, 10, pdf_text(document.pdf, title), ln=True)
+        document.pdf.ln(5)
+
+        renderer = None
+        for chunk in reader:
+            if renderer is None:
+                # Sütun genişlikleri ilk parçadan örneklenir
+                renderer = TableRenderer(document, list(chunk.columns), chunk.head(SAMPLE_ROWS))
+                renderer.write_header()
+            renderer.write_frame(chunk)
+            row_count += len(chunk)
+
+        if output_path:
+            document.save(output_path)
+            pdf_bytes = None
+        else:
+            pdf_bytes = document.getvalue()
+        page_count = document.page_count
+
+    elapsed = time.perf_counter() - start
+    rows_per_second = row_count / elapsed if elapsed > 0 else 0.0
+    print(f"CSV: {row_count} satır, {page_count} sayfa, {rows_per_second:.0f} satır/sn", file=sys.stderr)
+
+    if stats is not None:
+        stats.update({
+            "rows": row_count,
+            "pages": page_count,
+            "seconds": round(elapsed, 4),
+            "rows_per_second": round(rows_per_second, 1)
+        })
+    return pdf_bytes
@@ -8,12 +8,13 @@ Desteklenen formatlar: DOCX, XLSX, CSV, TXT
 
 import sys
 import os
-import base64
 import json
 import tempfile
-import io
-from fpdf import FPDF
-import pandas as pd
+
+import metrics
+from transport import Transport
+from pdf_fonts import new_pdf, font_family, pdf_text
+from csv_stream import stream_csv_to_pdf
 
 # DOCX belgelerini işlemek için
 try:
@@ -42,7 +43,8 @@ def docx_to_pdf(input_data):
         document = Document(temp_docx_path)
         
         # PDF oluştur
-        pdf = FPDF()
+        pdf = new_pdf()
+        family = font_family(pdf)
         pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=15)
         
@@ -50,14 +52,14 @@ def docx_to_pdf(input_data):
         for paragraph in document.paragraphs:
             # Paragraf stiline göre fontları ayarla
             if paragraph.style.name.startswith('Heading'):
-                pdf.set_font("Arial", 'B', size=14)  # Başlıklar kalın
+                pdf.set_font(family, 'B', size=14)  # Başlıklar kalın
             else:
-                pdf.set_font("Arial", size=12)  # Normal metin
+                pdf.set_font(family, size=12)  # Normal metin
             
             # Metin ekle
             if paragraph.text.strip():  # Boş paragrafları atla
-                # UTF-8 kodlamasıyla metni ekle
-                text = paragraph.text.encode('latin-1', 'replace').decode('latin-1')
+                # Unicode fontta metni olduğu gibi, çekirdek fontta latin-1'e indirgeyerek ekle
+                text = pdf_text(pdf, paragraph.text)
                 pdf.multi_cell(0, 10, text)
         
         # PDF'i belleğe aktar
@@ -76,97 +78,15 @@ def docx_to_pdf(input_data):
 
 def xlsx_to_pdf(input_data):
     """Excel dosyasını PDF'e dönüştürür"""
-    # Geçici dosya oluştur
-    with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as temp_xlsx:
-        temp_xlsx.write(input_data)
-        temp_xlsx_path = temp_xlsx.name
-    
-    try:
-        # Excel dosyasını oku
-        excel_data = pd.read_excel(temp_xlsx_path, sheet_name=None)
-        
-        # PDF oluştur
-        pdf = FPDF()
-        
-        # Her çalışma sayfası için
-        for sheet_name, df in excel_data.items():
-            pdf.add_page()
-            pdf.set_font("Arial", 'B', size=16)
-            pdf.cell(0, 10, f"Çalışma Sayfası: {sheet_name}", ln=True)
-            
-            pdf.ln(5)
-            pdf.set_font("Arial", 'B', size=12)
-            
-            # Sütun başlıklarını ekle
-            col_width = pdf.w / len(df.columns)
-            for col in df.columns:
-                pdf.cell(col_width, 10, str(col), border=1)
-            pdf.ln()
-            
-            # Verileri ekle
-            pdf.set_font("Arial", size=10)
-            for _, row in df.iterrows():
-                for value in row:
-                    # Değeri metin olarak dönüştür ve sığdır
-                    value_str = str(value)
-                    if len(value_str) > 15:  # Uzun içeriği kısalt
-                        value_str = value_str[:12] + "..."
-                    pdf.cell(col_width, 10, value_str, border=1)
-                pdf.ln()
-        
-        # PDF'i belleğe aktar
-        pdf_bytes = pdf.output(dest='S').encode('latin-1')
-        
-        # Geçici dosyayı temizle
-        os.unlink(temp_xlsx_path)
-        
-        return pdf_bytes
-    except Exception as e:
-        # Hata durumunda temizlik
-        if os.path.exists(temp_xlsx_path):
-            os.unlink(temp_xlsx_path)
-        raise e
+    # Salt okunur modda satır satır oku, çalışma sayfalarını paralel işle
+    from xlsx_stream import stream_xlsx_to_pdf
+    return stream_xlsx_to_pdf(input_data, title_size=16)
 
 
 def csv_to_pdf(input_data):
     """CSV dosyasını PDF'e dönüştürür"""
-    try:
-        # CSV dosyasını pandas ile oku
-        csv_content = input_data.decode('utf-8')
-        df = pd.read_csv(io.StringIO(csv_content))
-        
-        # PDF oluştur
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', size=16)
-        pdf.cell(0, 10, "CSV Verileri", ln=True)
-        
-        pdf.ln(5)
-        pdf.set_font("Arial", 'B', size=12)
-        
-        # Sütun başlıklarını ekle
-        col_width = pdf.w / len(df.columns)
-        for col in df.columns:
-            pdf.cell(col_width, 10, str(col), border=1)
-        pdf.ln()
-        
-        # Verileri ekle
-        pdf.set_font("Arial", size=10)
-        for _, row in df.iterrows():
-            for value in row:
-                # Değeri metin olarak dönüştür ve sığdır
-                value_str = str(value)
-                if len(value_str) > 15:  # Uzun içeriği kısalt
-                    value_str = value_str[:12] + "..."
-                pdf.cell(col_width, 10, value_str, border=1)
-            pdf.ln()
-        
-        # PDF'i belleğe aktar
-        pdf_bytes = pdf.output(dest='S').encode('latin-1')
-        
-        return pdf_bytes
-    except Exception as e:
-        raise e
+    # CSV'yi parça parça okuyarak sabit bellekle PDF tablosuna dönüştür
+    return stream_csv_to_pdf(input_data, "CSV Verileri")
 
 
 def txt_to_pdf(input_data):
@@ -176,14 +96,15 @@ def txt_to_pdf(input_data):
         text_content = input_data.decode('utf-8')
         
         # PDF oluştur
-        pdf = FPDF()
+        pdf = new_pdf()
+        family = font_family(pdf)
         pdf.add_page()
-        pdf.set_font("Arial", size=12)
+        pdf.set_font(family, size=12)
         
         # Metni satır satır ekle
         for line in text_content.split('\n'):
-            # UTF-8 kodlamasıyla metni ekle
-            text = line.encode('latin-1', 'replace').decode('latin-1')
+            # Unicode fontta metni olduğu gibi, çekirdek fontta latin-1'e indirgeyerek ekle
+            text = pdf_text(pdf, line)
             pdf.multi_cell(0, 8, text)
         
         # PDF'i belleğe aktar
@@ -201,17 +122,18 @@ def html_to_pdf(input_data):
         html_content = input_data.decode('utf-8')
         
         # PDF oluştur
-        pdf = FPDF()
+        pdf = new_pdf()
+        family = font_family(pdf)
         pdf.add_page()
-        pdf.set_font("Arial", size=12)
+        pdf.set_font(family, size=12)
         
         # HTML başlığını bul
         import re
         title_match = re.search(r'<title>(.*?)</title>', html_content, re.IGNORECASE)
         if title_match:
             title = title_match.group(1)
-            pdf.set_font("Arial", 'B', size=16)
-            pdf.cell(0, 10, title, ln=True)
+            pdf.set_font(family, 'B', size=16)
+            pdf.cell(0, 10, pdf_text(pdf, title), ln=True)
         
         # Basit bir HTML temizleme yapalım
         # (gerçek bir uygulama için daha kapsamlı bir HTML parser kullanılmalı)
@@ -222,8 +144,8 @@ def html_to_pdf(input_data):
         text_content = re.sub(r'\s+', ' ', text_content).strip()
         
         # Metni ekle
-        pdf.set_font("Arial", size=12)
-        text = text_content.encode('latin-1', 'replace').decode('latin-1')
+        pdf.set_font(family, size=12)
+        text = pdf_text(pdf, text_content)
         pdf.multi_cell(0, 8, text)
         
         # PDF'i belleğe aktar
@@ -253,12 +175,13 @@ def rtf_to_pdf(input_data):
         text_content = re.sub(r'\s+', ' ', text_content).strip()
         
         # PDF oluştur
-        pdf = FPDF()
+        pdf = new_pdf()
+        family = font_family(pdf)
         pdf.add_page()
-        pdf.set_font("Arial", size=12)
+        pdf.set_font(family, size=12)
         
         # Metni ekle
-        text = text_content.encode('latin-1', 'replace').decode('latin-1')
+        text = pdf_text(pdf, text_content)
         pdf.multi_cell(0, 8, text)
         
         # PDF'i belleğe aktar
@@ -315,33 +238,34 @@ def main():
     
     Çıktı:
     Base64 formatında PDF içeriği (stdout'a yazılır)
+    
+    Base64 yerine --stdin veya --input <yol> ile ham dosya, --output <yol> veya
+    --binary-stdout ile ham PDF çıktısı kullanılabilir (bkz. transport.py).
     """
+    transport = None
     try:
-        if len(sys.argv) < 4:
+        transport = Transport()
+        if not transport.has_input or len(transport.args) < 2:
             raise ValueError("Eksik argümanlar. Beklenen format: <base64_file_content> <mime_type> <file_name>")
         
         # Argümanları al
-        base64_content = sys.argv[1]
-        mime_type = sys.argv[2]
-        file_name = sys.argv[3]
+        mime_type = transport.args[0]
+        file_name = transport.args[1]
         
-        # Base64'ü decode et
-        file_content = base64.b64decode(base64_content)
+        # Dosya içeriğini oku
+        file_content = transport.read_input_bytes()
         
         # Dönüştürme işlemi
-        pdf_bytes = convert_to_pdf(file_content, mime_type, file_name)
-        
-        # Sonucu base64 olarak encode et ve stdout'a yaz
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
+        with metrics.stage("convert"):
+            pdf_bytes = convert_to_pdf(file_content, mime_type, file_name)
         
         # JSON formatında sonuç döndür
         result = {
             "success": True,
-            "pdf_base64": pdf_base64,
             "original_size": len(file_content),
             "pdf_size": len(pdf_bytes)
         }
-        print(json.dumps(result))
+        transport.emit(result, pdf_bytes, "pdf_base64")
         
     except Exception as e:
         # Hata durumunda hata mesajı döndür
@@ -349,9 +273,15 @@ def main():
             "success": False,
             "error": str(e)
         }
-        print(json.dumps(error_result))
+        if transport is not None:
+            transport.emit(error_result)
+        else:
+            print(json.dumps(error_result))
         sys.exit(1)
-
+    
+    finally:
+        if transport is not None:
+            transport.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
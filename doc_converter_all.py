@@ -6,100 +6,199 @@ Office ve Diğer Belgeleri PDF'e Dönüştürme Betiği
 Desteklenen formatlar: DOCX, XLSX, PPTX, CSV, TXT, HTML, RTF ve PDF
 """
 
+import time
+
+# Modül yükleme süresini ölçmek için başlangıç zamanı
+_MODULE_LOAD_START = time.perf_counter()
+
 import sys
 import os
-import base64
 import json
+import shutil
 import tempfile
-import io
-from fpdf import FPDF
-import pandas as pd
+import importlib
+import importlib.util
 import traceback
 
-# Gerekli kütüphaneleri yükle
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
-try:
-    import openpyxl
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
-
-try:
-    from pptx import Presentation
-    PPTX_AVAILABLE = True
-except ImportError:
-    PPTX_AVAILABLE = False
-
-try:
-    from bs4 import BeautifulSoup
-    BS4_AVAILABLE = True
-except ImportError:
-    BS4_AVAILABLE = False
-
-try:
-    import pypandoc
-    PANDOC_AVAILABLE = True
-except ImportError:
-    PANDOC_AVAILABLE = False
-
-try:
-    from PyPDF2 import PdfReader, PdfWriter
-    PYPDF2_AVAILABLE = True
-except ImportError:
+import metrics
+import tool_scheduler
+from transport import Transport
+from result_cache import cached_bytes_operation, cached_bytes_to_file_operation, source_version
+
+# Biçim arka uçları: modül adı -> (pip paket adı, erişilebilirlik bayrağı)
+# Ağır kütüphaneler modül yüklenirken değil, ilgili dönüştürücü ilk çalıştığında yüklenir
+BACKENDS = {
+    "fpdf": ("fpdf", "FPDF_AVAILABLE"),
+    "docx": ("python-docx", "DOCX_AVAILABLE"),
+    "openpyxl": ("openpyxl", "EXCEL_AVAILABLE"),
+    "pptx": ("python-pptx", "PPTX_AVAILABLE"),
+    "bs4": ("beautifulsoup4", "BS4_AVAILABLE"),
+    "pypandoc": ("pypandoc", "PANDOC_AVAILABLE"),
+    "PyPDF2": ("PyPDF2", "PYPDF2_AVAILABLE"),
+    "pandas": ("pandas", "PANDAS_AVAILABLE"),
+}
+
+# Dönüştürme çıktısını etkileyen kaynak dosyalar (önbellek sürümü bunlardan hesaplanır)
+_HERE = os.path.dirname(os.path.abspath(__file__))
+CONVERTER_SOURCES = tuple(
+    os.path.join(_HERE, name)
+    for name in ("doc_converter_all.py", "csv_stream.py", "xlsx_stream.py", "pdf_spool.py", "table_layout.py",
+                 "pdf_fonts.py")
+)
+
+# Yüklenmiş arka uçlar ve import süreleri (saniye)
+_loaded_backends = {}
+_backend_import_times = {}
+
+
+def _is_installed(module_name):
+    """Modülü import etmeden kurulu olup olmadığını kontrol eder"""
     try:
-        from PyPDF2 import PdfFileReader as PdfReader, PdfFileWriter as PdfWriter
-        PYPDF2_AVAILABLE = True
-    except ImportError:
-        PYPDF2_AVAILABLE = False
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Gerekli kütüphanelerin erişilebilirliğini kontrol et (import etmeden)
+FPDF_AVAILABLE = _is_installed("fpdf")
+DOCX_AVAILABLE = _is_installed("docx")
+EXCEL_AVAILABLE = _is_installed("openpyxl")
+PPTX_AVAILABLE = _is_installed("pptx")
+BS4_AVAILABLE = _is_installed("bs4")
+PANDOC_AVAILABLE = _is_installed("pypandoc")
+PYPDF2_AVAILABLE = _is_installed("PyPDF2")
+PANDAS_AVAILABLE = _is_installed("pandas")
+
+
+def load_backend(module_name):
+    """
+    Bir biçim arka ucunu ilk kullanımda yükler ve önbelleğe alır
+    
+    Args:
+        module_name: BACKENDS içindeki modül adı
+    
+    Returns:
+        Yüklenmiş modül
+    """
+    module = _loaded_backends.get(module_name)
+    if module is not None:
+        return module
+    
+    package_name, flag_name = BACKENDS[module_name]
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        # Kurulu görünen ama yüklenemeyen kütüphaneyi erişilemez olarak işaretle
+        globals()[flag_name] = False
+        raise ImportError(f"{package_name} kütüphanesi yüklü değil") from e
+    
+    _backend_import_times[module_name] = time.perf_counter() - start
+    _loaded_backends[module_name] = module
+    return module
+
+
+def preload_backends():
+    """
+    Kurulu tüm arka uçları ve Unicode font metriklerini önceden yükler
+    (uzun ömürlü işçi süreçleri için)
+    
+    Returns:
+        Yüklenemeyen arka uçların adları
+    """
+    failed = []
+    for module_name, (_, flag_name) in BACKENDS.items():
+        if not globals()[flag_name]:
+            failed.append(module_name)
+            continue
+        try:
+            load_backend(module_name)
+        except ImportError:
+            failed.append(module_name)
+    if "fpdf" in _loaded_backends:
+        from pdf_fonts import preload as preload_fonts
+        preload_fonts()
+    return failed
+
+
+def self_check():
+    """
+    Her arka ucun erişilebilirliğini ve import süresini raporlar
+    
+    Returns:
+        Rapor sözlüğü
+    """
+    report = {
+        "module_load_ms": round(_MODULE_LOAD_TIME * 1000, 2),
+        "backends": {}
+    }
+    for module_name, (package_name, flag_name) in BACKENDS.items():
+        entry = {"package": package_name, "available": globals()[flag_name]}
+        if entry["available"]:
+            try:
+                load_backend(module_name)
+                entry["import_ms"] = round(_backend_import_times[module_name] * 1000, 2)
+            except ImportError as e:
+                entry["available"] = False
+                entry["error"] = str(e)
+        report["backends"][module_name] = entry
+    return report
 
 
 # PDF oluşturucu sınıf
 class PDFConverter:
     def __init__(self):
-        self.pdf = FPDF()
+        # Unicode TTF font (önbellekteki metriklerle) bulunamazsa çekirdek Arial kullanılır
+        load_backend("fpdf")
+        from pdf_fonts import new_pdf, font_family
+        self.pdf = new_pdf()
+        self.font = font_family(self.pdf)
         self.pdf.add_page()
-        self.pdf.set_font("Arial", size=12)
+        self.pdf.set_font(self.font, size=12)
         self.pdf.set_auto_page_break(auto=True, margin=15)
     
     def add_title(self, title, size=16):
-        self.pdf.set_font("Arial", 'B', size=size)
-        self.pdf.cell(0, 10, title, ln=True)
+        from pdf_fonts import pdf_text
+        self.pdf.set_font(self.font, 'B', size=size)
+        self.pdf.cell(0, 10, pdf_text(self.pdf, title), ln=True)
         self.pdf.ln(5)
-        self.pdf.set_font("Arial", size=12)
+        self.pdf.set_font(self.font, size=12)
     
     def add_text(self, text):
         if text and text.strip():
-            # UTF-8 kodlamasıyla metni ekle
+            # Unicode fontta metin olduğu gibi, çekirdek fontta latin-1'e indirgenerek eklenir
+            from pdf_fonts import pdf_text
             try:
-                safe_text = text.encode('latin-1', 'replace').decode('latin-1')
-                self.pdf.multi_cell(0, 10, safe_text)
+                self.pdf.multi_cell(0, 10, pdf_text(self.pdf, text))
             except Exception as e:
                 print(f"Metin dönüştürme hatası: {e}")
                 self.pdf.multi_cell(0, 10, "< Dönüştürme hatası >")
     
     def add_table(self, data, headers=None):
-        if headers:
-            self.pdf.set_font("Arial", 'B', size=12)
-            for header in headers:
-                self.pdf.cell(40, 10, str(header)[:15], border=1)
-            self.pdf.ln()
-            self.pdf.set_font("Arial", size=10)
-        
-        for row in data:
-            for cell in row:
-                cell_str = str(cell)
-                if len(cell_str) > 15:
-                    cell_str = cell_str[:12] + "..."
-                self.pdf.cell(40, 10, cell_str, border=1)
-            self.pdf.ln()
+        """
+        Tabloyu sütun bazında toplu biçimlendirerek ekler; başlık her sayfada tekrarlanır
+
+        Args:
+            data: Satırlar (DataFrame veya satır listesi)
+            headers: Sütun başlıkları (verilmezse DataFrame sütunları kullanılır)
+        """
+        pd = load_backend("pandas")
+        from table_layout import TableRenderer, FPDFDocument, SAMPLE_ROWS
+
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data))
+        if headers is None:
+            headers = list(frame.columns)
+        if not len(headers):
+            return
+
+        renderer = TableRenderer(FPDFDocument(self.pdf), headers, frame.head(SAMPLE_ROWS))
+        renderer.write_header()
+        renderer.write_frame(frame)
+        self.pdf.set_font(self.font, size=12)
     
     def get_buffer(self):
-        return self.pdf.output(dest='S').encode('latin-1')
+        with metrics.stage("pdf_output"):
+            return self.pdf.output(dest='S').encode('latin-1')
 
 
 # TXT dosyasını PDF'e dönüştür
@@ -136,7 +235,7 @@ def docx_to_pdf(input_data):
     
     try:
         # DOCX dosyasını oku
-        document = Document(temp_docx_path)
+        document = load_backend("docx").Document(temp_docx_path)
         
         # PDF oluştur
         converter = PDFConverter()
@@ -144,25 +243,18 @@ def docx_to_pdf(input_data):
         # Başlık ve paragrafları ekle
         for paragraph in document.paragraphs:
             if paragraph.style.name.startswith('Heading'):
-                converter.pdf.set_font("Arial", 'B', size=14)
+                converter.pdf.set_font(converter.font, 'B', size=14)
             else:
-                converter.pdf.set_font("Arial", size=12)
+                converter.pdf.set_font(converter.font, size=12)
             
             converter.add_text(paragraph.text)
         
-        # Tabloları ekle (basitleştirilmiş)
+        # Tabloları ekle (ilk satır başlık kabul edilir)
         for table in document.tables:
-            converter.pdf.ln(5)
-            for row in table.rows:
-                cells = []
-                for cell in row.cells:
-                    cells.append(cell.text)
-                
-                converter.pdf.set_font("Arial", size=10)
-                for cell_text in cells:
-                    safe_text = str(cell_text).encode('latin-1', 'replace').decode('latin-1')
-                    converter.pdf.cell(40, 10, safe_text[:15], border=1)
-                converter.pdf.ln()
+            rows = [[cell.text for cell in row.cells] for row in table.rows]
+            if rows:
+                converter.pdf.ln(5)
+                converter.add_table(rows[1:], rows[0])
         
         # PDF'i belleğe aktar ve geçici dosyayı temizle
         result = converter.get_buffer()
@@ -179,55 +271,18 @@ def docx_to_pdf(input_data):
 
 
 # XLSX dosyasını PDF'e dönüştür
-def xlsx_to_pdf(input_data):
+def xlsx_to_pdf(input_data, stats=None, output_path=None):
     if not EXCEL_AVAILABLE:
         raise ImportError("openpyxl kütüphanesi yüklü değil")
     
-    # Geçici dosya oluştur
-    with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as temp_xlsx:
-        temp_xlsx.write(input_data)
-        temp_xlsx_path = temp_xlsx.name
-    
     try:
-        # Excel dosyasını oku
-        workbook = openpyxl.load_workbook(temp_xlsx_path)
-        
-        # PDF oluştur
-        converter = PDFConverter()
-        
-        # Her çalışma sayfası için
-        for sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-            converter.add_title(f"Çalışma Sayfası: {sheet_name}", 14)
-            
-            # Verileri tablo olarak ekle
-            for row in sheet.iter_rows(values_only=True):
-                row_items = []
-                for cell in row:
-                    row_items.append(str(cell) if cell is not None else "")
-                
-                converter.pdf.set_font("Arial", size=10)
-                for cell_text in row_items:
-                    safe_text = cell_text.encode('latin-1', 'replace').decode('latin-1')
-                    converter.pdf.cell(40, 10, safe_text[:15], border=1)
-                converter.pdf.ln()
-            
-            # Sayfa sonuna boşluk ekle
-            converter.pdf.ln(10)
-            
-            # Çalışma sayfası bittiyse ve başka sayfa varsa yeni sayfa ekle
-            if sheet_name != workbook.sheetnames[-1]:
-                converter.pdf.add_page()
-        
-        # PDF'i belleğe aktar ve geçici dosyayı temizle
-        result = converter.get_buffer()
-        os.unlink(temp_xlsx_path)
-        return result
+        # Salt okunur modda satır satır oku, çalışma sayfalarını paralel işle
+        # (output_path verilirse birleştirilmiş PDF belleğe alınmadan dosyaya yazılır)
+        load_backend("openpyxl")
+        from xlsx_stream import stream_xlsx_to_pdf
+        return stream_xlsx_to_pdf(input_data, title_size=14, stats=stats, output_path=output_path)
     
     except Exception as e:
-        # Hata durumunda temizlik
-        if os.path.exists(temp_xlsx_path):
-            os.unlink(temp_xlsx_path)
         print(f"XLSX Dönüştürme Hatası: {e}")
         traceback.print_exc()
         raise e
@@ -245,7 +300,7 @@ def pptx_to_pdf(input_data):
     
     try:
         # PowerPoint dosyasını oku
-        presentation = Presentation(temp_pptx_path)
+        presentation = load_backend("pptx").Presentation(temp_pptx_path)
         
         # PDF oluştur
         converter = PDFConverter()
@@ -288,7 +343,7 @@ def html_to_pdf(input_data):
         html_content = input_data.decode('utf-8', errors='replace')
         
         # BeautifulSoup ile parse et
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = load_backend("bs4").BeautifulSoup(html_content, "html.parser")
         
         # PDF oluştur
         converter = PDFConverter()
@@ -316,47 +371,13 @@ def html_to_pdf(input_data):
 
 
 # CSV dosyasını PDF'e dönüştür
-def csv_to_pdf(input_data):
+def csv_to_pdf(input_data, stats=None, output_path=None):
     try:
-        # CSV içeriğini çıkar
-        csv_content = input_data.decode('utf-8', errors='replace')
-        csv_file = io.StringIO(csv_content)
-        
-        # CSV'yi pandas ile oku
-        df = pd.read_csv(csv_file)
-        
-        # PDF oluştur
-        converter = PDFConverter()
-        converter.add_title("CSV Verileri", 16)
-        
-        # Başlıkları ekle
-        headers = df.columns.tolist()
-        converter.pdf.set_font("Arial", 'B', size=12)
-        
-        # Tablonun genişlik kontrolü
-        col_width = min(40, 180 / len(headers)) if headers else 40
-        
-        # Başlıkları ekle
-        for header in headers:
-            safe_header = str(header).encode('latin-1', 'replace').decode('latin-1')
-            if len(safe_header) > 15:
-                safe_header = safe_header[:12] + "..."
-            converter.pdf.cell(col_width, 10, safe_header, border=1)
-        converter.pdf.ln()
-        
-        # Verileri ekle
-        converter.pdf.set_font("Arial", size=10)
-        for _, row in df.iterrows():
-            for item in row:
-                item_str = str(item)
-                safe_text = item_str.encode('latin-1', 'replace').decode('latin-1')
-                if len(safe_text) > 15:
-                    safe_text = safe_text[:12] + "..."
-                converter.pdf.cell(col_width, 10, safe_text, border=1)
-            converter.pdf.ln()
-        
-        # PDF'i belleğe aktar
-        return converter.get_buffer()
+        # CSV'yi parça parça okuyarak sabit bellekle PDF tablosuna dönüştür
+        # (output_path verilirse birleştirilmiş PDF belleğe alınmadan dosyaya yazılır)
+        load_backend("pandas")
+        from csv_stream import stream_csv_to_pdf
+        return stream_csv_to_pdf(input_data, "CSV Verileri", stats, output_path)
     
     except Exception as e:
         print(f"CSV Dönüştürme Hatası: {e}")
@@ -375,8 +396,10 @@ def rtf_to_pdf(input_data):
         temp_rtf_path = temp_rtf.name
     
     try:
-        # RTF dosyasını oku ve dönüştür
-        text = pypandoc.convert_file(temp_rtf_path, 'plain')
+        # RTF dosyasını oku ve dönüştür (pandoc alt süreci pypandoc içinde
+        # başlatıldığından yalnızca kuyruk ve bütçe uygulanır)
+        with tool_scheduler.admit("pandoc", len(input_data)), metrics.stage("pandoc"):
+            text = load_backend("pypandoc").convert_file(temp_rtf_path, 'plain')
         
         # PDF oluştur
         converter = PDFConverter()
@@ -410,7 +433,7 @@ def pdf_to_pdf(input_data):
 
 
 # Ana dönüştürme fonksiyonu
-def convert_to_pdf(input_data, mime_type, file_name):
+def convert_to_pdf(input_data, mime_type, file_name, stats=None):
     """
     Belgeyi türüne göre PDF'e dönüştürür
     
@@ -418,6 +441,7 @@ def convert_to_pdf(input_data, mime_type, file_name):
         input_data (bytes): Dosya içeriği
         mime_type (str): MIME türü
         file_name (str): Dosya adı (uzantıyı tespit için kullanılır)
+        stats (dict): Verilirse dönüştürücüye özgü ölçümlerle doldurulur
     
     Returns:
         bytes: PDF içeriği
@@ -434,7 +458,7 @@ def convert_to_pdf(input_data, mime_type, file_name):
         
         # XLSX dönüştürme
         elif mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" or lower_name.endswith('.xlsx'):
-            return xlsx_to_pdf(input_data)
+            return xlsx_to_pdf(input_data, stats)
         
         # PPTX dönüştürme
         elif mime_type == "application/vnd.openxmlformats-officedocument.presentationml.presentation" or lower_name.endswith('.pptx'):
@@ -442,7 +466,7 @@ def convert_to_pdf(input_data, mime_type, file_name):
         
         # CSV dönüştürme
         elif mime_type == "text/csv" or lower_name.endswith('.csv'):
-            return csv_to_pdf(input_data)
+            return csv_to_pdf(input_data, stats)
         
         # TXT dönüştürme
         elif mime_type == "text/plain" or lower_name.endswith('.txt'):
@@ -469,6 +493,76 @@ def convert_to_pdf(input_data, mime_type, file_name):
         raise e
 
 
+def convert_to_pdf_file(input_data, mime_type, file_name, output_path, stats=None):
+    """
+    Belgeyi PDF'e dönüştürüp dosyaya yazar. CSV ve XLSX tabloları parçalar
+    halinde diske yazılıp doğrudan çıkış dosyasında birleştirilir; diğer türler
+    convert_to_pdf ile bellekte üretilir.
+    
+    Args:
+        input_data (bytes): Dosya içeriği
+        mime_type (str): MIME türü
+        file_name (str): Dosya adı (uzantıyı tespit için kullanılır)
+        output_path (str): Çıkış PDF dosya yolu
+        stats (dict): Verilirse dönüştürücüye özgü ölçümlerle doldurulur
+    """
+    lower_name = file_name.lower()
+    # convert_to_pdf ile aynı öncelik: XLSX, CSV'den önce denetlenir
+    if mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" or lower_name.endswith('.xlsx'):
+        print(f"Dönüştürülüyor: {file_name}, MIME: {mime_type}")
+        xlsx_to_pdf(input_data, stats, output_path)
+        return
+    if mime_type == "text/csv" or lower_name.endswith('.csv'):
+        print(f"Dönüştürülüyor: {file_name}, MIME: {mime_type}")
+        csv_to_pdf(input_data, stats, output_path)
+        return
+    pdf_bytes = convert_to_pdf(input_data, mime_type, file_name, stats)
+    with open(output_path, "wb") as f:
+        f.write(pdf_bytes)
+
+
+def _cache_setting(mime_type, file_name):
+    """Önbellek anahtarının ayar ve sürüm bölümlerini döndürür"""
+    from pdf_fonts import font_version
+    extension = os.path.splitext(file_name.lower())[1]
+    return f"{mime_type}|{extension}", f"{source_version(*CONVERTER_SOURCES)}|{font_version()}"
+
+
+def convert_to_pdf_file_cached(input_data, mime_type, file_name, output_path, stats=None):
+    """
+    convert_to_pdf_file işlemini convert_to_pdf_cached ile aynı önbellek
+    anahtarları üzerinden çalıştırır
+    
+    Returns:
+        Önbellek bilgisi sözlüğü veya None
+    """
+    setting, version = _cache_setting(mime_type, file_name)
+    return cached_bytes_to_file_operation(
+        "convert", setting, version, input_data, output_path,
+        lambda: convert_to_pdf_file(input_data, mime_type, file_name, output_path, stats)
+    )
+
+
+def convert_to_pdf_cached(input_data, mime_type, file_name, stats=None):
+    """
+    convert_to_pdf işlemini içerik adresli önbellek üzerinden çalıştırır.
+    Önbellek anahtarı dönüştürücü kaynak kodunun özetini içerir, böylece kod
+    değiştiğinde eski sonuçlar kullanılmaz.
+    
+    Returns:
+        (PDF içeriği, önbellek bilgisi sözlüğü veya None)
+    """
+    setting, version = _cache_setting(mime_type, file_name)
+    return cached_bytes_operation(
+        "convert", setting, version, input_data,
+        lambda: convert_to_pdf(input_data, mime_type, file_name, stats)
+    )
+
+
+# Modülün kendi yükleme süresi (arka uçlar hariç)
+_MODULE_LOAD_TIME = time.perf_counter() - _MODULE_LOAD_START
+
+
 def main():
     """
     Ana fonksiyon - Node.js'den çağrılacak
@@ -480,35 +574,52 @@ def main():
     
     Çıktı:
     Base64 formatında PDF içeriği (stdout'a yazılır)
+    
+    Base64 yerine --stdin veya --input <yol> ile ham dosya, --output <yol> veya
+    --binary-stdout ile ham PDF çıktısı kullanılabilir (bkz. transport.py).
+    
+    --self-check: Arka uçların erişilebilirliğini ve import sürelerini JSON olarak yazar
     """
+    if sys.argv[1:] == ["--self-check"]:
+        print(json.dumps(self_check(), indent=2))
+        return
+    
+    transport = None
+    temp_dir = None
     try:
-        if len(sys.argv) < 4:
+        transport = Transport()
+        if not transport.has_input or len(transport.args) < 2:
             raise ValueError("Eksik argümanlar. Beklenen format: <base64_file_content> <mime_type> <file_name>")
         
         # Argümanları al
-        base64_content = sys.argv[1]
-        mime_type = sys.argv[2]
-        file_name = sys.argv[3]
+        mime_type = transport.args[0]
+        file_name = transport.args[1]
         
         print(f"İşleniyor: {file_name}, MIME: {mime_type}")
         
-        # Base64'ü decode et
-        file_content = base64.b64decode(base64_content)
-        
-        # Dönüştürme işlemi
-        pdf_bytes = convert_to_pdf(file_content, mime_type, file_name)
+        # Dosya içeriğini oku
+        file_content = transport.read_input_bytes()
         
-        # Sonucu base64 olarak encode et ve stdout'a yaz
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
+        # Dönüştürme işlemi (aynı içerik daha önce dönüştürüldüyse önbellekten al).
+        # PDF dosyaya yazılır ve oradan akıtılır; büyük tablolar belleğe alınmaz.
+        output_path = transport.output_path
+        if not output_path:
+            temp_dir = tempfile.mkdtemp(prefix="novapdf-convert-")
+            output_path = os.path.join(temp_dir, "output.pdf")
+        stats = {}
+        cache_info = convert_to_pdf_file_cached(file_content, mime_type, file_name, output_path, stats)
         
         # JSON formatında sonuç döndür
         result = {
             "success": True,
-            "pdf_base64": pdf_base64,
             "original_size": len(file_content),
-            "pdf_size": len(pdf_bytes)
+            "pdf_size": os.path.getsize(output_path)
         }
-        print(json.dumps(result))
+        if cache_info:
+            result["cache"] = cache_info
+        if stats:
+            result["stats"] = stats
+        transport.emit_file(result, output_path, "pdf_base64")
         
     except Exception as e:
         # Hata durumunda hata mesajı döndür
@@ -516,9 +627,17 @@ def main():
             "success": False,
             "error": str(e)
         }
-        print(json.dumps(error_result))
+        if transport is not None:
+            transport.emit(error_result)
+        else:
+            print(json.dumps(error_result))
         sys.exit(1)
-
+    
+    finally:
+        if transport is not None:
+            transport.close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
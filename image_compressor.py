@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Görsel Yeniden Sıkıştırma Motoru
+Ghostscript'in tüm belgeyi yeniden çizmesi yerine yalnızca görsel nesnelerini
+(Image XObject) ele alır: sayfadaki gösterim boyutuna göre hedef DPI'ın üstünde
+kalan görselleri küçültür, JPEG veya Flate olarak yeniden kodlar ve aynı nesne
+numarasında yerinde değiştirir. Fontlar, vektörler ve metin dokunulmadan kalır.
+Görsellerin çözülmesi, küçültülmesi ve kodlanması iş parçacığı havuzunda yapılır
+(Pillow bu işlemler sırasında GIL'i bırakır).
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import base64
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pymupdf
+from PIL import Image
+
+import metrics
+from transport import Transport, ArgumentParser
+from result_cache import cached_file_operation, source_version
+from pdf_analyzer import analyze_pdf
+
+# Sıkıştırma seviyesine göre hedef çözünürlük ve JPEG kalitesi.
+# Lossless kaynaklar (Flate, PNG vb.) yalnızca "high" seviyede JPEG'e çevrilir.
+IMAGE_LEVEL_SETTINGS = {
+    "light": {"dpi": 200, "quality": 85, "lossy_all": False},
+    "medium": {"dpi": 150, "quality": 75, "lossy_all": False},
+    "high": {"dpi": 96, "quality": 60, "lossy_all": True},
+}
+
+# Hedef DPI'ın bu oranına kadar olan görseller yeniden örneklenmez
+DPI_TOLERANCE = 1.1
+
+# Bu boyuttan küçük görsel akışlarıyla uğraşmaya değmez
+MIN_IMAGE_BYTES = 2048
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+# Hedef boyut modunda denenen ayar basamakları (en az kayıplıdan en agresife);
+# çıktı boyutunun basamaklarla azaldığı varsayılır
+TARGET_LADDER = [
+    {"dpi": 300, "quality": 85, "lossy_all": False},
+    {"dpi": 200, "quality": 85, "lossy_all": False},
+    {"dpi": 200, "quality": 75, "lossy_all": True},
+    {"dpi": 150, "quality": 75, "lossy_all": True},
+    {"dpi": 150, "quality": 65, "lossy_all": True},
+    {"dpi": 120, "quality": 60, "lossy_all": True},
+    {"dpi": 96, "quality": 60, "lossy_all": True},
+    {"dpi": 96, "quality": 50, "lossy_all": True},
+    {"dpi": 72, "quality": 45, "lossy_all": True},
+    {"dpi": 60, "quality": 35, "lossy_all": True},
+    {"dpi": 50, "quality": 30, "lossy_all": True},
+]
+
+# Bir turda paralel çalışan en fazla deneme sıkıştırması
+MAX_PARALLEL_PROBES = 4
+
+# JPEG kalitesine göre yaklaşık boyut oranı (kaynak ~90 kalite kabul edilir)
+JPEG_SIZE_RATIOS = {30: 0.26, 40: 0.32, 50: 0.38, 60: 0.45, 70: 0.54, 80: 0.68, 90: 1.0, 95: 1.35}
+
+# Kayıpsız (Flate) görselin aynı kalitede JPEG'e çevrilince yaklaşık boyut oranı
+LOSSLESS_TO_JPEG_RATIO = 0.25
+
+# Yeniden kodlamada desteklenen kaynak biçimleri
+_LOSSY_SOURCES = ("jpeg", "jpg", "jpx")
+_SKIPPED_SOURCES = ("jb2", "jbig2", "fax")
+
+
+def image_settings_for_level(compression_level):
+    """Sıkıştırma seviyesine karşılık gelen görsel ayarlarını döndürür"""
+    return IMAGE_LEVEL_SETTINGS.get(compression_level, IMAGE_LEVEL_SETTINGS["medium"])
+
+
+def collect_images(doc):
+    """
+    Belgedeki görsel nesnelerini ve en büyük gösterim boyutlarını toplar
+
+    Args:
+        doc: pymupdf belgesi
+
+    Returns:
+        xref -> (en büyük gösterim genişliği, yüksekliği) inç cinsinden
+    """
+    placements = {}
+    for page in doc:
+        for info in page.get_image_info(xrefs=True):
+            xref = info.get("xref", 0)
+            if xref <= 0:
+                # Satır içi görseller ayrı nesne değildir
+                continue
+            bbox = pymupdf.Rect(info["bbox"])
+            width, height = bbox.width / 72, bbox.height / 72
+            old = placements.get(xref, (0.0, 0.0))
+            placements[xref] = (max(old[0], width), max(old[1], height))
+    return placements
+
+
+def _read_job(doc, xref, placement, settings):
+    """
+    Görselin ham verisini ve özelliklerini okur; işlenmeyecekse None döndürür.
+    pymupdf belgesi iş parçacıkları arasında paylaşılamadığı için bu adım ana
+    iş parçacığında yapılır.
+    """
+    if doc.xref_get_key(xref, "ImageMask")[1] == "true" or doc.xref_get_key(xref, "Mask")[0] != "null":
+        # Maske görselleri ve renk anahtarlı maskeler kayıplı kodlamayı kaldırmaz
+        return None
+    if doc.xref_get_key(xref, "Decode")[0] != "null":
+        return None
+
+    raw_size = len(doc.xref_stream_raw(xref))
+    if raw_size < MIN_IMAGE_BYTES:
+        return None
+
+    image = doc.extract_image(xref)
+    if not image or image["ext"] in _SKIPPED_SOURCES or image["bpc"] < 8 or image["colorspace"] not in (1, 3):
+        return None
+
+    return {
+        "xref": xref,
+        "data": image["image"],
+        "ext": image["ext"],
+        "width": image["width"],
+        "height": image["height"],
+        "placement": placement,
+        "raw_size": raw_size,
+        "settings": settings
+    }
+
+
+def recompress_image(job):
+    """
+    Tek bir görseli gerekirse küçültür ve yeniden kodlar
+
+    Args:
+        job: _read_job ile hazırlanan görsel bilgisi
+
+    Returns:
+        Değiştirilecek akış bilgisi veya kazanç yoksa None
+    """
+    settings = job["settings"]
+    width, height = job["width"], job["height"]
+    display_w, display_h = job["placement"]
+
+    # Gösterim boyutunda hedef DPI için gereken piksel sayısı
+    target_w = max(1, round(display_w * settings["dpi"]))
+    target_h = max(1, round(display_h * settings["dpi"]))
+    downsample = width > target_w * DPI_TOLERANCE and height > target_h * DPI_TOLERANCE
+
+    lossy = job["ext"] in _LOSSY_SOURCES or settings["lossy_all"]
+    if not downsample and not lossy:
+        return None
+
+    with Image.open(io.BytesIO(job["data"])) as img:
+        img.load()
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB" if len(img.getbands()) >= 3 else "L")
+        if downsample:
+            img = img.resize((target_w, target_h), Image.LANCZOS)
+
+        if lossy:
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=settings["quality"], optimize=True)
+            stream = buffer.getvalue()
+            pdf_filter = "/DCTDecode"
+        else:
+            stream = zlib.compress(img.tobytes(), 9)
+            pdf_filter = "/FlateDecode"
+
+        result = {
+            "xref": job["xref"],
+            "stream": stream,
+            "filter": pdf_filter,
+            "width": img.width,
+            "height": img.height,
+            "colorspace": "/DeviceGray" if img.mode == "L" else "/DeviceRGB",
+            "downsampled": downsample
+        }
+    return result
+
+
+def _apply_replacement(doc, replacement):
+    """Yeni görsel akışını aynı xref numarasına yazar, tüm başvurular geçerli kalır"""
+    xref = replacement["xref"]
+    doc.update_stream(xref, replacement["stream"], compress=False)
+    doc.xref_set_key(xref, "Filter", replacement["filter"])
+    doc.xref_set_key(xref, "DecodeParms", "null")
+    doc.xref_set_key(xref, "Width", str(replacement["width"]))
+    doc.xref_set_key(xref, "Height", str(replacement["height"]))
+    doc.xref_set_key(xref, "BitsPerComponent", "8")
+    doc.xref_set_key(xref, "ColorSpace", replacement["colorspace"])
+    return len(doc.xref_stream_raw(xref))
+
+
+def recompress_images(input_path, output_path, target_dpi=150, jpeg_quality=75, lossy_all=False,
+                      workers=DEFAULT_WORKERS):
+    """
+    PDF'teki görselleri yeniden örnekleyip yeniden kodlar
+
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        target_dpi: Gösterim boyutunda hedeflenen çözünürlük
+        jpeg_quality: JPEG kalitesi (1-95)
+        lossy_all: Lossless kaynakları da JPEG'e çevir
+        workers: Görselleri işleyecek iş parçacığı sayısı
+
+    Returns:
+        Görsel istatistikleri sözlüğü
+    """
+    settings = {"dpi": target_dpi, "quality": jpeg_quality, "lossy_all": lossy_all}
+    stats = {
+        "images": 0,
+        "recompressed": 0,
+        "downsampled": 0,
+        "skipped": 0,
+        "bytes_before": 0,
+        "bytes_after": 0
+    }
+
+    with pymupdf.open(input_path) as doc:
+        with metrics.stage("collect"):
+            placements = collect_images(doc)
+            stats["images"] = len(placements)
+
+            jobs = []
+            for xref, placement in placements.items():
+                job = _read_job(doc, xref, placement, settings)
+                if job is None:
+                    stats["skipped"] += 1
+                else:
+                    jobs.append(job)
+        raw_sizes = {job["xref"]: job["raw_size"] for job in jobs}
+
+        def run(job):
+            try:
+                return recompress_image(job)
+            except Exception as e:
+                print(f"Görsel işlenemedi (xref {job['xref']}): {e}", file=sys.stderr)
+                return None
+
+        with metrics.stage("recompress"), ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # Sonuçlar geldikçe uygulanır; çözülmüş görsel verisi hemen serbest kalır
+            for replacement in executor.map(run, jobs):
+                if replacement is None:
+                    stats["skipped"] += 1
+                    continue
+                before = raw_sizes[replacement["xref"]]
+                # Büyüten değişiklikleri uygulama
+                if len(replacement["stream"]) >= before:
+                    stats["skipped"] += 1
+                    continue
+                after = _apply_replacement(doc, replacement)
+                stats["recompressed"] += 1
+                stats["downsampled"] += int(replacement["downsampled"])
+                stats["bytes_before"] += before
+                stats["bytes_after"] += after
+        del jobs
+
+        with metrics.stage("save"):
+            doc.save(output_path, garbage=3, deflate=True)
+    return stats
+
+
+def images_compress_file(input_path, output_path, compression_level="medium", workers=DEFAULT_WORKERS):
+    """
+    Görsel motoruyla diskteki bir PDF dosyasını sıkıştırır.
+    Aynı girdi ve seviye daha önce işlendiyse sonuç önbellekten alınır.
+
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        workers: Görselleri işleyecek iş parçacığı sayısı
+
+    Returns:
+        Orijinal ve sıkıştırılmış boyut bilgileri, görsel istatistikleri
+        (ve varsa önbellek bilgisi)
+    """
+    settings = image_settings_for_level(compression_level)
+    start = time.perf_counter()
+    image_stats = {}
+
+    def run(src, dst):
+        image_stats.update(recompress_images(
+            src, dst, settings["dpi"], settings["quality"], settings["lossy_all"], workers
+        ))
+
+    version = f"{pymupdf.VersionBind}|{Image.__version__}|{source_version(os.path.abspath(__file__))}"
+    cache_info = cached_file_operation(
+        "images", f"{settings['dpi']}|{settings['quality']}|{int(settings['lossy_all'])}",
+        version, input_path, output_path, run
+    )
+    image_stats["wall_time_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    result = {
+        "original_size": os.path.getsize(input_path),
+        "compressed_size": os.path.getsize(output_path),
+        "image_stats": image_stats
+    }
+    if cache_info:
+        result["cache"] = cache_info
+    return result
+
+
+def estimate_size(analysis, settings):
+    """
+    Ön analizdeki görsel boyutları ve çözünürlüklerinden, verilen ayarlarla
+    elde edilecek dosya boyutunu kabaca tahmin eder (hiçbir görsel çözülmez)
+
+    Args:
+        analysis: pdf_analyzer.analyze_pdf sonucu
+        settings: {"dpi", "quality", "lossy_all"}
+
+    Returns:
+        Tahmini boyut (bayt)
+    """
+    total = analysis["file_size"] - analysis["image_bytes"]
+    quality_ratio = _jpeg_size_ratio(settings["quality"])
+    for image in analysis.get("image_objects", {}).values():
+        size = image["bytes"]
+        if size < MIN_IMAGE_BYTES:
+            total += size
+            continue
+        dpi = image.get("dpi")
+        if dpi and dpi > settings["dpi"] * DPI_TOLERANCE:
+            size *= (settings["dpi"] / dpi) ** 2
+        if not image["lossless"]:
+            size *= quality_ratio
+        elif settings["lossy_all"]:
+            size *= quality_ratio * LOSSLESS_TO_JPEG_RATIO
+        total += size
+    return int(total)
+
+
+def _jpeg_size_ratio(quality):
+    """JPEG kalitesinin kaynağa (yaklaşık 90 kalite) göre boyut oranını ara değerlemeyle bulur"""
+    points = sorted(JPEG_SIZE_RATIOS.items())
+    if quality <= points[0][0]:
+        return points[0][1]
+    for (low_q, low_r), (high_q, high_r) in zip(points, points[1:]):
+        if quality <= high_q:
+            return low_r + (high_r - low_r) * (quality - low_q) / (high_q - low_q)
+    return points[-1][1]
+
+
+def _probe(job):
+    """Süreç havuzunda çalışır; tek bir ayar basamağıyla deneme sıkıştırması yapar"""
+    input_path, output_path, settings, workers = job
+    recompress_images(input_path, output_path, settings["dpi"], settings["quality"], settings["lossy_all"], workers)
+    return os.path.getsize(output_path)
+
+
+def _pick_probes(low, high, center, count):
+    """
+    Aralıktan denenecek basamakları seçer: ilk turda tahmin edilen basamak ve
+    ondan daha az kayıplı komşuları (tahmin kötümserse bunlardan biri seçilir),
+    sonraki turlarda aralığa eşit yayılmış noktalar (tek denemede ikiye bölme)
+    """
+    if center is not None:
+        picks = [center + offset for offset in range(-(count - 1), 1)]
+        picks = [min(high, max(low, index)) for index in picks]
+    elif count == 1:
+        picks = [(low + high) // 2]
+    else:
+        span = high - low
+        picks = [low + round(k * span / (count - 1)) for k in range(count)]
+    return sorted(set(picks))
+
+
+def compress_to_target_size(input_path, output_path, target_bytes, workers=DEFAULT_WORKERS):
+    """
+    Çıktıyı hedef boyutun altına indiren en az kayıplı görsel ayarını arar.
+    Önce ön analizden her basamağın boyutu tahmin edilir; ilk deneme tahminin
+    hedefi tutturduğu basamaktan başlar. Tahmin yalnızca bu ilk denemeyi
+    belirler: hedefin altında bir çıktı bulunduktan sonra da arama, daha az
+    kayıplı basamaklara doğru sınır bulunana kadar ikiye bölerek sürer.
+    Deneme sıkıştırmaları turlar halinde paralel çalışır. Hiçbir basamak
+    hedefi tutturamazsa en küçük çıktı döner.
+
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        target_bytes: Hedef en büyük boyut (bayt)
+        workers: Paralel deneme sayısı ve görsel iş parçacıkları için toplam işçi
+
+    Returns:
+        Arama istatistikleri (deneme sayısı, tur, süre, seçilen ayar)
+    """
+    start = time.perf_counter()
+    original_size = os.path.getsize(input_path)
+    stats = {"target_bytes": target_bytes, "probes": 0, "rounds": 0}
+    if original_size <= target_bytes:
+        shutil.copyfile(input_path, output_path)
+        stats.update(target_met=True, settings=None, search_ms=round((time.perf_counter() - start) * 1000, 2))
+        return stats
+
+    with metrics.stage("estimate"):
+        analysis = analyze_pdf(input_path)
+        estimates = [estimate_size(analysis, settings) for settings in TARGET_LADDER]
+    # Görsel yoksa basamaklar aynı çıktıyı verir; tek deneme yeterlidir
+    last = len(TARGET_LADDER) - 1 if analysis["images"] else 0
+    center = next((index for index, size in enumerate(estimates[:last + 1]) if size <= target_bytes), last)
+    stats["estimated_step"] = center
+
+    parallel = max(1, min(workers, MAX_PARALLEL_PROBES))
+    if multiprocessing.current_process().daemon:
+        # Süreç havuzu içinde (ör. converter_worker işçileri) alt süreç açılamaz
+        parallel = 1
+    threads = max(1, workers // parallel)
+    work_dir = tempfile.mkdtemp(prefix="target_size_")
+    sizes = {}
+    chosen = None
+    try:
+        low, high = 0, last
+        executor = ProcessPoolExecutor(max_workers=parallel) if parallel > 1 else None
+        try:
+            # Boyut basamaklarla azalır: low'dan öncekiler hedefi aşar, chosen hedefi tutturur
+            while low <= high:
+                picks = _pick_probes(low, high, center if stats["rounds"] == 0 else None, parallel)
+                jobs = [(input_path, os.path.join(work_dir, f"probe_{index}.pdf"), TARGET_LADDER[index], threads)
+                        for index in picks]
+                with metrics.stage("probe"):
+                    results = executor.map(_probe, jobs) if executor else map(_probe, jobs)
+                    sizes.update(zip(picks, results))
+                stats["rounds"] += 1
+                stats["probes"] += len(picks)
+                passing = [index for index in picks if sizes[index] <= target_bytes]
+                if passing:
+                    # Daha az kayıplı basamaklarda da tutturan olabilir; aralık onlara daralır
+                    chosen = min(passing) if chosen is None else min(chosen, min(passing))
+                    high = chosen - 1
+                failing = [index for index in picks if sizes[index] > target_bytes and index <= high]
+                if failing:
+                    # Başarısız basamağın öncesi de başarısızdır
+                    low = max(failing) + 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        target_met = chosen is not None
+        if chosen is None:
+            chosen = min(sizes, key=sizes.get)
+        best_path = os.path.join(work_dir, f"probe_{chosen}.pdf")
+        if sizes[chosen] >= original_size:
+            # Hiçbir deneme küçültmedi
+            shutil.copyfile(input_path, output_path)
+            stats["settings"] = None
+        else:
+            shutil.move(best_path, output_path)
+            stats["settings"] = dict(TARGET_LADDER[chosen])
+        stats["target_met"] = target_met
+        stats["estimated_size"] = estimates[chosen]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    stats["search_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return stats
+
+
+def images_compress_to_target(input_path, output_path, target_bytes, workers=DEFAULT_WORKERS):
+    """
+    Hedef boyut modunu önbellek üzerinden çalıştırır
+
+    Returns:
+        Orijinal ve sıkıştırılmış boyut bilgileri ve arama istatistikleri
+        (ve varsa önbellek bilgisi)
+    """
+    search = {}
+
+    def run(src, dst):
+        search.update(compress_to_target_size(src, dst, target_bytes, workers))
+
+    version = f"{pymupdf.VersionBind}|{Image.__version__}|{source_version(os.path.abspath(__file__))}"
+    cache_info = cached_file_operation("images-target", str(target_bytes), version, input_path, output_path, run)
+    result = {
+        "original_size": os.path.getsize(input_path),
+        "compressed_size": os.path.getsize(output_path),
+        "target_bytes": target_bytes,
+        "target_met": os.path.getsize(output_path) <= target_bytes
+    }
+    if search:
+        result["search"] = search
+    if cache_info:
+        result["cache"] = cache_info
+    return result
+
+
+def compress_pdf_with_images(input_data, compression_level="medium"):
+    """
+    Görsel motoruyla PDF dosyasını sıkıştırır
+
+    Args:
+        input_data: Base64 olarak kodlanmış PDF içeriği
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+
+    Returns:
+        Base64 olarak kodlanmış sıkıştırılmış PDF içeriği ve boyut bilgileri
+    """
+    try:
+        temp_dir = tempfile.mkdtemp()
+        input_path = os.path.join(temp_dir, "input.pdf")
+        output_path = os.path.join(temp_dir, "output.pdf")
+
+        try:
+            with open(input_path, "wb") as f:
+                f.write(base64.b64decode(input_data))
+
+            sizes = images_compress_file(input_path, output_path, compression_level)
+
+            with open(output_path, "rb") as f:
+                compressed_pdf_base64 = base64.b64encode(f.read()).decode("utf-8")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        return dict(sizes, compressed_pdf=compressed_pdf_base64, error=None)
+
+    except Exception as e:
+        return {
+            "error": str(e),
+            "original_size": 0,
+            "compressed_size": 0,
+            "compressed_pdf": ""
+        }
+
+
+def main():
+    """
+    Komut satırından çağrıldığında çalışır.
+    Beklenen argümanlar:
+    1. Base64 formatında PDF içeriği
+    2. Sıkıştırma seviyesi (light, medium, high)
+       veya --target-bytes N: çıktıyı N baytın altına indiren en az kayıplı ayar aranır
+
+    Base64 yerine --stdin veya --input <yol> ile ham PDF, --output <yol> veya
+    --binary-stdout ile ham çıktı kullanılabilir (bkz. transport.py).
+    """
+    transport = None
+    temp_dir = tempfile.mkdtemp()
+    try:
+        transport = Transport()
+        parser = ArgumentParser(description="Görsel yeniden sıkıştırma")
+        parser.add_argument("compression_level", nargs="?")
+        parser.add_argument("--target-bytes", type=int, default=None)
+        args = parser.parse_args(transport.args)
+        if not transport.has_input or not (args.compression_level or args.target_bytes):
+            raise ValueError("Geçersiz argüman sayısı. Base64 PDF ve sıkıştırma seviyesi gerekli.")
+        if args.target_bytes is not None and args.target_bytes <= 0:
+            raise ValueError("--target-bytes pozitif olmalı")
+
+        # Girdi zaten diskteyse doğrudan kullan, değilse geçici dosyaya yaz
+        if transport.input_path:
+            input_path = transport.input_path
+        else:
+            input_path = os.path.join(temp_dir, "input.pdf")
+            transport.write_input_file(input_path)
+
+        output_path = transport.output_path or os.path.join(temp_dir, "output.pdf")
+
+        if args.target_bytes:
+            sizes = images_compress_to_target(input_path, output_path, args.target_bytes)
+        else:
+            sizes = images_compress_file(input_path, output_path, args.compression_level)
+        transport.emit_file(dict(sizes, error=None), output_path, "compressed_pdf")
+
+    except Exception as e:
+        result = {
+            "error": str(e),
+            "original_size": 0,
+            "compressed_size": 0
+        }
+        if transport is not None:
+            transport.emit(result)
+        else:
+            print(json.dumps(result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Asenkron İş Servisi
+Büyük dosyalarda Node.js tarafının HTTP bağlantısını dakikalarca açık tutmaması
+için sıkıştırma ve dönüştürme işlerini kabul edip hemen bir iş kimliği döndüren
+yerel bir asyncio servisi. Dış araçları çalıştıran işler (gs, qpdf) iş
+parçacığı havuzunda, Python içinde CPU yoğun dönüştürmeler süreç havuzunda
+çalışır.
+
+Uç noktalar (HTTP/1.1, her bağlantıda tek istek):
+    POST   /jobs                 İş oluşturur, 202 ve {"id", "status"} döner
+                                 JSON gövde: {"type", "level", "mime_type", "file_name",
+                                              "data" (base64) veya "input_path"}
+                                 "input_path" yalnızca --input-dir verildiğinde ve
+                                 yol bu dizinin altındaysa kabul edilir
+                                 Ham gövde: belge baytları, ayarlar sorgu dizgisinde
+                                 (POST /jobs?type=compress&level=high)
+    GET    /jobs/<id>            İş durumu ve sonuç bilgileri
+    GET    /jobs/<id>/events     Durum değişikliklerini ve gs/qpdf işlerinde ilerleme
+                                 olaylarını (bkz. progress.py) iş bitene kadar JSON
+                                 satırları olarak akıtır (abonelik)
+    GET    /jobs/<id>/result     Sonuç PDF'i (application/pdf)
+    DELETE /jobs/<id>            Biten işi ve dosyalarını siler
+    GET    /health               Servis durumu ve iş sayıları
+
+İş türleri:
+    compress        Ghostscript (pdf_compressor.compress_pdf), "level": light/medium/high
+    compress_qpdf   QPDF (qpdf_compressor.qpdf_compress_file), "level": light/medium/high
+    convert         Belgeyi PDF'e dönüştürür (doc_converter_all), "mime_type", "file_name"
+
+SIGTERM/SIGINT alındığında servis yeni iş kabul etmez (503), kuyruktaki ve
+çalışan işleri bitirir, sonuçların alınabilmesi için kısa bir süre daha açık
+kalır ve kapanır.
+
+Kullanım: python3 job_service.py [--host 127.0.0.1] [--port 8765] [--socket YOL]
+                                 [--workers N] [--result-ttl SANİYE] [--drain-timeout SANİYE]
+                                 [--input-dir DİZİN]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import signal
+import base64
+import asyncio
+import tempfile
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from transport import ArgumentParser
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Biten işlerin sonuçlarının saklanma süresi (saniye)
+DEFAULT_RESULT_TTL = 3600
+# Kapanışta işlerin bitmesi için beklenecek en uzun süre (saniye)
+DEFAULT_DRAIN_TIMEOUT = 600
+# İşler bittikten sonra sonuçların alınabilmesi için açık kalma süresi (saniye)
+DRAIN_GRACE = 5
+
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+
+TERMINAL_STATES = ("done", "failed")
+
+STATUS_TEXT = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 411: "Length Required",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"
+}
+
+
+class RequestError(Exception):
+    """HTTP hata yanıtına çevrilen istek hatası"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _compress_job(input_path, output_path, level, progress=None):
+    import pdf_compressor
+
+    pdf_compressor.compress_pdf(input_path, output_path, level, progress)
+    return {
+        "original_size": os.path.getsize(input_path),
+        "compressed_size": os.path.getsize(output_path)
+    }
+
+
+def _compress_qpdf_job(input_path, output_path, level, progress=None):
+    # compress_pdf_with_qpdf'in dosya tabanlı çekirdeği; base64 kopyası oluşmaz
+    import qpdf_compressor
+
+    return qpdf_compressor.qpdf_compress_file(input_path, output_path, level, progress)
+
+
+def _convert_job(input_path, output_path, mime_type, file_name):
+    """Süreç havuzunda çalışır; girdiyi dosyadan okur, PDF'i dosyaya yazar"""
+    import doc_converter_all
+
+    with open(input_path, "rb") as f:
+        file_content = f.read()
+    stats = {}
+    cache_info = doc_converter_all.convert_to_pdf_file_cached(file_content, mime_type, file_name, output_path, stats)
+    result = {"original_size": len(file_content), "pdf_size": os.path.getsize(output_path)}
+    if cache_info:
+        result["cache"] = cache_info
+    if stats:
+        result["stats"] = stats
+    return result
+
+
+def _init_process_worker():
+    # Dönüştürücülerin tanılama çıktıları servis günlüğüne gitsin
+    sys.stdout = sys.stderr
+
+
+class Job:
+    """Tek bir işin durumu ve aboneleri"""
+
+    def __init__(self, job_type, params, input_path, output_path):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.params = params
+        self.input_path = input_path
+        self.output_path = output_path
+        self.status = "queued"
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.subscribers = []
+
+    def to_dict(self):
+        info = {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "created": round(self.created, 3)
+        }
+        if self.started:
+            info["queue_wait_ms"] = round((self.started - self.created) * 1000, 2)
+        if self.finished:
+            info["run_ms"] = round((self.finished - self.started) * 1000, 2)
+        elif self.progress:
+            info["progress"] = self.progress
+        if self.result is not None:
+            info["result"] = self.result
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class JobService:
+    """İşleri kabul eden, çalıştıran ve HTTP üzerinden sunan servis"""
+
+    def __init__(self, work_dir, workers=DEFAULT_WORKERS, result_ttl=DEFAULT_RESULT_TTL, input_dir=None):
+        self.work_dir = work_dir
+        self.result_ttl = result_ttl
+        # "input_path" ile okunabilecek tek dizin; None ise yol ile girdi kapalıdır
+        self.input_dir = os.path.realpath(input_dir) if input_dir else None
+        self.jobs = {}
+        self.draining = False
+        self.tool_executor = ThreadPoolExecutor(max_workers=workers)
+        self.process_executor = None
+        self.workers = workers
+        # Havuzlar kendi kuyruklarını tutar; durumun "running" olması için yer ayrıca sayılır
+        self.slots = {"tool": asyncio.Semaphore(workers), "process": asyncio.Semaphore(workers)}
+        self.tasks = set()
+        self.server = None
+
+    # --- İş yönetimi ---
+
+    def _executor(self, job_type):
+        if job_type == "convert":
+            if self.process_executor is None:
+                import doc_converter_all
+
+                # Arka uçları bir kez yükle; fork ile başlayan işçiler hazır devralır
+                doc_converter_all.preload_backends()
+                self.process_executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_process_worker
+                )
+            return "process", self.process_executor
+        return "tool", self.tool_executor
+
+    def _job_call(self, job):
+        if job.type in ("compress", "compress_qpdf"):
+            # Araç işleri iş parçacığında çalışır; ilerleme olayları olay döngüsüne aktarılır
+            loop = asyncio.get_running_loop()
+            progress = lambda event: loop.call_soon_threadsafe(self.report_progress, job, event)
+            function = _compress_job if job.type == "compress" else _compress_qpdf_job
+            return function, (job.input_path, job.output_path, job.params["level"], progress)
+        return _convert_job, (job.input_path, job.output_path, job.params["mime_type"], job.params["file_name"])
+
+    def create_job(self, params):
+        """Parametreleri doğrular ve girdi dosyası henüz yazılmamış bir iş oluşturur"""
+        if not isinstance(params, dict):
+            raise RequestError(400, "İstek gövdesi bir JSON nesnesi olmalı")
+        for name in ("type", "level", "mime_type", "file_name", "data", "input_path"):
+            if name in params and not isinstance(params[name], str):
+                raise RequestError(400, f"'{name}' bir metin olmalı")
+        job_type = params.get("type", "compress")
+        if job_type not in ("compress", "compress_qpdf", "convert"):
+            raise RequestError(400, f"Desteklenmeyen iş türü: {job_type}")
+        job_params = {}
+        if job_type == "convert":
+            if not params.get("mime_type") and not params.get("file_name"):
+                raise RequestError(400, "Dönüştürme için mime_type veya file_name gerekli")
+            job_params["mime_type"] = params.get("mime_type", "")
+            job_params["file_name"] = params.get("file_name", "")
+        else:
+            job_params["level"] = params.get("level", "medium")
+
+        job_dir = tempfile.mkdtemp(prefix="job-", dir=self.work_dir)
+        return Job(job_type, job_params, os.path.join(job_dir, "input"), os.path.join(job_dir, "output.pdf"))
+
+    def start_job(self, job):
+        self.jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, job):
+        kind, executor = self._executor(job.type)
+        async with self.slots[kind]:
+            job.status = "running"
+            job.started = time.time()
+            self.publish(job)
+            function, args = self._job_call(job)
+            try:
+                job.result = await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+                job.status = "done"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished = time.time()
+                # Girdi artık gerekmiyor
+                try:
+                    os.unlink(job.input_path)
+                except OSError:
+                    pass
+        self.publish(job)
+
+    def publish(self, job, event=None):
+        """Abonelere durum (veya ilerleme) olayı gönderir"""
+        event = event or job.to_dict()
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def report_progress(self, job, event):
+        if job.status == "running":
+            job.progress = event
+            self.publish(job, dict(event, id=job.id))
+
+    def remove_job(self, job):
+        self.jobs.pop(job.id, None)
+        shutil.rmtree(os.path.dirname(job.output_path), ignore_errors=True)
+
+    def active_count(self):
+        return sum(1 for job in self.jobs.values() if job.status not in TERMINAL_STATES)
+
+    async def purge_expired(self):
+        """Saklama süresi dolan sonuçları düzenli olarak siler"""
+        while True:
+            await asyncio.sleep(min(60, self.result_ttl))
+            now = time.time()
+            for job in list(self.jobs.values()):
+                if job.finished and now - job.finished > self.result_ttl:
+                    self.remove_job(job)
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, target, headers = await self._read_head(reader)
+                await self._dispatch(method, target, headers, reader, writer)
+            except RequestError as e:
+                await self._send_json(writer, e.status, {"error": str(e)})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                print(f"İstek işlenemedi: {type(e).__name__}: {e}", file=sys.stderr)
+                await self._send_json(writer, 500, {"error": "Sunucu hatası"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_head(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise RequestError(400, "İstek başlığı çok büyük")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise RequestError(400, "Geçersiz istek satırı")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    async def _dispatch(self, method, target, headers, reader, writer):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            await self._send_json(writer, 200, {
+                "status": "draining" if self.draining else "ok",
+                "active": self.active_count(),
+                "jobs": len(self.jobs)
+            })
+            return
+
+        if parts == ["jobs"]:
+            if method != "POST":
+                raise RequestError(405, "Yalnızca POST desteklenir")
+            job = await self._accept(dict(parse_qsl(url.query)), headers, reader)
+            await self._send_json(writer, 202, {"id": job.id, "status": job.status})
+            return
+
+        if len(parts) < 2 or parts[0] != "jobs" or parts[1] not in self.jobs:
+            raise RequestError(404, "İş bulunamadı")
+        job = self.jobs[parts[1]]
+        action = parts[2] if len(parts) > 2 else None
+
+        if action is None and method == "GET":
+            await self._send_json(writer, 200, job.to_dict())
+        elif action is None and method == "DELETE":
+            if job.status not in TERMINAL_STATES:
+                raise RequestError(409, "Çalışan iş silinemez")
+            self.remove_job(job)
+            await self._send_json(writer, 200, {"id": job.id, "deleted": True})
+        elif action == "events" and method == "GET":
+            await self._stream_events(job, writer)
+        elif action == "result" and method == "GET":
+            await self._send_result(job, writer)
+        else:
+            raise RequestError(405, "Desteklenmeyen istek")
+
+    async def _accept(self, query, headers, reader):
+        if self.draining:
+            raise RequestError(503, "Servis kapanıyor, yeni iş kabul edilmiyor")
+        if "content-length" not in headers:
+            raise RequestError(411, "Content-Length gerekli")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise RequestError(400, "Geçersiz Content-Length")
+        if length < 0:
+            raise RequestError(400, "Geçersiz Content-Length")
+        if length > MAX_UPLOAD_BYTES:
+            raise RequestError(413, "Belge çok büyük")
+
+        if headers.get("content-type", "").startswith("application/json"):
+            body = await reader.readexactly(length)
+            # Büyük base64 gövdelerde ayrıştırma, çözme ve diske yazma olay
+            # döngüsünü bloklamasın diye iş parçacığında yapılır
+            try:
+                params = await asyncio.to_thread(json.loads, body)
+            except ValueError as e:
+                raise RequestError(400, f"Geçersiz JSON: {e}")
+            job = self.create_job(params)
+            try:
+                await asyncio.to_thread(self._write_input, job, params)
+            except BaseException as e:
+                # Hangi hata olursa olsun iş dizini geride kalmaz
+                self.remove_job(job)
+                if isinstance(e, (OSError, ValueError)):
+                    raise RequestError(400, f"Girdi okunamadı: {e}")
+                raise
+        else:
+            # Ham gövde belleğe alınmadan parça parça dosyaya yazılır
+            job = self.create_job(query)
+            f = await asyncio.to_thread(open, job.input_path, "wb")
+            try:
+                remaining = length
+                while remaining:
+                    chunk = await reader.read(min(COPY_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise ConnectionError("Gövde eksik")
+                    await asyncio.to_thread(f.write, chunk)
+                    remaining -= len(chunk)
+            except BaseException:
+                f.close()
+                self.remove_job(job)
+                raise
+            f.close()
+
+        self.start_job(job)
+        return job
+
+    def _write_input(self, job, params):
+        """JSON gövdedeki girdiyi iş dizinine yazar (iş parçacığında çalışır)"""
+        if params.get("input_path"):
+            shutil.copyfile(self._allowed_input(params["input_path"]), job.input_path)
+        elif params.get("data"):
+            data = base64.b64decode(params["data"])
+            if not data:
+                raise RequestError(400, "'data' boş veya geçersiz base64")
+            with open(job.input_path, "wb") as f:
+                f.write(data)
+        else:
+            raise RequestError(400, "'data' veya 'input_path' gerekli")
+
+    def _allowed_input(self, path):
+        """JSON gövdedeki "input_path" değerini izin verilen dizine göre denetler
+
+        Args:
+            path: İstemcinin gönderdiği dosya yolu
+
+        Returns:
+            str: Sembolik bağlantıları çözülmüş, izin verilen dizindeki yol
+        """
+        if self.input_dir is None:
+            raise RequestError(400, "'input_path' kapalı, 'data' kullanın")
+        real = os.path.realpath(str(path))
+        if os.path.commonpath([real, self.input_dir]) != self.input_dir or not os.path.isfile(real):
+            raise RequestError(400, "'input_path' izin verilen dizinde değil")
+        return real
+
+    async def _stream_events(self, job, writer):
+        queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            writer.write(self._head(200, "application/x-ndjson"))
+            event = job.to_dict()
+            while True:
+                writer.write(json.dumps(event).encode("utf-8") + b"\n")
+                await writer.drain()
+                if event.get("status") in TERMINAL_STATES:
+                    break
+                event = await queue.get()
+        finally:
+            job.subscribers.remove(queue)
+
+    async def _send_result(self, job, writer):
+        if job.status != "done":
+            raise RequestError(409, f"İş henüz tamamlanmadı (durum: {job.status})")
+        size = os.path.getsize(job.output_path)
+        writer.write(self._head(200, "application/pdf", size))
+        # Dosya okumaları olay döngüsünü bloklamasın diye iş parçacığında yapılır
+        f = await asyncio.to_thread(open, job.output_path, "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            f.close()
+
+    @staticmethod
+    def _head(status, content_type, length=None):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", f"Content-Type: {content_type}",
+                 "Connection: close"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(self._head(status, "application/json", len(body)) + body)
+        await writer.drain()
+
+    # --- Yaşam döngüsü ---
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None,
+                    drain_timeout=DEFAULT_DRAIN_TIMEOUT):
+        loop = asyncio.get_running_loop()
+        # Dönüştürme havuzunu iş parçacıkları başlamadan ve ilk iş gelmeden hazırla
+        self._executor("convert")
+        if socket_path:
+            self.server = await asyncio.start_unix_server(self.handle, socket_path, limit=MAX_HEADER_BYTES)
+            address = socket_path
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+            address = f"http://{host}:{self.server.sockets[0].getsockname()[1]}"
+        print(f"İş servisi hazır: {address}", file=sys.stderr)
+
+        stop = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+        purge = loop.create_task(self.purge_expired())
+
+        try:
+            await stop.wait()
+            await self.drain(drain_timeout)
+        finally:
+            purge.cancel()
+            self.server.close()
+            await self.server.wait_closed()
+            self.tool_executor.shutdown(wait=False, cancel_futures=True)
+            if self.process_executor is not None:
+                self.process_executor.shutdown(wait=False, cancel_futures=True)
+            if socket_path:
+                try:
+                    os.unlink(socket_path)
+                except OSError:
+                    pass
+
+    async def drain(self, timeout):
+        """Yeni işleri reddeder, mevcut işlerin bitmesini bekler"""
+        self.draining = True
+        print(f"Kapanıyor: {self.active_count()} işin bitmesi bekleniyor", file=sys.stderr)
+        if self.tasks:
+            done, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+            if pending:
+                print(f"Zaman aşımı: {len(pending)} iş tamamlanamadı", file=sys.stderr)
+        # Abonelerin ve bekleyen istemcilerin sonuçları alabilmesi için kısa süre açık kal
+        await asyncio.sleep(DRAIN_GRACE)
+
+
+def main():
+    parser = ArgumentParser(description="Asenkron sıkıştırma/dönüştürme iş servisi")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="TCP yerine Unix soketi yolu")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--result-ttl", type=float, default=DEFAULT_RESULT_TTL)
+    parser.add_argument("--drain-timeout", type=float, default=DEFAULT_DRAIN_TIMEOUT)
+    parser.add_argument("--input-dir", help="JSON \"input_path\" ile okunabilecek dizin (verilmezse kapalı)")
+    try:
+        args = parser.parse_args()
+    except ValueError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.workers < 1 or args.result_ttl <= 0:
+        print("Hata: --workers ve --result-ttl pozitif olmalı", file=sys.stderr)
+        sys.exit(1)
+
+    work_dir = tempfile.mkdtemp(prefix="novapdf-jobs-")
+
+    async def run():
+        service = JobService(work_dir, args.workers, args.result_ttl, args.input_dir)
+        await service.serve(args.host, args.port, args.socket, args.drain_timeout)
+
+    try:
+        asyncio.run(run())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aşama Ölçümleri
+Her giriş noktası için aşama sürelerini (girdi çözme, geçici dosya yazma,
+gs/qpdf alt süreci, FPDF yerleşimi, yeniden kodlama, ...), giriş/çıkış bayt
+sayılarını ve en yüksek RSS değerini toplar.
+
+Ölçümler istenirse betiğin yazdırdığı JSON sonucuna "metrics" anahtarıyla
+eklenir ve yerel bir ölçüm dosyasına (JSON satırları veya Prometheus metin
+biçimi) kaydedilir.
+
+Ortam değişkenleri:
+    NOVAPDF_METRICS=1               Ölçümleri JSON sonucuna ekler (--metrics ile aynı)
+    NOVAPDF_METRICS_FILE            Ölçümlerin kaydedileceği dosya
+    NOVAPDF_METRICS_FORMAT          "jsonl" veya "prometheus"
+                                    (varsayılan: uzantı .prom ise prometheus, değilse jsonl)
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import resource
+import tempfile
+import threading
+from contextlib import contextmanager
+
+METRIC_PREFIX = "novapdf"
+
+# Prometheus dosyası için birikimli sayaçların tutulduğu yan dosyanın uzantısı
+STATE_SUFFIX = ".state.json"
+
+
+def peak_rss_mb():
+    """
+    Geçerli sürecin en yüksek RSS değerini MB olarak döndürür.
+    Linux'ta ru_maxrss exec sonrasında üst süreçten devralındığından
+    /proc/self/status içindeki VmHWM tercih edilir.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS bayt, Linux KB döndürür
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def children_peak_rss_mb():
+    """Beklenmiş alt süreçlerin (gs, qpdf, ...) en büyük RSS değerini MB olarak döndürür"""
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def include_requested():
+    """Ölçümlerin JSON sonucuna eklenmesinin ortam değişkeniyle istenip istenmediğini döndürür"""
+    return os.environ.get("NOVAPDF_METRICS", "0").lower() in ("1", "true", "yes")
+
+
+class MetricsCollector:
+    """
+    Tek bir isteğin ölçümlerini toplar.
+    İç içe aşamalar "dış/iç" biçiminde adlandırılır; aynı aşama birden çok
+    kez çalışırsa süreleri toplanır.
+    """
+
+    def __init__(self, entry_point, include=None):
+        self.entry_point = entry_point
+        self.include = include_requested() if include is None else include
+        self.stages = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.recorded = False
+        # İş parçacıkları aşama yığınını paylaşmaz (ör. paralel gs parçaları)
+        self._local = threading.local()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Bir aşamanın süresini ölçer"""
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(name)
+        key = "/".join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[key] = self.stages.get(key, 0.0) + time.perf_counter() - start
+            stack.pop()
+
+    def add_bytes_in(self, count):
+        self.bytes_in += count
+
+    def add_bytes_out(self, count):
+        self.bytes_out += count
+
+    def snapshot(self):
+        """
+        Toplanan ölçümleri döndürür
+
+        Returns:
+            Aşama süreleri (ms), bayt sayıları ve en yüksek RSS içeren sözlük
+        """
+        return {
+            "entry_point": self.entry_point,
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "children_peak_rss_mb": round(children_peak_rss_mb(), 1)
+        }
+
+    def attach(self, result):
+        """
+        Ölçümler istenmişse sonucun "metrics" anahtarlı bir kopyasını döndürür
+
+        Args:
+            result: JSON sonuç sözlüğü
+
+        Returns:
+            Sonuç sözlüğü
+        """
+        if not self.include:
+            return result
+        return dict(result, metrics=self.snapshot())
+
+    def record(self, status="ok"):
+        """
+        Ölçümleri NOVAPDF_METRICS_FILE dosyasına kaydeder (istek başına bir kez)
+
+        Args:
+            status: "ok" veya "error"
+        """
+        if self.recorded:
+            return
+        self.recorded = True
+        path = os.environ.get("NOVAPDF_METRICS_FILE")
+        if not path:
+            return
+        snapshot = self.snapshot()
+        snapshot["status"] = status
+        try:
+            if _file_format(path) == "prometheus":
+                _record_prometheus(path, snapshot)
+            else:
+                _record_jsonl(path, snapshot)
+        except OSError as e:
+            # Ölçüm dosyası yazılamaması asıl işlemi bozmasın
+            print(f"Ölçümler kaydedilemedi: {e}", file=sys.stderr)
+
+
+_current = None
+
+
+def begin(entry_point, include=None):
+    """
+    Yeni bir istek için ölçüm toplamaya başlar
+
+    Args:
+        entry_point: Giriş noktası adı (ör. "compress_pdf")
+        include: Ölçümler JSON sonucuna eklensin mi (None ise NOVAPDF_METRICS)
+
+    Returns:
+        MetricsCollector
+    """
+    global _current
+    _current = MetricsCollector(entry_point, include)
+    return _current
+
+
+def current():
+    """Geçerli toplayıcıyı döndürür; begin çağrılmamışsa betik adıyla başlatır"""
+    if _current is None:
+        name = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+        return begin(name or "python")
+    return _current
+
+
+@contextmanager
+def request_scope(entry_point, include=None):
+    """
+    Aynı süreçte işlenen tek bir iş için geçici bir toplayıcı açar; blok
+    bitince önceki toplayıcı geri yüklenir (işçi süreçler, toplu dönüştürme)
+
+    Args:
+        entry_point: İş için kullanılacak giriş noktası adı
+        include: Ölçümler yanıta eklensin mi (None ise NOVAPDF_METRICS)
+    """
+    global _current
+    previous = _current
+    _current = MetricsCollector(entry_point, include)
+    try:
+        yield _current
+    finally:
+        _current = previous
+
+
+def stage(name):
+    """Geçerli isteğin bir aşamasını ölçen bağlam yöneticisi"""
+    return current().stage(name)
+
+
+def add_bytes_in(count):
+    current().add_bytes_in(count)
+
+
+def add_bytes_out(count):
+    current().add_bytes_out(count)
+
+
+def _file_format(path):
+    configured = os.environ.get("NOVAPDF_METRICS_FORMAT", "").lower()
+    if configured in ("prometheus", "prom"):
+        return "prometheus"
+    if configured in ("jsonl", "json"):
+        return "jsonl"
+    return "prometheus" if path.endswith(".prom") else "jsonl"
+
+
+@contextmanager
+def _locked(path):
+    with open(path + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _record_jsonl(path, snapshot):
+    snapshot = dict(snapshot, timestamp=round(time.time(), 3))
+    line = json.dumps(snapshot) + "\n"
+    # Tek write çağrısı ve kilit, eşzamanlı süreçlerin satırlarının karışmasını önler
+    with _locked(path), open(path, "a") as f:
+        f.write(line)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _record_prometheus(path, snapshot):
+    """
+    Birikimli sayaçları yan dosyada günceller ve Prometheus metin dosyasını
+    atomik olarak yeniden yazar (node_exporter textfile toplayıcısı yarım
+    yazılmış dosya görmez)
+    """
+    state_path = path + STATE_SUFFIX
+    with _locked(path):
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+
+        entry = state.setdefault(snapshot["entry_point"], {
+            "requests": {}, "stage_seconds": {}, "bytes_in": 0, "bytes_out": 0, "peak_rss_mb": 0
+        })
+        status = snapshot["status"]
+        entry["requests"][status] = entry["requests"].get(status, 0) + 1
+        entry["stage_seconds"]["total"] = entry["stage_seconds"].get("total", 0.0) + snapshot["total_ms"] / 1000
+        for name, ms in snapshot["stages_ms"].items():
+            entry["stage_seconds"][name] = entry["stage_seconds"].get(name, 0.0) + ms / 1000
+        entry["bytes_in"] += snapshot["bytes_in"]
+        entry["bytes_out"] += snapshot["bytes_out"]
+        entry["peak_rss_mb"] = max(entry["peak_rss_mb"], snapshot["peak_rss_mb"], snapshot["children_peak_rss_mb"])
+
+        directory = os.path.dirname(os.path.abspath(path))
+        _write_atomic(state_path, directory, json.dumps(state))
+        _write_atomic(path, directory, _prometheus_text(state))
+
+
+def _prometheus_text(state):
+    lines = []
+
+    def metric(name, kind, description, samples):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {description}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{METRIC_PREFIX}_{name}{labels} {value}")
+
+    metric("requests_total", "counter", "Number of requests by entry point and status", [
+        (_labels(entry_point=name, status=status), count)
+        for name, entry in sorted(state.items()) for status, count in sorted(entry["requests"].items())
+    ])
+    metric("stage_seconds_total", "counter", "Cumulative time spent in each stage", [
+        (_labels(entry_point=name, stage=stage_name), round(seconds, 6))
+        for name, entry in sorted(state.items()) for stage_name, seconds in sorted(entry["stage_seconds"].items())
+    ])
+    metric("bytes_in_total", "counter", "Cumulative input bytes", [
+        (_labels(entry_point=name), entry["bytes_in"]) for name, entry in sorted(state.items())
+    ])
+    metric("bytes_out_total", "counter", "Cumulative output bytes", [
+        (_labels(entry_point=name), entry["bytes_out"]) for name, entry in sorted(state.items())
+    ])
+    metric("peak_rss_megabytes", "gauge", "Highest peak RSS observed for a request", [
+        (_labels(entry_point=name), entry["peak_rss_mb"]) for name, entry in sorted(state.items())
+    ])
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, directory, text):
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+    try:
+        # mkstemp 0600 ile açar; node_exporter gibi başka kullanıcıyla çalışan
+        # toplayıcıların okuyabilmesi için normal dosya izinleri verilir
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
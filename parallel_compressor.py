@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sayfa Paralel Ghostscript Sıkıştırma
+Büyük PDF'ler tek bir Ghostscript süreci yerine sayfa aralıklarına bölünür,
+parçalar aynı anda çalışan gs süreçleriyle sıkıştırılır ve sonuç PyMuPDF ile
+sırasıyla birleştirilir. Birleştirmede bayt bayt aynı nesneler (ör. parçalarda
+tekrarlanan görseller ve renk profilleri) tek kopyaya indirilir.
+
+Ghostscript varsayılan olarak her parçada fontun yalnızca kullanılan karakterlerini
+farklı bir önekle gömer; bu alt kümeler birbirinden farklı olduğundan
+birleştirilemez. Bu yüzden parçalar -dSubsetFonts=false ile sıkıştırılır: her
+parça fontun aynı tam programını gömer ve birleştirmede bu akışlar tek kopyaya
+bağlanır (bkz. pdf_analyzer.dedupe_font_streams). Çok büyük fontlu belgelerde
+(ör. CJK) tam font parça başına alt kümelerden büyük olabilir; --subset-fonts
+alt kümelemeyi korur ve kalan fazlalık "duplicate_font_bytes" olarak bildirilir.
+
+Kullanım: python3 parallel_compressor.py <base64_data> <compression_level> [--chunk-pages N] [--workers N]
+                                         [--subset-fonts]
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pymupdf
+
+from transport import Transport, ArgumentParser
+from tool_io import run_tool
+from pdf_analyzer import dedupe_font_streams
+from pdf_compressor import build_gs_command, pdfsettings_for_level
+from result_cache import cached_file_operation, tool_version
+
+_FONT_FILE_KEYS = ("FontFile", "FontFile2", "FontFile3")
+
+# Varsayılan parça boyutu (sayfa) ve işçi sayısı
+DEFAULT_CHUNK_PAGES = 50
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+
+def split_pdf(input_path, work_dir, chunk_pages):
+    """
+    PDF'i sayfa aralıklarına böler
+
+    Args:
+        input_path: Giriş PDF dosya yolu
+        work_dir: Parçaların yazılacağı dizin
+        chunk_pages: Parça başına sayfa sayısı
+
+    Returns:
+        Sıralı parça dosya yolları listesi
+    """
+    chunk_paths = []
+    with pymupdf.open(input_path) as source:
+        for index, first_page in enumerate(range(0, source.page_count, chunk_pages)):
+            last_page = min(first_page + chunk_pages, source.page_count) - 1
+            chunk_path = os.path.join(work_dir, f"chunk_{index:05d}.pdf")
+            with pymupdf.open() as chunk:
+                chunk.insert_pdf(source, from_page=first_page, to_page=last_page, links=False, annots=True)
+                chunk.save(chunk_path)
+            chunk_paths.append(chunk_path)
+    return chunk_paths
+
+
+def _compress_chunk(chunk_path, pdfsettings, subset_fonts=False):
+    """Tek bir parçayı ayrı bir Ghostscript sürecinde sıkıştırır"""
+    output_path = chunk_path[:-4] + "_gs.pdf"
+    # Tam gömülen fontlar parçalarda aynı baytlarla yazılır ve birleştirmede tekilleşir
+    options = () if subset_fonts else ("-dSubsetFonts=false",)
+    run_tool(build_gs_command(chunk_path, output_path, pdfsettings, options=options),
+             input_size=os.path.getsize(chunk_path))
+    return output_path
+
+
+def restore_links(source, merged):
+    """
+    Özgün belgenin bağlantılarını birleştirilmiş belgenin aynı sayfalarına ekler.
+    Parçalar bağlantısız bölündüğü için (başka parçadaki sayfaya giden GoTo
+    bağlantıları bölmede zaten kaybolur) bağlantılar tek adımda özgünden alınır.
+
+    Args:
+        source: Özgün PyMuPDF belgesi
+        merged: Birleştirilmiş PyMuPDF belgesi (sayfa sırası özgünle aynı)
+    """
+    for page_number in range(min(source.page_count, merged.page_count)):
+        links = source[page_number].get_links()
+        if not links:
+            continue
+        page = merged[page_number]
+        for link in links:
+            if link["kind"] == pymupdf.LINK_NAMED and link.get("page", -1) >= 0:
+                # Adlandırılmış hedefler birleştirilmiş belgede yok; çözülmüş sayfaya bağlanır
+                link = dict(link, kind=pymupdf.LINK_GOTO)
+            try:
+                page.insert_link(link)
+            except Exception:
+                # Hedefi çözülemeyen bağlantı atlanır, diğerleri eklenir
+                pass
+
+
+def duplicate_font_bytes(document):
+    """
+    Aynı fontun birden fazla gömülü alt kümesinin fazladan kapladığı baytları hesaplar.
+    Her font için en büyük alt küme dışındakiler sayılır; alt küme önekleri
+    ("ABCDEF+Ad") ve içerikleri farklı olduğundan bunlar birleştirilemez.
+
+    Args:
+        document: PyMuPDF belgesi
+
+    Returns:
+        int: Fazladan gömülü font baytları
+    """
+    sizes = {}
+    for xref in range(1, document.xref_length()):
+        if document.xref_get_key(xref, "Type")[1] != "/FontDescriptor":
+            continue
+        name = document.xref_get_key(xref, "FontName")[1]
+        if len(name) > 8 and name[7] == "+":
+            name = "/" + name[8:]
+        for key in _FONT_FILE_KEYS:
+            kind, reference = document.xref_get_key(xref, key)
+            if kind != "xref":
+                continue
+            font_xref = int(reference.split()[0])
+            length = document.xref_get_key(font_xref, "Length")
+            size = int(length[1]) if length[0] == "int" else len(document.xref_stream_raw(font_xref) or b"")
+            sizes.setdefault(name, []).append(size)
+    return sum(sum(values) - max(values) for values in sizes.values())
+
+
+def merge_pdfs(input_path, chunk_paths, output_path):
+    """
+    Sıkıştırılmış parçaları sırasıyla birleştirir. Aynı font akışları ilk
+    kopyaya bağlanır, garbage=4 kalan bayt bayt aynı nesneleri tek kopyaya
+    indirir; parçalarda ayrı ayrı alt kümelenen fontlar ise her parçada kalır
+    (bkz. duplicate_font_bytes).
+
+    Args:
+        input_path: Özgün PDF (içindekiler tablosu buradan alınır)
+        chunk_paths: Sıralı parça dosya yolları
+        output_path: Çıkış PDF dosya yolu
+
+    Returns:
+        {"deduplicated_font_streams": ilk kopyaya bağlanan font akışı sayısı,
+         "duplicate_font_bytes": yinelenen font alt kümelerinin fazladan kapladığı baytlar}
+    """
+    with pymupdf.open() as merged:
+        for chunk_path in chunk_paths:
+            with pymupdf.open(chunk_path) as chunk:
+                merged.insert_pdf(chunk)
+
+        # Bölme sırasında kaybolan yer imlerini ve bağlantıları geri yükle
+        with pymupdf.open(input_path) as source:
+            toc = source.get_toc(simple=False)
+            restore_links(source, merged)
+        if toc:
+            try:
+                merged.set_toc(toc)
+            except Exception:
+                pass
+
+        deduplicated = dedupe_font_streams(merged)
+        merged.save(output_path, garbage=4, deflate=True, clean=False)
+    # Yinelenen nesneler kayıtta birleştirildiği için sayım kaydedilen dosyadan yapılır
+    with pymupdf.open(output_path) as result:
+        return {"deduplicated_font_streams": deduplicated, "duplicate_font_bytes": duplicate_font_bytes(result)}
+
+
+def compress_pdf_parallel(input_path, output_path, compression_level="medium",
+                          chunk_pages=DEFAULT_CHUNK_PAGES, workers=DEFAULT_WORKERS, subset_fonts=False):
+    """
+    PDF'i sayfa aralıklarına bölerek paralel Ghostscript süreçleriyle sıkıştırır
+
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        chunk_pages: Parça başına sayfa sayısı
+        workers: Aynı anda çalışacak en fazla Ghostscript süreci
+        subset_fonts: True ise parçalarda fontlar alt kümelenir (tekilleştirilemez)
+
+    Returns:
+        {"chunks": parça sayısı, "deduplicated_font_streams": tekilleştirilen font akışları,
+         "duplicate_font_bytes": parçalarda yinelenen font baytları}
+    """
+    pdfsettings = pdfsettings_for_level(compression_level)
+
+    with pymupdf.open(input_path) as doc:
+        page_count = doc.page_count
+
+    # Tek parçalık belgelerde bölme/birleştirme maliyetine gerek yok
+    if page_count <= chunk_pages:
+        run_tool(build_gs_command(input_path, output_path, pdfsettings), input_size=os.path.getsize(input_path),
+                 page_count=page_count)
+        return {"chunks": 1, "deduplicated_font_streams": 0, "duplicate_font_bytes": 0}
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        chunk_paths = split_pdf(input_path, work_dir, chunk_pages)
+
+        # Her iş parçacığı ayrı bir gs süreci başlatır; işi yapan süreç havuzu gs süreçleridir
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            compressed_paths = list(executor.map(
+                lambda path: _compress_chunk(path, pdfsettings, subset_fonts), chunk_paths
+            ))
+
+        return dict(chunks=len(chunk_paths), **merge_pdfs(input_path, compressed_paths, output_path))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """
+    Komut satırından çağrıldığında çalışır.
+
+    Base64 yerine --stdin veya --input <yol> ile ham PDF, --output <yol> veya
+    --binary-stdout ile ham çıktı kullanılabilir (bkz. transport.py).
+    """
+    transport = None
+    temp_dir = tempfile.mkdtemp()
+    try:
+        transport = Transport()
+        parser = ArgumentParser(description="Sayfa paralel Ghostscript sıkıştırma")
+        parser.add_argument("compression_level", nargs="?", default="medium")
+        parser.add_argument("--chunk-pages", type=int, default=DEFAULT_CHUNK_PAGES)
+        parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+        parser.add_argument("--subset-fonts", action="store_true")
+        args = parser.parse_args(transport.args)
+
+        if not transport.has_input:
+            raise ValueError("PDF içeriği verilmedi")
+        if args.chunk_pages < 1 or args.workers < 1:
+            raise ValueError("--chunk-pages ve --workers pozitif olmalı")
+
+        # Girdi zaten diskteyse doğrudan kullan, değilse geçici dosyaya yaz
+        if transport.input_path:
+            input_path = transport.input_path
+        else:
+            input_path = os.path.join(temp_dir, "input.pdf")
+            transport.write_input_file(input_path)
+
+        output_path = transport.output_path or os.path.join(temp_dir, "output.pdf")
+
+        stats = {}
+
+        def run(src, dst):
+            stats.update(compress_pdf_parallel(src, dst, args.compression_level, args.chunk_pages,
+                                               args.workers, args.subset_fonts))
+
+        # Çıktı işçi sayısından bağımsızdır, parça boyutuna ve font alt kümelemeye bağlıdır
+        cache_info = cached_file_operation(
+            "ghostscript-parallel",
+            f"{pdfsettings_for_level(args.compression_level)}|{args.chunk_pages}|{int(args.subset_fonts)}",
+            tool_version("gs"), input_path, output_path, run
+        )
+
+        result = {
+            "original_size": os.path.getsize(input_path),
+            "compressed_size": os.path.getsize(output_path)
+        }
+        # Parça bilgileri yalnızca sıkıştırma bu çağrıda çalıştıysa bilinir
+        result.update(stats)
+        if cache_info:
+            result["cache"] = cache_info
+        transport.emit_file(result, output_path, "compressed_pdf")
+
+    except Exception as e:
+        error_result = {"error": str(e)}
+        if transport is not None:
+            transport.emit(error_result)
+        else:
+            print(json.dumps(error_result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF Ön Analizi
+Sıkıştırmadan önce belgenin yapısını yalnızca xref tablosu ve nesne
+sözlüklerinden okuyarak çıkarır (sayfa içerikleri çizilmez, görseller
+çözülmez): görsel bayt payı, görsellerin etkin çözünürlüğü, font baytları,
+nesne akışı kullanımı, sıkıştırılmamış akışlar ve yinelenen nesneler.
+
+Sıkıştırma betikleri bu bilgiyle motor ve ayar seçer; sıkıştırmanın işe
+yaramayacağı belgelerde (ör. zaten optimize edilmiş, görselleri düşük
+çözünürlüklü) motoru hiç çalıştırmadan orijinali döndürür.
+
+Ortam değişkenleri:
+    NOVAPDF_PREFLIGHT=0             Ön analizi devre dışı bırakır (motor her zaman çalışır)
+
+Kullanım: python3 pdf_analyzer.py (--input <pdf> | --stdin | <base64>) [sıkıştırma_seviyesi]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import statistics
+
+import pymupdf
+
+import metrics
+from transport import Transport
+
+# Ghostscript PDFSETTINGS değerlerinin renkli/gri görseller için hedef çözünürlüğü
+GS_IMAGE_DPI = {
+    "/screen": 72,
+    "/ebook": 150,
+    "/printer": 300,
+    "/prepress": 300,
+    "/default": 72,
+}
+
+# Ghostscript görseli ancak çözünürlüğü hedefin bu katını aşıyorsa küçültür
+# (varsayılan DownsampleThreshold)
+DOWNSAMPLE_THRESHOLD = 1.5
+
+# Beklenen kazanç dosya boyutunun bu oranının altındaysa motor çalıştırılmaz
+MIN_SAVINGS_RATIO = 0.03
+
+# Kazanç tahminlerinde kullanılan kaba oranlar
+FLATE_SAVINGS = 0.6          # Sıkıştırılmamış akışların Flate ile kazancı
+UNSUBSET_FONT_SAVINGS = 0.7  # Tam gömülü fontların alt kümelenmesiyle kazanç
+LOSSLESS_IMAGE_SAVINGS = 0.5 # Kayıpsız görsellerin JPEG'e çevrilmesiyle kazanç
+OBJECT_STREAM_SAVINGS = 12   # Nesne akışlarıyla nesne başına kazanılan bayt
+
+_FONT_FILE_KEYS = ("FontFile", "FontFile2", "FontFile3")
+_FONT_STREAM_KEYS = _FONT_FILE_KEYS + ("CIDToGIDMap", "ToUnicode")
+_LOSSY_FILTERS = ("/DCTDecode", "/JPXDecode", "/JBIG2Decode", "/CCITTFaxDecode")
+
+
+def preflight_enabled():
+    """Ön analizin ortam değişkeniyle kapatılıp kapatılmadığını döndürür"""
+    return os.environ.get("NOVAPDF_PREFLIGHT", "1").lower() not in ("0", "false", "no")
+
+
+def _key(document, xref, name):
+    kind, value = document.xref_get_key(xref, name)
+    return None if kind == "null" else (kind, value)
+
+
+def _stream_length(document, xref):
+    """Akışın ham (kodlanmış) uzunluğunu sözlükten okur"""
+    length = _key(document, xref, "Length")
+    if length and length[0] == "int":
+        return int(length[1])
+    if length and length[0] == "xref":
+        try:
+            return int(document.xref_object(int(length[1].split()[0]), compressed=True))
+        except ValueError:
+            pass
+    # Uzunluk dolaylı ve okunamıyorsa akışın kendisine bakılır
+    return len(document.xref_stream_raw(xref) or b"")
+
+
+def _image_dpi(document):
+    """
+    Görsellerin sayfa kaynaklarından alt sınır çözünürlüğünü hesaplar. Görsel
+    sayfadan büyük çizilemeyeceği için piksel boyutu / sayfa boyutu gerçek
+    çözünürlüğün alt sınırıdır (tam sayfa taramalarda gerçek değerin kendisidir).
+
+    Returns:
+        {xref: dpi}
+    """
+    dpi = {}
+    for page in document:
+        width_inch = page.rect.width / 72 or 1
+        height_inch = page.rect.height / 72 or 1
+        for image in document.get_page_images(page.number):
+            xref, width, height = image[0], image[2], image[3]
+            estimate = max(width / width_inch, height / height_inch)
+            # Birden çok sayfada kullanılan görselde en büyük sayfa belirleyicidir
+            dpi[xref] = min(dpi.get(xref, estimate), estimate)
+    return dpi
+
+
+def analyze_pdf(pdf_path=None, data=None):
+    """
+    Belgenin yapısal özetini çıkarır
+
+    Args:
+        pdf_path: PDF dosya yolu
+        data: Veya PDF baytları
+
+    Returns:
+        Analiz sözlüğü
+    """
+    start = time.perf_counter()
+    if pdf_path:
+        document = pymupdf.open(pdf_path)
+        file_size = os.path.getsize(pdf_path)
+    else:
+        document = pymupdf.open(stream=bytes(data), filetype="pdf")
+        file_size = len(data)
+
+    with document:
+        analysis = {
+            "file_size": file_size,
+            "pages": document.page_count,
+            "objects": document.xref_length() - 1,
+            "encrypted": bool(document.needs_pass or document.is_encrypted),
+            "images": 0,
+            "image_bytes": 0,
+            "lossless_image_bytes": 0,
+            "font_bytes": 0,
+            "unsubset_font_bytes": 0,
+            "object_streams": 0,
+            "uncompressed_stream_bytes": 0,
+            "duplicate_objects": 0,
+            "duplicate_bytes": 0
+        }
+        if analysis["encrypted"]:
+            analysis["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            return analysis
+
+        images = {}
+        candidates = {}
+        for xref in range(1, document.xref_length()):
+            if not document.xref_is_stream(xref):
+                _collect_font(document, xref, analysis)
+                continue
+            length = _stream_length(document, xref)
+            subtype = _key(document, xref, "Subtype")
+            kind = _key(document, xref, "Type")
+            filters = _key(document, xref, "Filter")
+            if kind and kind[1] == "/ObjStm":
+                analysis["object_streams"] += 1
+            elif subtype and subtype[1] == "/Image":
+                lossless = not filters or not any(name in filters[1] for name in _LOSSY_FILTERS)
+                images[xref] = {"bytes": length, "lossless": lossless}
+                analysis["images"] += 1
+                analysis["image_bytes"] += length
+                if lossless:
+                    analysis["lossless_image_bytes"] += length
+            if filters is None and not (kind and kind[1] in ("/XRef", "/Metadata")):
+                analysis["uncompressed_stream_bytes"] += length
+            if length >= 1024:
+                # Aynı sözlüğe (aynı uzunluk dahil) sahip akışlar yinelenen aday
+                candidates.setdefault(document.xref_object(xref, compressed=True), []).append((xref, length))
+
+        for group in candidates.values():
+            if len(group) < 2:
+                continue
+            seen = set()
+            for xref, length in group:
+                digest = hashlib.sha256(document.xref_stream_raw(xref) or b"").digest()
+                if digest in seen:
+                    analysis["duplicate_objects"] += 1
+                    analysis["duplicate_bytes"] += length
+                seen.add(digest)
+
+        # Sayfalarda doğrudan kullanılmayan (ör. form içindeki) görsellerin çözünürlüğü bilinmez
+        for xref, value in _image_dpi(document).items():
+            if xref in images:
+                images[xref]["dpi"] = round(value)
+        analysis["image_objects"] = images
+
+    values = sorted(image["dpi"] for image in images.values() if "dpi" in image)
+    analysis["image_dpi_summary"] = {
+        "min": values[0], "median": round(statistics.median(values)), "max": values[-1]
+    } if values else None
+    analysis["image_share"] = round(analysis["image_bytes"] / file_size, 3) if file_size else 0.0
+    analysis["font_share"] = round(analysis["font_bytes"] / file_size, 3) if file_size else 0.0
+    analysis["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return analysis
+
+
+def _collect_font(document, xref, analysis):
+    """Font tanımlayıcısından gömülü font akışlarının boyutunu toplar"""
+    kind = _key(document, xref, "Type")
+    if not kind or kind[1] != "/FontDescriptor":
+        return
+    font_name = _key(document, xref, "FontName")
+    # Alt kümelenmiş fontların adı "ABCDEF+Ad" biçimindedir
+    subset = bool(font_name and len(font_name[1]) > 8 and font_name[1][7] == "+")
+    for name in _FONT_FILE_KEYS:
+        reference = _key(document, xref, name)
+        if not reference or reference[0] != "xref":
+            continue
+        length = _stream_length(document, int(reference[1].split()[0]))
+        analysis["font_bytes"] += length
+        if not subset:
+            analysis["unsubset_font_bytes"] += length
+
+
+def estimate_savings(analysis, engine, pdfsettings="/ebook"):
+    """
+    Bir motorun kabaca kazandıracağı bayt sayısını tahmin eder
+
+    Args:
+        analysis: analyze_pdf sonucu
+        engine: "ghostscript" veya "qpdf"
+        pdfsettings: Ghostscript PDFSETTINGS değeri
+
+    Returns:
+        Tahmini kazanç (bayt)
+    """
+    stream_savings = analysis["uncompressed_stream_bytes"] * FLATE_SAVINGS
+    if engine == "qpdf":
+        object_stream_savings = 0
+        if not analysis["object_streams"]:
+            object_stream_savings = analysis["objects"] * OBJECT_STREAM_SAVINGS
+        return int(stream_savings + object_stream_savings)
+
+    target = GS_IMAGE_DPI.get(pdfsettings, 150)
+    image_savings = 0.0
+    lossy_conversion = pdfsettings in ("/screen", "/ebook", "/default")
+    for image in analysis.get("image_objects", {}).values():
+        dpi = image.get("dpi")
+        if dpi and dpi > target * DOWNSAMPLE_THRESHOLD:
+            image_savings += image["bytes"] * (1 - (target / dpi) ** 2)
+        elif lossy_conversion and image["lossless"]:
+            # Küçültülmeyen kayıpsız görseller JPEG'e çevrilebilir
+            image_savings += image["bytes"] * LOSSLESS_IMAGE_SAVINGS
+    font_savings = analysis["unsubset_font_bytes"] * UNSUBSET_FONT_SAVINGS
+    return int(stream_savings + image_savings + font_savings + analysis["duplicate_bytes"])
+
+
+def plan_compression(analysis, engine, level, pdfsettings=None):
+    """
+    Analize göre motoru seçer veya sıkıştırmanın atlanmasına karar verir.
+    İstenen motor yeterli kazanç sağlayacaksa o, sağlamayacaksa diğeri
+    kullanılır; ikisi de yeterli değilse belge olduğu gibi döndürülür.
+
+    Args:
+        analysis: analyze_pdf sonucu
+        engine: Betiğin kendi motoru ("ghostscript" veya "qpdf")
+        level: "light", "medium", "high" sıkıştırma seviyesi
+        pdfsettings: Ghostscript ayarı (betiğin seviye eşlemesi)
+
+    Returns:
+        {"action": "compress" veya "skip", "engine", "reason", "estimated_savings"}
+    """
+    if pdfsettings is None:
+        from pdf_compressor import pdfsettings_for_level
+
+        pdfsettings = pdfsettings_for_level(level)
+    if analysis["encrypted"]:
+        return {"action": "skip", "engine": None, "reason": "encrypted", "estimated_savings": 0}
+
+    minimum = analysis["file_size"] * MIN_SAVINGS_RATIO
+    savings = {
+        "ghostscript": estimate_savings(analysis, "ghostscript", pdfsettings),
+        "qpdf": estimate_savings(analysis, "qpdf")
+    }
+    other = "qpdf" if engine == "ghostscript" else "ghostscript"
+    if savings[engine] >= minimum:
+        return {"action": "compress", "engine": engine, "reason": "expected_savings",
+                "estimated_savings": savings[engine]}
+    if savings[other] >= minimum:
+        return {"action": "compress", "engine": other, "reason": f"{engine}_not_effective",
+                "estimated_savings": savings[other]}
+    return {"action": "skip", "engine": None, "reason": "already_optimized",
+            "estimated_savings": max(savings.values())}
+
+
+def dedupe_font_streams(document):
+    """
+    Birleştirilmiş belgede aynı içerikli font akışlarını (font programı,
+    CIDToGIDMap, ToUnicode) ilk kopyaya bağlar. Kopyalar referanssız kalır ve
+    kayıtta garbage=1 ile atılır; bu, tüm nesneleri birbiriyle karşılaştıran
+    garbage=4'ten farklı olarak yalnızca font nesnelerine bakar.
+
+    Args:
+        document: PyMuPDF belgesi (yerinde güncellenir)
+
+    Returns:
+        int: İlk kopyaya bağlanan akış sayısı
+    """
+    canonical = {}
+    replaced = {}
+    count = 0
+    for xref in range(1, document.xref_length()):
+        kind = _key(document, xref, "Type")
+        if not kind or kind[1] not in ("/Font", "/FontDescriptor"):
+            continue
+        for name in _FONT_STREAM_KEYS:
+            reference = _key(document, xref, name)
+            if not reference or reference[0] != "xref":
+                continue
+            stream_xref = int(reference[1].split()[0])
+            if stream_xref not in replaced:
+                digest = hashlib.sha256(
+                    document.xref_object(stream_xref, compressed=True).encode("utf-8")
+                    + (document.xref_stream_raw(stream_xref) or b"")
+                ).digest()
+                replaced[stream_xref] = canonical.setdefault(digest, stream_xref)
+            target = replaced[stream_xref]
+            if target != stream_xref:
+                document.xref_set_key(xref, name, f"{target} 0 R")
+                count += 1
+    return count
+
+
+def summary(analysis):
+    """Analizin JSON sonucuna eklenecek özetini döndürür"""
+    return {key: value for key, value in analysis.items() if key != "image_objects"}
+
+
+def preflight(engine, level, pdfsettings=None, pdf_path=None, data=None):
+    """
+    Sıkıştırma betiklerinin ortak ön analiz adımı
+
+    Args:
+        engine: Betiğin kendi motoru
+        level: Sıkıştırma seviyesi
+        pdfsettings: Ghostscript ayarı (None ise seviyeden)
+        pdf_path: PDF dosya yolu
+        data: Veya PDF baytları
+
+    Returns:
+        (plan, sonuç özeti) veya ön analiz kapalıysa/başarısızsa (None, None)
+    """
+    if not preflight_enabled():
+        return None, None
+    try:
+        with metrics.stage("preflight"):
+            analysis = analyze_pdf(pdf_path, data)
+            plan = plan_compression(analysis, engine, level, pdfsettings)
+    except Exception as e:
+        # Analiz edilemeyen belgeler motorun kendi hata yönetimine bırakılır
+        print(f"Ön analiz yapılamadı: {e}", file=sys.stderr)
+        return None, None
+    return plan, dict(summary(analysis), decision=plan)
+
+
+def annotate(result, preflight_info, engine, original_returned):
+    """
+    Sıkıştırma sonucuna kullanılan motoru, ön analiz özetini ve orijinalin
+    döndürülüp döndürülmediğini ekler
+
+    Args:
+        result: Sonuç sözlüğü (yerinde güncellenir)
+        preflight_info: preflight ile dönen özet (None olabilir)
+        engine: Çalışan motor ("ghostscript", "qpdf") veya atlandıysa None
+        original_returned: Çıktı orijinalden küçük olmadığı ya da sıkıştırma
+                           atlandığı için orijinal mi döndürüldü
+    """
+    result["engine"] = engine
+    result["original_returned"] = original_returned
+    if preflight_info:
+        result["preflight"] = preflight_info
+    return result
+
+
+def main():
+    """
+    Komut satırından çağrıldığında çalışır; analiz sonucunu ve her iki motor
+    için verilecek kararı yazar.
+    """
+    transport = None
+    try:
+        transport = Transport()
+        if not transport.has_input:
+            raise ValueError("PDF içeriği verilmedi")
+        level = transport.args[0] if transport.args else "medium"
+
+        if transport.input_path:
+            analysis = analyze_pdf(transport.input_path)
+        else:
+            analysis = analyze_pdf(data=transport.read_input())
+        result = summary(analysis)
+        result["decisions"] = {
+            engine: plan_compression(analysis, engine, level) for engine in ("ghostscript", "qpdf")
+        }
+        transport.emit(result)
+
+    except Exception as e:
+        result = {"error": str(e)}
+        if transport is not None:
+            transport.emit(result)
+        else:
+            print(json.dumps(result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,126 @@
 import sys
-import base64
 import json
 import os
-import tempfile
-import subprocess
 
-def compress_pdf(input_file, output_file, compression_level="medium"):
+import compress_dispatch
+from transport import Transport
+from tool_io import tool_input, run_tool
+from progress import GhostscriptProgress
+
+def pdfsettings_for_level(compression_level):
     """
-    Ghostscript kullanarak PDF'i sıkıştır
-    
-    Args:
-        input_file: Giriş PDF dosya yolu
-        output_file: Çıkış PDF dosya yolu
-        compression_level: Sıkıştırma seviyesi
+    Sıkıştırma seviyesini Ghostscript PDFSETTINGS değerine çevirir
     """
-    # PDFSETTINGS değerini belirle
     if compression_level == "light":
-        pdfsettings = "/prepress"  # 300 dpi yüksek kalite
+        return "/prepress"  # 300 dpi yüksek kalite
     elif compression_level == "medium": 
-        pdfsettings = "/ebook"     # 150 dpi orta kalite
+        return "/ebook"     # 150 dpi orta kalite
     elif compression_level == "high":
-        pdfsettings = "/screen"    # 72 dpi düşük kalite
+        return "/screen"    # 72 dpi düşük kalite
     else:
-        pdfsettings = "/ebook"     # varsayılan
+        return "/ebook"     # varsayılan
+
+def build_gs_command(input_file, output_file, pdfsettings, quiet=True, options=()):
+    """
+    Ghostscript pdfwrite komutunu oluşturur
     
-    # Ghostscript komutu
-    cmd = [
+    Args:
+        input_file: Giriş PDF dosya yolu
+        output_file: Çıkış PDF dosya yolu ("-" ise PDF stdout'a yazılır)
+        pdfsettings: PDFSETTINGS değeri (/screen, /ebook, /printer, /prepress)
+        quiet: False ise sayfa mesajları ("Page N") ilerleme için stderr'e yazılır
+        options: PDFSETTINGS'ten sonra eklenecek ek gs seçenekleri
+    
+    Returns:
+        Komut argümanları listesi
+    """
+    command = [
         'gs',
         '-sDEVICE=pdfwrite',
         '-dCompatibilityLevel=1.4',
         f'-dPDFSETTINGS={pdfsettings}',
         '-dNOPAUSE',
-        '-dQUIET',
         '-dBATCH',
-        f'-sOutputFile={output_file}',
-        input_file
+        *options
     ]
+    if quiet:
+        command.append('-dQUIET')
+    if output_file == '-' or not quiet:
+        # Ghostscript'in kendi mesajları PDF akışına karışmasın
+        command.append('-sstdout=%stderr')
+    command += [f'-sOutputFile={output_file}', input_file]
+    return command
+
+def ghostscript_to_file(input_file, output_file, pdfsettings, progress=None):
+    """
+    Ghostscript'i verilen PDFSETTINGS ile dosyadan dosyaya çalıştırır
+    
+    Args:
+        input_file: Giriş PDF dosya yolu
+        output_file: Çıkış PDF dosya yolu
+        pdfsettings: PDFSETTINGS değeri (/screen, /ebook, /printer, /prepress)
+        progress: Verilirse ilerleme olaylarını alan fonksiyon (bkz. progress.py)
+    """
+    input_size = os.path.getsize(input_file)
+    if progress is None:
+        run_tool(build_gs_command(input_file, output_file, pdfsettings), input_size=input_size)
+        return
+    reporter = GhostscriptProgress(progress, output_file)
+    run_tool(build_gs_command(input_file, output_file, pdfsettings, quiet=False), input_size=input_size,
+             on_message=reporter.feed)
+    reporter.finish()
+
+def compress_pdf(input_file, output_file, compression_level="medium", progress=None):
+    """
+    Ghostscript kullanarak PDF'i sıkıştır
     
-    # Komutu çalıştır
-    subprocess.run(cmd, check=True)
+    Args:
+        input_file: Giriş PDF dosya yolu
+        output_file: Çıkış PDF dosya yolu
+        compression_level: Sıkıştırma seviyesi
+        progress: Verilirse ilerleme olaylarını alan fonksiyon (bkz. progress.py)
+    """
+    ghostscript_to_file(input_file, output_file, pdfsettings_for_level(compression_level), progress)
+
+def ghostscript_to_bytes(input_data, pdfsettings, input_path=None, progress=None):
+    """
+    Ghostscript'i geçici dosya kullanmadan çalıştırır: girdi bellekteki bir
+    dosyadan (memfd) okunur, çıktı stdout borusundan alınır
+    
+    Args:
+        input_data: PDF baytları (input_path verilmişse kullanılmaz)
+        pdfsettings: PDFSETTINGS değeri (/screen, /ebook, /printer, /prepress)
+        input_path: PDF zaten diskteyse yolu
+        progress: Verilirse ilerleme olaylarını alan fonksiyon (bkz. progress.py)
+    
+    Returns:
+        bytes: Sıkıştırılmış PDF içeriği
+    """
+    reporter = GhostscriptProgress(progress) if progress is not None else None
+    with tool_input(input_data, input_path) as (source, pass_fds):
+        pdf_bytes = run_tool(build_gs_command(source, '-', pdfsettings, quiet=reporter is None), pass_fds,
+                             capture_stdout=True, input_size=len(input_data),
+                             on_message=reporter.feed if reporter else None)
+    if reporter:
+        reporter.finish()
+    return pdf_bytes
 
 def main():
     """
     Komut satırından çağrıldığında çalışır.
+    
+    Base64 yerine --stdin veya --input <yol> ile ham PDF, --output <yol> veya
+    --binary-stdout ile ham çıktı kullanılabilir (bkz. transport.py).
     """
+    transport = None
     try:
-        # Base64 kodlanmış PDF içeriği ve sıkıştırma seviyesi
-        encoded_pdf = sys.argv[1]
-        compression_level = sys.argv[2] if len(sys.argv) > 2 else "medium"
-        
-        # Giriş için geçici dosya oluştur
-        temp_input = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        temp_input_path = temp_input.name
-        temp_input.close()
+        transport = Transport()
+        if not transport.has_input:
+            raise ValueError("PDF içeriği verilmedi")
         
-        # Çıkış için geçici dosya yolu
-        temp_output_path = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf').name
-        
-        try:
-            # Base64'ten bytes'a çevir ve dosyaya yaz
-            pdf_bytes = base64.b64decode(encoded_pdf)
-            with open(temp_input_path, 'wb') as f:
-                f.write(pdf_bytes)
-            
-            # Orijinal boyut
-            original_size = len(pdf_bytes)
-            
-            # PDF'i sıkıştır
-            compress_pdf(temp_input_path, temp_output_path, compression_level)
-            
-            # Sıkıştırılmış PDF'i oku
-            with open(temp_output_path, 'rb') as f:
-                compressed_bytes = f.read()
-            
-            # Sıkıştırılmış boyut
-            compressed_size = len(compressed_bytes)
-            
-            # Base64'e kodla
-            compressed_base64 = base64.b64encode(compressed_bytes).decode('utf-8')
-            
-            # Sonucu JSON olarak döndür
-            result = {
-                "compressed_pdf": compressed_base64,
-                "original_size": original_size,
-                "compressed_size": compressed_size
-            }
-            
-            print(json.dumps(result))
-            
-        finally:
-            # Geçici dosyaları temizle
-            if os.path.exists(temp_input_path):
-                os.unlink(temp_input_path)
-            if os.path.exists(temp_output_path):
-                os.unlink(temp_output_path)
+        # Sıkıştırma seviyesi
+        compression_level = transport.args[0] if transport.args else "medium"
+        compress_dispatch.compress_document(transport, "ghostscript", compression_level)
     
     except Exception as e:
         error_result = {
@@ -101,6 +128,10 @@ def main():
         }
         print(json.dumps(error_result), file=sys.stderr)
         sys.exit(1)
+    
+    finally:
+        if transport is not None:
+            transport.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
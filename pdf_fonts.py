@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Unicode PDF Fontları
+FPDF'in çekirdek fontları (Arial/Helvetica) yalnızca latin-1 karakterlerini
+yazabildiğinden Türkçe karakterler (ş, ğ, ı, İ) "?" olarak çıkıyordu. Bu modül
+belgelere DejaVu Sans TTF fontunu Unicode (Identity-H) olarak ekler.
+
+FPDF'in kendi TTF yolu her belgede iki pahalı işi tekrarlar:
+    1. add_font: karakter genişlikleri TTF dosyasından ayrıştırılır
+    2. output: font yeniden ayrıştırılıp kullanılan gliflerin alt kümesi üretilir
+Burada metrikler bir kez ayrıştırılıp sonuç önbelleğinde (bkz. result_cache.py)
+düz veri (JSON ve ham baytlar) olarak saklanır ve süreç içinde bellekte tutulur.
+Glif alt kümeleri de (sıkıştırılmış font akışı, CIDToGIDMap ve genişlik dizisi)
+alt kümeye göre anahtarlanarak önbelleğe alınır. Alt küme ASCII'ye ek olarak kullanılan karakterlerin 32'lik
+kod noktası bloklarının tamamını içerir; böylece aynı dildeki belgeler aynı
+kaydı kullanır ve belge başına font ayrıştırılmaz.
+
+Font bulunamazsa çekirdek Arial fontuna ve latin-1'e indirgemeye geri dönülür.
+fpdf yalnızca PDF oluşturulurken yüklenir; font_version önbellek isabetinde de
+ucuzdur.
+
+Ortam değişkenleri:
+    NOVAPDF_FONT_DIR    DejaVuSans.ttf ve DejaVuSans-Bold.ttf'in bulunduğu dizin
+"""
+
+import os
+import re
+import sys
+import zlib
+import json
+import hashlib
+from array import array
+from functools import lru_cache
+
+import metrics
+from result_cache import ResultCache, cache_enabled, source_version
+
+UNICODE_FAMILY = "DejaVu"
+FALLBACK_FAMILY = "Arial"
+
+# Stil -> font dosyası (kalın dosya yoksa normal dosya kullanılır)
+FONT_FILES = {
+    "": "DejaVuSans.ttf",
+    "B": "DejaVuSans-Bold.ttf",
+}
+
+# Fontların aranacağı dizinler (NOVAPDF_FONT_DIR önce denenir)
+FONT_DIRS = (
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/usr/share/fonts/truetype",
+    "/usr/local/share/fonts",
+    "/Library/Fonts",
+    os.path.expanduser("~/.fonts"),
+)
+
+# Her alt kümeye eklenen karakterler (yazdırılabilir ASCII)
+BASE_CODES = frozenset(range(0x20, 0x7F))
+
+# Alt küme, kullanılan karakterlerin bu boyuttaki kod noktası bloklarıyla yuvarlanır
+SUBSET_BLOCK = 32
+
+# Temel alt kümenin dışında kalan karakterler
+_EXTRA_GLYPHS = re.compile(r"[^\x20-\x7e]")
+
+# FPDF'in CIDToGIDMap'i yalnızca temel çok dilli düzlemi kapsar
+_NON_BMP = re.compile(r"[\U00010000-\U0010ffff]")
+
+_TO_UNICODE = (
+    "/CIDInit /ProcSet findresource begin\n"
+    "12 dict begin\n"
+    "begincmap\n"
+    "/CIDSystemInfo\n"
+    "<</Registry (Adobe)\n"
+    "/Ordering (UCS)\n"
+    "/Supplement 0\n"
+    ">> def\n"
+    "/CMapName /Adobe-Identity-UCS def\n"
+    "/CMapType 2 def\n"
+    "1 begincodespacerange\n"
+    "<0000> <FFFF>\n"
+    "endcodespacerange\n"
+    "1 beginbfrange\n"
+    "<0000> <FFFF> <0000>\n"
+    "endbfrange\n"
+    "endcmap\n"
+    "CMapName currentdict /CMap defineresource pop\n"
+    "end\n"
+    "end"
+)
+
+# Süreç içi önbellekler: font yolu -> metrikler, (font yolu, alt küme) -> font nesneleri
+_metrics = {}
+_subsets = {}
+
+
+@lru_cache(maxsize=1)
+def find_fonts():
+    """
+    Unicode font dosyalarını arar
+
+    Returns:
+        Stil -> TTF yolu sözlüğü (normal font bulunamazsa boş)
+    """
+    directories = [os.environ.get("NOVAPDF_FONT_DIR")] + list(FONT_DIRS)
+    for directory in filter(None, directories):
+        regular = os.path.join(directory, FONT_FILES[""])
+        if not os.path.isfile(regular):
+            continue
+        paths = {}
+        for style, name in FONT_FILES.items():
+            path = os.path.join(directory, name)
+            paths[style] = path if os.path.isfile(path) else regular
+        return paths
+    return {}
+
+
+def unicode_available():
+    """Unicode fontun bulunup bulunmadığını döndürür"""
+    return bool(find_fonts())
+
+
+def _font_identity(path):
+    """Font dosyasını okumadan tanımlayan değer (yol, boyut, değişiklik zamanı)"""
+    stat = os.stat(path)
+    return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def font_version():
+    """
+    Çıktıyı etkileyen font kurulumunu tanımlar (dönüştürme önbelleği sürümü için)
+
+    Returns:
+        Kullanılan font dosyalarının kimliği veya çekirdek font için "core"
+    """
+    paths = find_fonts()
+    if not paths:
+        return "core"
+    return ";".join(_font_identity(paths[style]) for style in sorted(paths))
+
+
+@lru_cache(maxsize=1)
+def _cache_version():
+    from fpdf.fpdf import FPDF_VERSION
+    return f"{FPDF_VERSION}|{source_version(os.path.abspath(__file__))}"
+
+
+def _open_cache():
+    """Sonuç önbelleğini açar; kapalıysa veya kullanılamıyorsa None döndürür"""
+    if not cache_enabled():
+        return None
+    try:
+        return ResultCache()
+    except OSError:
+        return None
+
+
+def _cached(engine, path, setting, build, encode, decode):
+    """
+    Font dosyasından türetilen bir değeri önbellekten okur veya üretip saklar.
+    Önbellek paylaşılan bir dizinde olabileceğinden kayıtlar yalnızca düz veri
+    (JSON ve ham baytlar) olarak yazılır; okunamayan kayıt yeniden üretilir.
+
+    Args:
+        engine: Önbellek motor adı
+        path: TTF yolu
+        setting: Değerin ayarı (alt küme özeti vb.)
+        build: Değeri üreten, argümansız çağrılan fonksiyon
+        encode: Değeri baytlara çeviren fonksiyon
+        decode: Baytlardan değeri geri kuran fonksiyon (geçersiz veride ValueError)
+
+    Returns:
+        Üretilen veya önbellekten okunan değer
+    """
+    cache = _open_cache()
+    if cache is None:
+        return build()
+    key = cache.make_key(_font_identity(path), engine, setting, _cache_version())
+    try:
+        # Font kayıtları dönüştürme sonuçlarının "cache" sayaçlarına karışmaz
+        data, _ = cache.fetch(key, record=False)
+    except OSError:
+        data = None
+    if data is not None:
+        try:
+            return decode(data)
+        except (ValueError, KeyError, TypeError):
+            pass
+    value = build()
+    try:
+        cache.store(key, data=encode(value))
+    except OSError:
+        pass
+    return value
+
+
+def _parse_metrics(path):
+    """TTF dosyasından FPDF'in add_font ile ürettiği metrikleri ayrıştırır"""
+    from fpdf.ttfonts import TTFontFile
+    ttf = TTFontFile()
+    ttf.getMetrics(path)
+    return {
+        "name": re.sub("[ ()]", "", ttf.fullName),
+        "desc": {
+            "Ascent": int(round(ttf.ascent, 0)),
+            "Descent": int(round(ttf.descent, 0)),
+            "CapHeight": int(round(ttf.capHeight, 0)),
+            "Flags": ttf.flags,
+            "FontBBox": "[%s %s %s %s]" % tuple(int(round(value, 0)) for value in ttf.bbox),
+            "ItalicAngle": int(ttf.italicAngle),
+            "StemV": int(round(ttf.stemV, 0)),
+            "MissingWidth": int(round(ttf.defaultWidth, 0)),
+        },
+        "up": round(ttf.underlinePosition),
+        "ut": round(ttf.underlineThickness),
+        "cw": ttf.charWidths,
+        "originalsize": os.path.getsize(path),
+    }
+
+
+def _encode_metrics(font_metrics):
+    """Metrikleri JSON başlık satırı ve ardından ham karakter genişlikleri (uint16, küçük uçlu) olarak yazar"""
+    header = {key: value for key, value in font_metrics.items() if key != "cw"}
+    widths = array("H", font_metrics["cw"])
+    if sys.byteorder != "little":
+        widths.byteswap()
+    return json.dumps(header).encode("utf-8") + b"\n" + widths.tobytes()
+
+
+def _decode_metrics(data):
+    header_end = data.index(b"\n")
+    font_metrics = json.loads(data[:header_end])
+    if not isinstance(font_metrics, dict) or not isinstance(font_metrics["desc"], dict):
+        raise ValueError("Geçersiz font metrikleri kaydı")
+    widths = array("H")
+    widths.frombytes(data[header_end + 1:])
+    if sys.byteorder != "little":
+        widths.byteswap()
+    font_metrics["cw"] = widths.tolist()
+    return font_metrics
+
+
+def load_metrics(path):
+    """
+    Font metriklerini süreç içi bellekten, yoksa önbellekten veya TTF'ten yükler
+
+    Args:
+        path: TTF yolu
+
+    Returns:
+        Metrik sözlüğü (name, desc, up, ut, cw, originalsize)
+    """
+    font_metrics = _metrics.get(path)
+    if font_metrics is None:
+        with metrics.stage("font_metrics"):
+            font_metrics = _cached("font-metrics", path, "", lambda: _parse_metrics(path),
+                                   _encode_metrics, _decode_metrics)
+        _metrics[path] = font_metrics
+    return font_metrics
+
+
+def preload():
+    """Bulunan fontların metriklerini önceden yükler (uzun ömürlü işçi süreçleri için)"""
+    for path in set(find_fonts().values()):
+        load_metrics(path)
+
+
+def _widths_array(codes, char_widths):
+    """Alt kümedeki karakterlerin genişliklerini ardışık aralıklar halinde /W dizisine yazar"""
+    parts = []
+    run_start = None
+    run = []
+    previous = None
+    for code in codes:
+        width = char_widths[code] if code < len(char_widths) else 0
+        if not width:
+            continue
+        if width == 65535:
+            width = 0
+        if previous is not None and code == previous + 1:
+            run.append(width)
+        else:
+            if run:
+                parts.append(f" {run_start} [ {' '.join(map(str, run))} ]")
+            run_start = code
+            run = [width]
+        previous = code
+    if run:
+        parts.append(f" {run_start} [ {' '.join(map(str, run))} ]")
+    return "".join(parts)
+
+
+def _build_subset(path, codes):
+    """Verilen karakterler için gömülecek font nesnelerinin içeriğini üretir"""
+    from fpdf.ttfonts import TTFontFile
+    ttf = TTFontFile()
+    font_stream = ttf.makeSubset(path, list(codes))
+    cid_to_gid = bytearray(256 * 256 * 2)
+    for code, glyph in ttf.codeToGlyph.items():
+        cid_to_gid[code * 2] = glyph >> 8
+        cid_to_gid[code * 2 + 1] = glyph & 0xFF
+    return {
+        "font_stream": zlib.compress(font_stream),
+        "length1": len(font_stream),
+        "cid_to_gid": zlib.compress(bytes(cid_to_gid)),
+        "widths": _widths_array(codes, load_metrics(path)["cw"]),
+    }
+
+
+def _encode_subset(subset):
+    """Alt kümeyi JSON başlık satırı ve ardından ham font/CIDToGIDMap akışları olarak yazar"""
+    header = {
+        "length1": subset["length1"],
+        "widths": subset["widths"],
+        "font_stream": len(subset["font_stream"]),
+        "cid_to_gid": len(subset["cid_to_gid"]),
+    }
+    return json.dumps(header).encode("utf-8") + b"\n" + subset["font_stream"] + subset["cid_to_gid"]
+
+
+def _decode_subset(data):
+    header_end = data.index(b"\n")
+    header = json.loads(data[:header_end])
+    font_end = header_end + 1 + int(header["font_stream"])
+    if font_end + int(header["cid_to_gid"]) != len(data) or not isinstance(header["widths"], str):
+        raise ValueError("Geçersiz font alt kümesi kaydı")
+    return {
+        "font_stream": data[header_end + 1:font_end],
+        "length1": int(header["length1"]),
+        "cid_to_gid": data[font_end:],
+        "widths": header["widths"],
+    }
+
+
+def glyph_subset(path, used_codes):
+    """
+    Belgede kullanılan karakterler için font alt kümesini döndürür
+
+    Args:
+        path: TTF yolu
+        used_codes: Kullanılan Unicode kod noktaları
+
+    Returns:
+        font_stream, length1, cid_to_gid ve widths anahtarlı sözlük
+    """
+    codes = set(BASE_CODES)
+    for block in {code // SUBSET_BLOCK for code in used_codes if code not in BASE_CODES}:
+        codes.update(range(block * SUBSET_BLOCK, (block + 1) * SUBSET_BLOCK))
+    # Kontrol karakterlerinin glifi yoktur; CIDToGIDMap 0xFFFF'e kadar tanımlıdır
+    codes = tuple(sorted(code for code in codes if 0x20 <= code <= 0xFFFF and not 0x7F <= code < 0xA0))
+    key = (path, codes)
+    subset = _subsets.get(key)
+    if subset is None:
+        setting = hashlib.sha256(",".join(map(str, codes)).encode("ascii")).hexdigest()
+        with metrics.stage("font_subset"):
+            subset = _cached("font-subset", path, setting, lambda: _build_subset(path, codes),
+                             _encode_subset, _decode_subset)
+        _subsets[key] = subset
+    return subset
+
+
+def extra_glyphs(text):
+    """
+    Metinde geçen, temel alt kümenin dışındaki karakterlerin kod noktaları
+
+    Args:
+        text: Metin
+
+    Returns:
+        Kod noktaları kümesi (yalnızca temel alt kümedeki karakterler varsa boş)
+    """
+    return set(map(ord, set(_EXTRA_GLYPHS.findall(text))))
+
+
+def unicode_text(text):
+    """Unicode fontun yazamadığı (temel çok dilli düzlem dışı) karakterleri "?" yapar"""
+    return text if text.isascii() else _NON_BMP.sub("?", text)
+
+
+def pdf_text(pdf, text):
+    """
+    Metni geçerli fontun yazabileceği hale getirir: Unicode fontta temel çok
+    dilli düzlem dışı karakterler, çekirdek fontta latin-1 dışı karakterler "?" olur
+
+    Args:
+        pdf: FPDF nesnesi (font seçilmiş olmalı)
+        text: Metin
+
+    Returns:
+        str
+    """
+    text = str(text)
+    if is_unicode(pdf):
+        return unicode_text(text)
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def font_family(pdf):
+    """PDF'e kayıtlı Unicode font varsa onun, yoksa çekirdek fontun ailesini döndürür"""
+    return UNICODE_FAMILY if UNICODE_FAMILY.lower() in pdf.fonts else FALLBACK_FAMILY
+
+
+def is_unicode(pdf):
+    """Geçerli fontun Unicode (TTF) olup olmadığını döndürür"""
+    return bool(getattr(pdf, "unifontsubset", False))
+
+
+class UnicodeFontsMixin:
+    """
+    FPDF'e Unicode TTF fontlarını önbellekteki metrik ve alt kümelerle yazma
+    yeteneği ekler. Çekirdek fontlar ve diğer nesneler FPDF'in kendi yoluyla yazılır.
+    """
+
+    def register_unicode_fonts(self):
+        """
+        Bulunan Unicode fontları TTF'i ayrıştırmadan belgeye ekler
+
+        Returns:
+            Kullanılacak font ailesi (font yoksa çekirdek Arial)
+        """
+        paths = find_fonts()
+        if not paths:
+            return FALLBACK_FAMILY
+        for style, path in paths.items():
+            fontkey = UNICODE_FAMILY.lower() + style
+            if fontkey in self.fonts:
+                continue
+            font_metrics = load_metrics(path)
+            self.fonts[fontkey] = {
+                "i": len(self.fonts) + 1, "type": "TTF",
+                "name": font_metrics["name"], "desc": font_metrics["desc"],
+                "up": font_metrics["up"], "ut": font_metrics["ut"],
+                "cw": font_metrics["cw"],
+                "ttffile": path, "fontkey": fontkey,
+                "subset": [], "unifilename": None,
+            }
+            self.font_files[fontkey] = {"length1": font_metrics["originalsize"], "type": "TTF", "ttffile": path}
+        return UNICODE_FAMILY
+
+    def _putfonts(self):
+        all_fonts = self.fonts
+        unicode_fonts = sorted(
+            (font for font in all_fonts.values() if font["type"] == "TTF"), key=lambda font: font["i"]
+        )
+        self.fonts = {key: font for key, font in all_fonts.items() if font["type"] != "TTF"}
+        try:
+            super()._putfonts()
+        finally:
+            self.fonts = all_fonts
+        for font in unicode_fonts:
+            self._put_unicode_font(font)
+
+    def _put_unicode_font(self, font):
+        """Bir TTF fontunun nesnelerini FPDF ile aynı yapıda, önbellekteki alt kümeyle yazar"""
+        subset = glyph_subset(font["ttffile"], set(font["subset"]))
+        fontname = "MPDFAA+" + font["name"]
+        font["n"] = self.n + 1
+
+        # Type0 font
+        self._newobj()
+        self._out("<</Type /Font")
+        self._out("/Subtype /Type0")
+        self._out("/BaseFont /" + fontname)
+        self._out("/Encoding /Identity-H")
+        self._out("/DescendantFonts [" + str(self.n + 1) + " 0 R]")
+        self._out("/ToUnicode " + str(self.n + 2) + " 0 R")
+        self._out(">>")
+        self._out("endobj")
+
+        # CIDFontType2
+        self._newobj()
+        self._out("<</Type /Font")
+        self._out("/Subtype /CIDFontType2")
+        self._out("/BaseFont /" + fontname)
+        self._out("/CIDSystemInfo " + str(self.n + 2) + " 0 R")
+        self._out("/FontDescriptor " + str(self.n + 3) + " 0 R")
+        if font["desc"].get("MissingWidth"):
+            self._out("/DW %d" % font["desc"]["MissingWidth"])
+        self._out("/W [%s]" % subset["widths"])
+        self._out("/CIDToGIDMap " + str(self.n + 4) + " 0 R")
+        self._out(">>")
+        self._out("endobj")
+
+        # ToUnicode
+        self._newobj()
+        self._out("<</Length " + str(len(_TO_UNICODE)) + ">>")
+        self._putstream(_TO_UNICODE)
+        self._out("endobj")
+
+        # CIDSystemInfo
+        self._newobj()
+        self._out("<</Registry (Adobe)")
+        self._out("/Ordering (UCS)")
+        self._out("/Supplement 0")
+        self._out(">>")
+        self._out("endobj")
+
+        # Font tanımlayıcı
+        self._newobj()
+        self._out("<</Type /FontDescriptor")
+        self._out("/FontName /" + fontname)
+        for name in ("Ascent", "Descent", "CapHeight", "Flags", "FontBBox", "ItalicAngle", "StemV", "MissingWidth"):
+            value = font["desc"][name]
+            if name == "Flags":
+                # Nonsymbolic bayrağı eklenir, symbolic bayrağı kaldırılır
+                value = (value | 4) & ~32
+            self._out(" /%s %s" % (name, value))
+        self._out("/FontFile2 " + str(self.n + 2) + " 0 R")
+        self._out(">>")
+        self._out("endobj")
+
+        # CIDToGIDMap
+        self._newobj()
+        self._out("<</Length " + str(len(subset["cid_to_gid"])))
+        self._out("/Filter /FlateDecode")
+        self._out(">>")
+        self._putstream(subset["cid_to_gid"])
+        self._out("endobj")
+
+        # Font dosyası
+        self._newobj()
+        self._out("<</Length " + str(len(subset["font_stream"])))
+        self._out("/Filter /FlateDecode")
+        self._out("/Length1 " + str(subset["length1"]))
+        self._out(">>")
+        self._putstream(subset["font_stream"])
+        self._out("endobj")
+
+
+@lru_cache(maxsize=1)
+def _pdf_class():
+    from fpdf import FPDF
+    return type("UnicodeFPDF", (UnicodeFontsMixin, FPDF), {})
+
+
+def new_pdf():
+    """
+    Unicode fontları eklenmiş yeni bir PDF nesnesi oluşturur
+
+    Returns:
+        FPDF nesnesi (font bulunamazsa çekirdek fontlarla çalışır; bkz. font_family)
+    """
+    pdf = _pdf_class()()
+    pdf.register_unicode_fonts()
+    return pdf
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Parçalı PDF Yazıcı
+FPDF tüm sayfaları belge bitene kadar bellekte tutar. Çok sayfalı tablolarda
+bellek kullanımını sınırlamak için sayfalar belirli sayıda sayfadan oluşan
+parçalar halinde diske yazılır ve en sonda PyMuPDF ile sırasıyla birleştirilir.
+"""
+
+import os
+import shutil
+import tempfile
+
+import metrics
+from pdf_fonts import new_pdf
+
+# Bir parçada bellekte tutulacak en fazla sayfa sayısı
+DEFAULT_PAGES_PER_SEGMENT = 100
+
+
+def _default_factory():
+    # Unicode fontlar her parçaya önbellekteki metriklerle eklenir
+    pdf = new_pdf()
+    # Sayfa sonları çağıran tarafından yönetilir
+    pdf.set_auto_page_break(auto=False)
+    return pdf
+
+
+class SegmentedPDF:
+    """
+    Sayfaları parça parça diske boşaltan FPDF sarmalayıcı.
+    Geçerli parçaya `pdf` özelliği üzerinden erişilir; yeni sayfalar mutlaka
+    `add_page` ile açılmalıdır.
+    """
+
+    def __init__(self, pages_per_segment=DEFAULT_PAGES_PER_SEGMENT, factory=None):
+        """
+        Args:
+            pages_per_segment: Diske yazılmadan önce bellekte tutulacak sayfa sayısı
+            factory: Yeni (boş) FPDF nesnesi döndüren fonksiyon
+        """
+        self.pages_per_segment = pages_per_segment
+        self.factory = factory or _default_factory
+        self.pdf = self.factory()
+        self.segment_paths = []
+        self.page_count = 0
+        self.work_dir = None
+
+    def add_page(self):
+        """Yeni sayfa açar; geçerli parça dolduysa önce diske yazar"""
+        if self.pdf.page >= self.pages_per_segment:
+            self._flush()
+        self.pdf.add_page()
+        self.page_count += 1
+
+    def _flush(self):
+        """Geçerli parçayı diske yazar ve aynı font ayarlarıyla yeni parça başlatır"""
+        if self.work_dir is None:
+            self.work_dir = tempfile.mkdtemp(prefix="pdf_spool_")
+
+        font = (self.pdf.font_family, self.pdf.font_style, self.pdf.font_size_pt)
+        segment_path = os.path.join(self.work_dir, f"segment_{len(self.segment_paths):05d}.pdf")
+        self.pdf.output(segment_path, 'F')
+        self.segment_paths.append(segment_path)
+
+        # Unicode fontların glif alt kümesi sonraki parçalara taşınır; parçalar aynı
+        # alt kümeyi gömdüğünde birleştirmede tek kopyaya indirgenir
+        subsets = {key: set(info["subset"]) for key, info in self.pdf.fonts.items() if info["type"] == "TTF"}
+
+        self.pdf = self.factory()
+        for key, subset in subsets.items():
+            if key in self.pdf.fonts:
+                self.pdf.fonts[key]["subset"].extend(subset)
+        if font[0]:
+            # FPDF bir sonraki add_page çağrısında bu fontu sayfaya uygular
+            self.pdf.set_font(*font)
+
+    def getvalue(self):
+        """
+        Belgeyi tamamlar ve PDF içeriğini döndürür
+
+        Returns:
+            bytes: PDF içeriği
+        """
+        with metrics.stage("pdf_output"):
+            if not self.segment_paths:
+                return self.pdf.output(dest='S').encode('latin-1')
+            path = os.path.join(self.work_dir, "merged.pdf")
+            self._save(path)
+            with open(path, "rb") as f:
+                return f.read()
+
+    def save(self, path):
+        """
+        Belgeyi tamamlar ve birleştirilmiş PDF'i belleğe almadan dosyaya yazar
+
+        Args:
+            path: Çıkış PDF dosya yolu
+        """
+        with metrics.stage("pdf_output"):
+            if not self.segment_paths:
+                self.pdf.output(path, 'F')
+            else:
+                self._save(path)
+
+    def _save(self, path):
+        if self.pdf.page > 0:
+            self._flush()
+
+        import pymupdf
+        from pdf_analyzer import dedupe_font_streams
+
+        with pymupdf.open() as merged:
+            for segment_path in self.segment_paths:
+                with pymupdf.open(segment_path) as segment:
+                    merged.insert_pdf(segment)
+                # Birleştirilen parçayı hemen sil, disk kullanımı da büyümesin
+                os.unlink(segment_path)
+            # Her parçada tekrarlanan aynı font akışları doğrudan ilk kopyaya bağlanır;
+            # garbage=4 tüm nesneleri karşılaştırdığı için büyük belgelerde çok yavaştır
+            dedupe_font_streams(merged)
+            merged.save(path, garbage=1, deflate=True)
+
+    def close(self):
+        """Geçici parça dosyalarını temizler"""
+        if self.work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+İlerleme Olayları
+Uzun süren Ghostscript/qpdf işlerinde aracın mesaj çıktısını ayrıştırarak
+ilerleme olayları üretir. Olaylar sonuç JSON'undan önce JSON satırları olarak
+yazılır (bkz. transport.py --progress) veya iş servisinde abonelere iletilir.
+
+Olay biçimi:
+    {"event": "progress", "engine": "ghostscript", "pages_done": 120, "pages_total": 1000,
+     "percent": 12.0, "bytes_written": 5242880, "elapsed_seconds": 14.2, "eta_seconds": 104.1}
+"""
+
+import os
+import re
+import sys
+import time
+
+# Olaylar arasındaki en kısa süre (saniye); ilk ve son olay her zaman yazılır
+MIN_INTERVAL = 0.25
+
+_GS_TOTAL = re.compile(r"Processing pages \d+ through (\d+)")
+_GS_PAGE = re.compile(r"^Page (\d+)\s*$")
+_QPDF_PERCENT = re.compile(r"write progress: (\d+)%")
+
+
+class ProgressReporter:
+    """
+    Sayfa veya yüzde bilgisinden ilerleme olayı üretir ve seyreltir
+
+    Args:
+        emit: Olay sözlüğünü alan fonksiyon
+        engine: Motor adı
+        output_path: Çıktı dosya yolu (yazılan bayt sayısı için; boruda None)
+    """
+
+    def __init__(self, emit, engine, output_path=None):
+        self.emit = emit
+        self.engine = engine
+        self.output_path = output_path
+        self.pages_done = 0
+        self.pages_total = None
+        self.percent = None
+        self.bytes_written = 0
+        self.started = time.perf_counter()
+        self._last_emit = None
+
+    def _output_size(self):
+        if self.output_path:
+            try:
+                return os.path.getsize(self.output_path)
+            except OSError:
+                return 0
+        return self.bytes_written
+
+    def update(self, pages_done=None, pages_total=None, percent=None, bytes_written=None, force=False):
+        if pages_total is not None:
+            self.pages_total = pages_total
+        if pages_done is not None:
+            self.pages_done = pages_done
+        if bytes_written is not None:
+            self.bytes_written = bytes_written
+        if percent is not None:
+            self.percent = percent
+        elif self.pages_total:
+            self.percent = round(100.0 * self.pages_done / self.pages_total, 1)
+
+        now = time.perf_counter()
+        if not force and self._last_emit is not None and now - self._last_emit < MIN_INTERVAL:
+            return
+        self._last_emit = now
+
+        elapsed = now - self.started
+        eta = None
+        if self.percent and self.percent < 100:
+            eta = round(elapsed * (100 - self.percent) / self.percent, 1)
+        elif self.percent == 100:
+            eta = 0.0
+        self.emit({
+            "event": "progress",
+            "engine": self.engine,
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "percent": self.percent,
+            "bytes_written": self._output_size(),
+            "elapsed_seconds": round(elapsed, 2),
+            "eta_seconds": eta
+        })
+
+    def finish(self):
+        """Tamamlanma olayını yazar"""
+        self.update(pages_done=self.pages_total if self.pages_total else self.pages_done, percent=100.0, force=True)
+
+
+class GhostscriptProgress(ProgressReporter):
+    """
+    -dQUIET olmadan çalışan Ghostscript'in "Processing pages 1 through N." ve
+    "Page N" satırlarını ayrıştırır. "Page N" sayfaya başlarken yazıldığından
+    tamamlanan sayfa sayısı N-1 kabul edilir.
+    """
+
+    def __init__(self, emit, output_path=None):
+        super().__init__(emit, "ghostscript", output_path)
+
+    def feed(self, line, output_bytes=0):
+        match = _GS_PAGE.match(line)
+        if match:
+            self.update(pages_done=int(match.group(1)) - 1, bytes_written=output_bytes)
+            return
+        match = _GS_TOTAL.search(line)
+        if match:
+            self.update(pages_total=int(match.group(1)), bytes_written=output_bytes, force=True)
+            return
+        # İlerleme dışındaki mesajlar (uyarılar, hatalar) kaybolmasın
+        if line.strip():
+            print(line, file=sys.stderr)
+
+
+class QpdfProgress(ProgressReporter):
+    """qpdf --progress çıktısındaki "write progress: N%" satırlarını ayrıştırır"""
+
+    def __init__(self, emit, output_path=None, page_count=None):
+        super().__init__(emit, "qpdf", output_path)
+        self.pages_total = page_count
+
+    def feed(self, line, output_bytes=0):
+        match = _QPDF_PERCENT.search(line)
+        if match:
+            percent = float(match.group(1))
+            pages_done = int(self.pages_total * percent / 100) if self.pages_total else None
+            self.update(pages_done=pages_done, percent=percent, bytes_written=output_bytes)
+        elif line.strip():
+            print(line, file=sys.stderr)
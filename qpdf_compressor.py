@@ -5,9 +5,151 @@ import os
 import sys
 import base64
 import json
-import tempfile
-import subprocess
-from pathlib import Path
+import time
+
+import compress_dispatch
+from transport import Transport
+from tool_io import ToolFile, tool_input, run_tool
+from progress import QpdfProgress
+from result_cache import cached_file_operation, cached_bytes_operation, tool_version
+
+# Tüm seviyelerde ortak temel optimizasyon bayrakları
+QPDF_BASE_FLAGS = [
+    "--linearize",                # Web optimizasyonu
+    "--compress-streams=y",       # Tüm akışları sıkıştır
+    "--object-streams=generate",  # Nesne akışlarını oluştur
+]
+
+# Sıkıştırma seviyesine göre ek bayraklar.
+# Eskiden önce temel bayraklarla optimized.pdf üretilip ardından seviye bayraklarıyla
+# ikinci kez çalıştırılıyordu; ikinci geçiş ilkinin yaptığı işi tekrarladığı için
+# tüm bayraklar tek çağrıda birleştirildi.
+QPDF_LEVEL_FLAGS = {
+    # Hafif sıkıştırma - minimum değişiklik, içerik korunur
+    # (ilk geçiş referanssız nesneleri zaten attığından --preserve-unreferenced
+    # çıktıyı değiştirmiyordu, tek geçişte ise gereksiz yere büyütürdü)
+    "light": [],
+    # Orta sıkıştırma - Flate sıkıştırmasını yeniden uygula
+    "medium": [
+        "--recompress-flate",
+    ],
+    # Yüksek sıkıştırma - en agresif ayarlar
+    "high": [
+        "--recompress-flate",
+        "--compression-level=9",                # En yüksek sıkıştırma seviyesi
+        "--min-version=1.5",                    # Nesne akışları için gereken en düşük PDF versiyonu
+        "--remove-unreferenced-resources=yes",  # Referanssız kaynakları temizle
+    ],
+}
+
+def build_qpdf_command(input_path, output_path, compression_level="medium", progress=False):
+    """
+    Seviyeye göre tek geçişlik QPDF komutunu oluşturur
+    
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        progress: True ise yazma ilerlemesi (--progress) stdout'a yazılır
+    
+    Returns:
+        Komut argümanları listesi
+    """
+    # Bilinmeyen seviyelerde varsayılan olarak yalnızca temel optimizasyon uygulanır
+    level_flags = QPDF_LEVEL_FLAGS.get(compression_level, [])
+    progress_flags = ["--progress"] if progress else []
+    return ["qpdf"] + QPDF_BASE_FLAGS + level_flags + progress_flags + [input_path, output_path]
+
+def _run_qpdf(input_path, output_path, compression_level, progress=None, pass_fds=(), input_size=None):
+    """
+    QPDF'i tek geçişte çalıştırır; progress verilmişse yazma ilerlemesi olay olarak iletilir
+    """
+    if input_size is None:
+        input_size = os.path.getsize(input_path)
+    reporter = QpdfProgress(progress, output_path) if progress is not None else None
+    run_tool(build_qpdf_command(input_path, output_path, compression_level, progress=reporter is not None),
+             pass_fds, input_size=input_size, on_message=reporter.feed if reporter else None)
+    if reporter:
+        reporter.finish()
+
+def qpdf_compress_file(input_path, output_path, compression_level="medium", progress=None):
+    """
+    QPDF kullanarak diskteki bir PDF dosyasını sıkıştırır.
+    Aynı girdi ve seviye daha önce işlendiyse sonuç önbellekten alınır.
+    
+    Args:
+        input_path: Giriş PDF dosya yolu
+        output_path: Çıkış PDF dosya yolu
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        progress: Verilirse ilerleme olaylarını alan fonksiyon (bkz. progress.py)
+    
+    Returns:
+        Orijinal ve sıkıştırılmış boyut bilgileri, süre ve tahmini disk kullanımı
+        (ve varsa önbellek bilgisi)
+    """
+    start = time.perf_counter()
+    cache_info = cached_file_operation(
+        "qpdf", compression_level, tool_version("qpdf"), input_path, output_path,
+        lambda src, dst: _run_qpdf(src, dst, compression_level, progress)
+    )
+    wall_time = time.perf_counter() - start
+    
+    original_size = os.path.getsize(input_path)
+    compressed_size = os.path.getsize(output_path)
+    result = {
+        "original_size": original_size,
+        "compressed_size": compressed_size,
+        # Ölçülmez, tahmindir: tek geçişte diskte aynı anda yalnızca giriş ve çıkış dosyaları bulunur
+        "qpdf_stats": {
+            "passes": 0 if cache_info and cache_info["hit"] else 1,
+            "wall_time_ms": round(wall_time * 1000, 2),
+            "estimated_disk_bytes": original_size + compressed_size
+        }
+    }
+    if cache_info:
+        result["cache"] = cache_info
+    return result
+
+def qpdf_compress_bytes(input_data, compression_level="medium", input_path=None, progress=None):
+    """
+    QPDF'i geçici dosya kullanmadan çalıştırır. QPDF girdiyi rastgele erişimle
+    okuduğu ve doğrusallaştırılmış çıktıyı stdout'a yazamadığı için girdi ve
+    çıktı bellekteki dosyalarda (memfd, yoksa tmpfs) tutulur.
+    Aynı girdi ve seviye daha önce işlendiyse sonuç önbellekten alınır.
+    
+    Args:
+        input_data: PDF baytları (bytes veya mmap)
+        compression_level: "light", "medium", "high" sıkıştırma seviyesi
+        input_path: PDF zaten diskteyse yolu (kopyalanmaz)
+        progress: Verilirse ilerleme olaylarını alan fonksiyon (bkz. progress.py)
+    
+    Returns:
+        (sıkıştırılmış PDF baytları, boyut bilgileri sözlüğü)
+    """
+    def run():
+        with tool_input(input_data, input_path) as (source, pass_fds), ToolFile("output.pdf") as output:
+            _run_qpdf(source, output.path, compression_level, progress, pass_fds + output.pass_fds, len(input_data))
+            return output.read()
+
+    start = time.perf_counter()
+    pdf_bytes, cache_info = cached_bytes_operation(
+        "qpdf", compression_level, tool_version("qpdf"), input_data, run
+    )
+    wall_time = time.perf_counter() - start
+    
+    result = {
+        "original_size": len(input_data),
+        "compressed_size": len(pdf_bytes),
+        # Ölçülmez, tahmindir: ara dosyalar bellekte tutulur; diskte yalnızca verilmişse giriş dosyası bulunur
+        "qpdf_stats": {
+            "passes": 0 if cache_info and cache_info["hit"] else 1,
+            "wall_time_ms": round(wall_time * 1000, 2),
+            "estimated_disk_bytes": len(input_data) if input_path else 0
+        }
+    }
+    if cache_info:
+        result["cache"] = cache_info
+    return pdf_bytes, result
 
 def compress_pdf_with_qpdf(input_data, compression_level="medium"):
     """
@@ -21,103 +163,19 @@ def compress_pdf_with_qpdf(input_data, compression_level="medium"):
         Base64 olarak kodlanmış sıkıştırılmış PDF içeriği ve boyut bilgileri
     """
     try:
-        # Temp dizini oluştur
-        temp_dir = tempfile.mkdtemp()
-        input_path = os.path.join(temp_dir, "input.pdf")
-        optimized_path = os.path.join(temp_dir, "optimized.pdf")
-        output_path = os.path.join(temp_dir, "output.pdf")
-        
-        # Base64'ten normal veri formatına dönüştür
-        pdf_data = base64.b64decode(input_data)
-        
-        # Geçici dosyaya yaz
-        with open(input_path, "wb") as f:
-            f.write(pdf_data)
-        
-        # Orijinal boyutu kaydet
-        original_size = os.path.getsize(input_path)
-        
-        # 1. Adım: QPDF ile optimize et
-        subprocess.run([
-            "qpdf",
-            "--linearize",           # Web optimizasyonu
-            "--compress-streams=y",  # Tüm akışları sıkıştır
-            "--object-streams=generate", # Nesne akışlarını oluştur
-            input_path,
-            optimized_path
-        ], check=True)
-        
-        # 2. Adım: Sıkıştırma seviyesine göre ek optimizasyon
-        if compression_level == "light":
-            # Hafif sıkıştırma - minimum değişiklik, içerik korunur
-            subprocess.run([
-                "qpdf",
-                "--linearize",
-                "--compress-streams=y",
-                "--preserve-unreferenced=y",  # Referanssız nesneleri koru
-                optimized_path,
-                output_path
-            ], check=True)
-        elif compression_level == "medium":
-            # Orta sıkıştırma - daha fazla optimizasyon
-            subprocess.run([
-                "qpdf",
-                "--linearize",
-                "--compress-streams=y",
-                "--object-streams=generate",
-                "--recompress-flate",  # Flate sıkıştırmasını yeniden uygula
-                optimized_path,
-                output_path
-            ], check=True)
-        elif compression_level == "high":
-            # Yüksek sıkıştırma - en agresif ayarlar
-            subprocess.run([
-                "qpdf",
-                "--linearize",
-                "--compress-streams=y",
-                "--object-streams=generate",
-                "--recompress-flate",
-                "--compression-level=9",  # En yüksek sıkıştırma seviyesi
-                "--min-version=1.5",     # En düşük PDF versiyonu
-                "--remove-unreferenced", # Referanssız nesneleri temizle
-                optimized_path,
-                output_path
-            ], check=True)
-        else:
-            # Varsayılan orta sıkıştırma
-            subprocess.run([
-                "qpdf",
-                "--linearize",
-                "--compress-streams=y",
-                "--object-streams=generate",
-                optimized_path,
-                output_path
-            ], check=True)
-        
-        # Sıkıştırılmış dosya boyutunu al
-        compressed_size = os.path.getsize(output_path)
-        
-        # Sıkıştırılmış PDF'i oku ve base64'e çevir
-        with open(output_path, "rb") as f:
-            compressed_data = f.read()
-            compressed_pdf_base64 = base64.b64encode(compressed_data).decode("utf-8")
-        
-        # Geçici dosyaları temizle
-        try:
-            os.remove(input_path)
-            os.remove(optimized_path)
-            os.remove(output_path)
-            os.rmdir(temp_dir)
-        except:
-            pass
+        pdf_bytes, sizes = qpdf_compress_bytes(base64.b64decode(input_data), compression_level)
         
         # Sonuçları döndür
-        return {
-            "original_size": original_size,
-            "compressed_size": compressed_size,
-            "compressed_pdf": compressed_pdf_base64,
+        result = {
+            "original_size": sizes["original_size"],
+            "compressed_size": sizes["compressed_size"],
+            "compressed_pdf": base64.b64encode(pdf_bytes).decode("utf-8"),
             "error": None
         }
+        result["qpdf_stats"] = sizes["qpdf_stats"]
+        if "cache" in sizes:
+            result["cache"] = sizes["cache"]
+        return result
     
     except Exception as e:
         return {
@@ -133,10 +191,23 @@ def main():
     Beklenen argümanlar:
     1. Base64 formatında PDF içeriği
     2. Sıkıştırma seviyesi (light, medium, high)
+    
+    Base64 yerine --stdin veya --input <yol> ile ham PDF, --output <yol> veya
+    --binary-stdout ile ham çıktı kullanılabilir (bkz. transport.py).
     """
-    if len(sys.argv) < 3:
+    try:
+        transport = Transport()
+    except ValueError as e:
+        transport = None
+        argument_error = str(e)
+    else:
+        argument_error = None
+        if not transport.has_input or len(transport.args) < 1:
+            argument_error = "Geçersiz argüman sayısı. Base64 PDF ve sıkıştırma seviyesi gerekli."
+    
+    if argument_error:
         result = {
-            "error": "Geçersiz argüman sayısı. Base64 PDF ve sıkıştırma seviyesi gerekli.",
+            "error": argument_error,
             "original_size": 0,
             "compressed_size": 0,
             "compressed_pdf": ""
@@ -144,15 +215,24 @@ def main():
         print(json.dumps(result))
         sys.exit(1)
     
-    # Komut satırı argümanlarını al
-    pdf_base64 = sys.argv[1]
-    compression_level = sys.argv[2]
+    compression_level = transport.args[0]
+    
+    try:
+        compress_dispatch.compress_document(transport, "qpdf", compression_level, extra={"error": None})
     
-    # PDF'i sıkıştır
-    result = compress_pdf_with_qpdf(pdf_base64, compression_level)
+    except Exception as e:
+        result = {
+            "error": str(e),
+            "original_size": 0,
+            "compressed_size": 0
+        }
+        if not (transport.output_path or transport.binary_stdout):
+            result["compressed_pdf"] = ""
+        transport.emit(result)
+        sys.exit(1)
     
-    # JSON formatında sonucu yazdır
-    print(json.dumps(result))
+    finally:
+        transport.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+İçerik Adresli Sonuç Önbelleği
+Aynı PDF'in aynı motor ve seviyeyle tekrar sıkıştırılmasını (veya aynı belgenin
+tekrar dönüştürülmesini) önlemek için sonuçları diskte saklar.
+
+Anahtar: SHA-256(girdi) + motor + ayar + araç sürümü
+Tahliye: Toplam boyut bütçeyi aşınca en eski kullanılan kayıtlar silinir (LRU).
+         Toplam boyut sayaçlarla birlikte stats.json'da tutulur; dizin ağacı
+         yalnızca bütçe aşıldığında (veya toplam bilinmiyorsa) taranır
+Eşzamanlılık: Kayıtlar atomik olarak yazılır, tahliye ve sayaçlar dosya kilidiyle korunur
+
+Ortam değişkenleri:
+    NOVAPDF_CACHE=0                 Önbelleği devre dışı bırakır
+    NOVAPDF_CACHE_DIR               Önbellek dizini (varsayılan: <tmp>/novapdf-cache)
+    NOVAPDF_CACHE_MAX_BYTES         Bayt bütçesi (varsayılan: 512 MiB)
+"""
+
+import os
+import json
+import fcntl
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from functools import lru_cache
+
+import metrics
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "novapdf-cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Dosyaları özetlerken kullanılan parça boyutu
+HASH_CHUNK_SIZE = 1024 * 1024
+
+ENTRY_SUFFIX = ".bin"
+LOCK_FILE = ".lock"
+STATS_FILE = "stats.json"
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool):
+    """
+    Harici bir aracın sürüm satırını döndürür (süreç başına bir kez çalıştırılır)
+
+    Args:
+        tool: Araç adı (gs, qpdf, ...)
+
+    Returns:
+        Sürüm metni, araç bulunamazsa "unavailable"
+    """
+    try:
+        completed = subprocess.run([tool, "--version"], capture_output=True, text=True, timeout=10)
+        lines = completed.stdout.strip().splitlines()
+        return lines[0] if lines else "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unavailable"
+
+
+@lru_cache(maxsize=None)
+def source_version(*paths):
+    """
+    Kaynak dosyaların içerik özetini sürüm olarak döndürür.
+    Dönüştürücü kodu değiştiğinde eski önbellek kayıtları kendiliğinden geçersizleşir.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def hash_bytes(data):
+    """Bayt benzeri bir nesnenin SHA-256 özetini döndürür"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Bir dosyanın SHA-256 özetini parça parça okuyarak döndürür"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Birden fazla süreç tarafından güvenle paylaşılabilen disk önbelleği
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.environ.get("NOVAPDF_CACHE_DIR") or DEFAULT_CACHE_DIR
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("NOVAPDF_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        # Toplu moddaki (begin_batch) yazılmamış sayaç ve boyut değişiklikleri
+        self._pending = None
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        if self.cache_dir == DEFAULT_CACHE_DIR:
+            # Varsayılan dizin paylaşılan geçici dizindedir; başka bir kullanıcının
+            # önceden oluşturduğu veya yazabildiği dizin kullanılmaz
+            info = os.stat(self.cache_dir)
+            if info.st_uid != os.getuid() or info.st_mode & 0o022:
+                raise OSError(f"Önbellek dizini güvenli değil: {self.cache_dir}")
+
+    @staticmethod
+    def make_key(input_hash, engine, setting, version):
+        """
+        Önbellek anahtarını üretir
+
+        Args:
+            input_hash: Girdinin SHA-256 özeti
+            engine: Motor adı (ghostscript, qpdf, convert, ...)
+            setting: Seviye veya motor ayarı
+            version: Araç veya kod sürümü
+        """
+        material = "\0".join([input_hash, engine, str(setting), str(version)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ENTRY_SUFFIX)
+
+    @contextmanager
+    def _lock(self, exclusive):
+        with open(os.path.join(self.cache_dir, LOCK_FILE), "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_stats(self):
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILE), "r") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+        if not isinstance(stats, dict):
+            stats = {}
+        stats.setdefault("hits", 0)
+        stats.setdefault("misses", 0)
+        return stats
+
+    def _write_stats(self, stats):
+        stats_path = os.path.join(self.cache_dir, STATS_FILE)
+        temp_path = stats_path + f".{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(stats, f)
+        os.replace(temp_path, stats_path)
+
+    def _update(self, hits=0, misses=0, added_bytes=0):
+        """
+        Paylaşılan sayaçları ve toplam boyutu tek yazımla günceller; toplam
+        bütçeyi aşarsa tahliye yapar
+
+        Returns:
+            Güncel sayaçlar sözlüğü
+        """
+        with self._lock(exclusive=True):
+            stats = self._read_stats()
+            stats["hits"] += hits
+            stats["misses"] += misses
+            if added_bytes:
+                if "bytes" in stats:
+                    stats["bytes"] += added_bytes
+                else:
+                    # Toplam bilinmiyorsa (eski veya silinmiş stats.json) bir kez taranır
+                    stats["bytes"] = self._scan()[1]
+                if stats["bytes"] > self.max_bytes:
+                    stats["bytes"] = self._evict_locked()
+            self._write_stats(stats)
+        return stats
+
+    def _record(self, hit):
+        """İsabet/ıskalamayı sayar; toplu modda yalnızca bellekte biriktirir"""
+        if self._pending is not None:
+            self._pending["hits" if hit else "misses"] += 1
+            return {"hit": hit}
+        stats = self._update(hits=int(hit), misses=int(not hit))
+        return {"hit": hit, "hits": stats["hits"], "misses": stats["misses"]}
+
+    def begin_batch(self):
+        """
+        Toplu modu başlatır: end_batch çağrılana kadar sayaçlar ve toplam boyut
+        her fetch/store'da değil, bir kez yazılır (tahliye de o zaman yapılır).
+        Toplu modda fetch'in döndürdüğü bilgi yalnızca "hit" içerir.
+        """
+        if self._pending is None:
+            self._pending = {"hits": 0, "misses": 0, "added_bytes": 0}
+
+    def end_batch(self):
+        """Toplu modda biriken sayaçları ve boyut değişikliğini yazar"""
+        pending, self._pending = self._pending, None
+        if pending and any(pending.values()):
+            self._update(**pending)
+
+    def fetch(self, key, dest_path=None, record=True):
+        """
+        Önbellekteki sonucu okur
+
+        Args:
+            key: Önbellek anahtarı
+            dest_path: Verilirse sonuç bu dosyaya kopyalanır
+            record: False ise paylaşılan isabet/ıskalama sayaçları güncellenmez
+                    (sonuçlarda bildirilmeyen yardımcı kayıtlar için, ör. font metrikleri)
+
+        Returns:
+            (veri, bilgi): dest_path verilmişse veri True/None, aksi halde bytes/None;
+            bilgi isabet/ıskalama sayaçlarını içerir (record=False ise None)
+        """
+        entry_path = self._entry_path(key)
+        data = None
+        # Paylaşılan kilit, okuma sırasında kaydın tahliye edilmesini önler
+        with self._lock(exclusive=False):
+            try:
+                if dest_path:
+                    shutil.copyfile(entry_path, dest_path)
+                    data = True
+                else:
+                    with open(entry_path, "rb") as f:
+                        data = f.read()
+                # LRU sırası için son kullanım zamanını güncelle
+                os.utime(entry_path)
+            except FileNotFoundError:
+                data = None
+        if not record:
+            return data, None
+        return data, self._record(data is not None)
+
+    def store(self, key, data=None, src_path=None):
+        """
+        Sonucu önbelleğe atomik olarak yazar ve gerekirse tahliye yapar
+
+        Args:
+            key: Önbellek anahtarı
+            data: Sonuç baytları
+            src_path: Veya sonucun bulunduğu dosya yolu
+        """
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        try:
+            previous_size = os.path.getsize(entry_path)
+        except FileNotFoundError:
+            previous_size = 0
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if src_path:
+                    with open(src_path, "rb") as src:
+                        shutil.copyfileobj(src, f, HASH_CHUNK_SIZE)
+                else:
+                    f.write(data)
+                size = f.tell()
+            os.replace(temp_path, entry_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        if self._pending is not None:
+            self._pending["added_bytes"] += size - previous_size
+        else:
+            self._update(added_bytes=size - previous_size)
+
+    def evict(self):
+        """Toplam boyut bütçeyi aşıyorsa en eski kullanılan kayıtları siler"""
+        with self._lock(exclusive=True):
+            stats = self._read_stats()
+            stats["bytes"] = self._evict_locked()
+            self._write_stats(stats)
+
+    def _scan(self):
+        """Kayıtları (son kullanım, boyut, yol) listesi ve toplam boyutla döndürür"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(ENTRY_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return entries, total
+
+    def _evict_locked(self):
+        """Özel kilit tutulurken tahliye yapar ve kalan toplam boyutu döndürür"""
+        entries, total = self._scan()
+        if total <= self.max_bytes:
+            return total
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        return total
+
+
+def cache_enabled():
+    """Önbelleğin ortam değişkenleriyle kapatılıp kapatılmadığını döndürür"""
+    if os.environ.get("NOVAPDF_CACHE", "1") == "0":
+        return False
+    return int(os.environ.get("NOVAPDF_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)) > 0
+
+
+def cached_file_operation(engine, setting, version, input_path, output_path, operation):
+    """
+    Dosyadan dosyaya çalışan bir işlemi önbellek üzerinden çalıştırır
+
+    Args:
+        engine: Motor adı
+        setting: Seviye veya motor ayarı
+        version: Araç sürümü
+        input_path: Giriş dosya yolu
+        output_path: Çıkış dosya yolu
+        operation: operation(input_path, output_path) şeklinde çağrılan işlem
+
+    Returns:
+        Önbellek bilgisi sözlüğü (önbellek kapalıysa None)
+    """
+    return _cached_to_file(engine, setting, version, lambda: hash_file(input_path), output_path,
+                           lambda: operation(input_path, output_path))
+
+
+def cached_bytes_to_file_operation(engine, setting, version, input_data, output_path, operation):
+    """
+    Bellekteki girdiden dosyaya yazan bir işlemi önbellek üzerinden çalıştırır.
+    Sonuç belleğe alınmadan önbelleğe kopyalanır ve önbellekten dosyaya çıkarılır.
+
+    Args:
+        engine: Motor adı
+        setting: Seviye veya motor ayarı
+        version: Araç veya kod sürümü
+        input_data: Girdi baytları
+        output_path: Çıkış dosya yolu
+        operation: Sonucu output_path'e yazan, argümansız çağrılan işlem
+
+    Returns:
+        Önbellek bilgisi sözlüğü (önbellek kapalıysa None)
+    """
+    return _cached_to_file(engine, setting, version, lambda: hash_bytes(input_data), output_path, operation)
+
+
+def _cached_to_file(engine, setting, version, input_hash, output_path, operation):
+    if not cache_enabled():
+        with metrics.stage(engine):
+            operation()
+        return None
+
+    try:
+        with metrics.stage("cache"):
+            cache = ResultCache()
+            key = cache.make_key(input_hash(), engine, setting, version)
+            found, info = cache.fetch(key, output_path)
+    except OSError:
+        # Önbellek kullanılamıyorsa işlemi doğrudan çalıştır
+        with metrics.stage(engine):
+            operation()
+        return None
+
+    if found:
+        return info
+
+    with metrics.stage(engine):
+        operation()
+    try:
+        with metrics.stage("cache"):
+            cache.store(key, src_path=output_path)
+    except OSError:
+        pass
+    return info
+
+
+def cached_bytes_operation(engine, setting, version, input_data, operation):
+    """
+    Bellekte çalışan bir işlemi önbellek üzerinden çalıştırır
+
+    Args:
+        engine: Motor adı
+        setting: Seviye veya motor ayarı
+        version: Araç veya kod sürümü
+        input_data: Girdi baytları
+        operation: Sonuç baytlarını döndüren, argümansız çağrılan işlem
+
+    Returns:
+        (sonuç baytları, önbellek bilgisi sözlüğü veya None)
+    """
+    if not cache_enabled():
+        with metrics.stage(engine):
+            return operation(), None
+
+    try:
+        with metrics.stage("cache"):
+            cache = ResultCache()
+            key = cache.make_key(hash_bytes(input_data), engine, setting, version)
+            data, info = cache.fetch(key)
+    except OSError:
+        # Önbellek kullanılamıyorsa işlemi doğrudan çalıştır
+        with metrics.stage(engine):
+            return operation(), None
+
+    if data is not None:
+        return data, info
+
+    with metrics.stage(engine):
+        data = operation()
+    try:
+        with metrics.stage("cache"):
+            cache.store(key, data=data)
+    except OSError:
+        pass
+    return data, info
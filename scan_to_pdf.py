@@ -1,96 +1,416 @@
 #!/usr/bin/env python3
 """
-Görsel dosyasını PDF'e dönüştürme scripti
-Kullanım: python3 scan_to_pdf.py input_image.jpg output.pdf
+Görsel dosyalarını PDF'e dönüştürme scripti
+Tek bir görsel veya birden çok görsel (her biri ayrı sayfa) tek PDF'e dönüştürülür.
+Görseller paralel işçilerde açılır, EXIF yönüne göre döndürülür, sayfadaki
+yerleşim boyutunda hedef DPI'a küçültülür ve JPEG olarak yeniden kodlanır.
+Değişiklik gerekmeyen JPEG'ler yeniden kodlanmadan aktarılır, küçültülmeyen
+kayıpsız görseller (PNG, TIFF...) Flate ile kayıpsız kalır; siyah-beyaz ve gri
+görseller gri kalır. Sayfalar hazırlandıkça çıktı dosyasına yazılır; bellek
+kullanımı sayfa sayısıyla büyümez.
+
+Kullanım: python3 scan_to_pdf.py input_image.jpg [input_image2.jpg ...] output.pdf
+          [--dpi N] [--quality N] [--workers N]
 """
 
 import sys
+import json
 import os
-from fpdf import FPDF
-from PIL import Image
+import zlib
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+import metrics
+
+# A4 sayfa boyutları ve kenar boşluğu (mm)
+PAGE_WIDTH = 210
+PAGE_HEIGHT = 297
+PAGE_MARGIN = 10
+
+# Sayfadaki yerleşim boyutunda hedeflenen çözünürlük ve JPEG kalitesi
+DEFAULT_DPI = 200
+DEFAULT_QUALITY = 80
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+MM_PER_INCH = 25.4
+PT_PER_MM = 72 / MM_PER_INCH
+
+
+def fit_to_page(img_width, img_height):
+    """
+    Görseli oranını koruyarak A4 sayfaya sığdırır ve ortalar
+
+    Args:
+        img_width: Görsel genişliği (piksel)
+        img_height: Görsel yüksekliği (piksel)
+
+    Returns:
+        (x, y, genişlik, yükseklik) mm cinsinden
+    """
+    aspect_ratio = img_width / img_height
+
+    if aspect_ratio > PAGE_WIDTH / PAGE_HEIGHT:
+        # Görsel daha geniş, genişliğe göre ayarla
+        pdf_img_width = PAGE_WIDTH - 2 * PAGE_MARGIN
+        pdf_img_height = pdf_img_width / aspect_ratio
+    else:
+        # Görsel daha uzun, yüksekliğe göre ayarla
+        pdf_img_height = PAGE_HEIGHT - 2 * PAGE_MARGIN
+        pdf_img_width = pdf_img_height * aspect_ratio
+
+    # Ortalamak için pozisyon hesapla
+    x = (PAGE_WIDTH - pdf_img_width) / 2
+    y = (PAGE_HEIGHT - pdf_img_height) / 2
+    return x, y, pdf_img_width, pdf_img_height
+
+
+# Bu EXIF yönleri görseli 90/270 derece döndürür (genişlik ve yükseklik yer değiştirir)
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# Yeniden JPEG'e kodlanmaları ek kayıp sayılmayan (zaten kayıplı) biçimler
+_LOSSY_FORMATS = ("JPEG", "JPEG2000", "MPO", "WEBP")
+
+
+def target_pixel_size(img_width, img_height, dpi=DEFAULT_DPI):
+    """
+    Sayfadaki yerleşim boyutunda hedef DPI için gereken piksel boyutu
+
+    Returns:
+        (genişlik, yükseklik) piksel; görsel zaten küçükse kendi boyutu
+    """
+    placement = fit_to_page(img_width, img_height)
+    target_width = max(1, round(placement[2] / MM_PER_INCH * dpi))
+    target_height = max(1, round(placement[3] / MM_PER_INCH * dpi))
+    if img_width > target_width and img_height > target_height:
+        return target_width, target_height
+    return img_width, img_height
+
+
+def open_scaled(img, dpi=DEFAULT_DPI):
+    """
+    Açılmış (henüz çözülmemiş) görseli yalnızca gereken çözünürlükte çözer.
+    JPEG'lerde DCT ölçekleme (draft) ile 1/2, 1/4 veya 1/8 boyutunda, JPEG 2000'de
+    çözünürlük katmanı atlanarak (reduce) çözülür; tam boyutlu bit eşlem hiç
+    oluşturulmaz. Hedef boyut, EXIF dönüşü sonrası sayfa yerleşiminden hesaplanır.
+
+    Args:
+        img: Image.open ile açılmış görsel
+        dpi: Hedef çözünürlük
+
+    Returns:
+        EXIF yönü uygulanmış ve hedef boyuta getirilmiş görsel
+    """
+    transposed = img.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS
+    width, height = (img.height, img.width) if transposed else img.size
+    target = target_pixel_size(width, height, dpi)
+    # Döndürülmeden önceki eksenlere göre hedef boyut
+    decode_target = (target[1], target[0]) if transposed else target
+
+    if target != (width, height):
+        if img.format == "JPEG":
+            img.draft(img.mode if img.mode in ("RGB", "L") else None, decode_target)
+        elif img.format == "JPEG2000":
+            factor = min(img.width // decode_target[0], img.height // decode_target[1])
+            if factor >= 2:
+                img.reduce = factor.bit_length() - 1
+
+    img = ImageOps.exif_transpose(img)
+    if img.size != target:
+        if img.mode in ("1", "P"):
+            # Bu modlar yalnızca en yakın komşu ile küçültülür; kenarlar yumuşak kalsın
+            img = img.convert("L" if img.mode == "1" else "RGBA")
+        # reducing_gap önce tam sayı oranında hızlı küçültme yapar
+        img = img.resize(target, Image.LANCZOS, reducing_gap=3.0)
+    return img
+
+
+def _page_info(path, img, image_filter, temporary=True):
+    return {
+        "path": path,
+        "width": img.width,
+        "height": img.height,
+        "gray": img.mode in ("1", "L"),
+        "bits": 1 if img.mode == "1" else 8,
+        "filter": image_filter,
+        "temporary": temporary,
+        "placement": fit_to_page(*img.size)
+    }
+
+
+def prepare_image(image_path, output_path, dpi=DEFAULT_DPI, quality=DEFAULT_QUALITY):
+    """
+    Görseli sayfaya yerleştirilmeye hazırlar: EXIF yönünü uygular, yerleşim
+    boyutunda hedef DPI'ı aşıyorsa küçültür ve sayfaya gömülecek veriyi yazar.
+    Döndürme ve küçültme gerekmeyen RGB/gri JPEG'ler olduğu gibi kullanılır;
+    küçültülmeyen kayıpsız görseller Flate ile, diğerleri JPEG olarak yazılır.
+
+    Args:
+        image_path: Giriş görsel dosyası yolu
+        output_path: Hazırlanan görsel verisinin yazılacağı yol
+        dpi: Hedef çözünürlük
+        quality: JPEG kalitesi
+
+    Returns:
+        Sayfa bilgisi sözlüğü (veri yolu, piksel boyutu, renk kanalı, bit derinliği,
+        PDF filtresi, verinin geçici olup olmadığı, yerleşim)
+    """
+    with Image.open(image_path) as img:
+        orientation = img.getexif().get(0x0112)
+        width, height = (img.height, img.width) if orientation in _TRANSPOSED_ORIENTATIONS else img.size
+        if img.format == "JPEG" and img.mode in ("RGB", "L") and orientation in (None, 1) \
+                and target_pixel_size(width, height, dpi) == (width, height):
+            # JPEG verisi yeniden kodlanmadan (ek kayıp olmadan) sayfaya aktarılır
+            return _page_info(image_path, img, "/DCTDecode", temporary=False)
+        lossless = img.format not in _LOSSY_FORMATS
+
+        img = open_scaled(img, dpi)
+
+        # Saydamlık beyaz zemin üzerine düşürülür; gri görseller gri kalır,
+        # diğer modlar RGB'ye çevrilir
+        if img.mode == "LA":
+            background = Image.new("L", img.size, 255)
+            background.paste(img.getchannel("L"), mask=img.getchannel("A"))
+            img = background
+        elif img.mode in ("RGBA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode not in ("RGB", "L", "1"):
+            img = img.convert("RGB")
+
+        if lossless and img.size == (width, height):
+            # Küçültülmeyen kayıpsız görsel kayıpsız kalır (siyah-beyaz 1 bit)
+            with open(output_path, "wb") as f:
+                f.write(zlib.compress(img.tobytes()))
+            return _page_info(output_path, img, "/FlateDecode")
+
+        if img.mode == "1":
+            img = img.convert("L")
+        img.save(output_path, format="JPEG", quality=quality, optimize=True)
+        return _page_info(output_path, img, "/DCTDecode")
+
+
+def _prepare_job(job):
+    return prepare_image(*job)
+
+
+class ImagePDFWriter:
+    """
+    Sayfa başına bir görsel içeren PDF'i doğrudan dosyaya yazan akış yazıcı.
+    Hazırlanan JPEG (DCTDecode) veya Flate verisi yeniden kodlanmadan aktarılır;
+    bellekte yalnızca nesne konumları tutulur.
+    """
+
+    def __init__(self, pdf_path):
+        self.file = open(pdf_path, "wb")
+        self.offsets = {}
+        self.page_ids = []
+        # 1: Katalog, 2: Sayfa ağacı (sonda yazılır)
+        self.next_id = 3
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _begin_object(self, object_id):
+        self.offsets[object_id] = self.file.tell()
+        self.file.write(f"{object_id} 0 obj\n".encode("ascii"))
+
+    def _write_object(self, object_id, body):
+        self._begin_object(object_id)
+        self.file.write(body + b"\nendobj\n")
+
+    def _write_stream(self, object_id, dictionary, source):
+        """Akış nesnesi yazar; kaynak dosyaysa parça parça kopyalanır"""
+        self._begin_object(object_id)
+        length = os.path.getsize(source) if isinstance(source, str) else len(source)
+        self.file.write(f"<< {dictionary} /Length {length} >>\nstream\n".encode("ascii"))
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                shutil.copyfileobj(f, self.file)
+        else:
+            self.file.write(source)
+        self.file.write(b"\nendstream\nendobj\n")
+
+    def add_page(self, page):
+        """
+        Hazırlanmış görseli yeni bir A4 sayfası olarak yazar
+
+        Args:
+            page: prepare_image ile döndürülen sayfa bilgisi
+        """
+        page_id, content_id, image_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+
+        colorspace = "/DeviceGray" if page["gray"] else "/DeviceRGB"
+        self._write_stream(
+            image_id,
+            f"/Type /XObject /Subtype /Image /Width {page['width']} /Height {page['height']} "
+            f"/ColorSpace {colorspace} /BitsPerComponent {page['bits']} /Filter {page['filter']}",
+            page["path"]
+        )
+
+        # PDF koordinatları sol alt köşeden başlar
+        x, y, width, height = (value * PT_PER_MM for value in page["placement"])
+        y = PAGE_HEIGHT * PT_PER_MM - y - height
+        content = f"q {width:.2f} 0 0 {height:.2f} {x:.2f} {y:.2f} cm /Im0 Do Q".encode("ascii")
+        self._write_stream(content_id, "", content)
+
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R "
+            f"/MediaBox [0 0 {PAGE_WIDTH * PT_PER_MM:.2f} {PAGE_HEIGHT * PT_PER_MM:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii"))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """Sayfa ağacını, kataloğu ve xref tablosunu yazar ve dosyayı kapatır"""
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii"))
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n0000000000 65535 f \n".encode("ascii"))
+        for object_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[object_id]:010d} 00000 n \n".encode("ascii"))
+        self.file.write(
+            f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+        self.file.close()
+
+    def abort(self):
+        """Yarım kalan çıktıyı kapatır"""
+        self.file.close()
+
+
+def images_to_pdf(image_paths, pdf_path, dpi=DEFAULT_DPI, quality=DEFAULT_QUALITY, workers=DEFAULT_WORKERS):
+    """
+    Birden çok görseli sırasıyla tek PDF'e dönüştürür
+
+    Args:
+        image_paths: Giriş görsel dosyası yolları (her biri bir sayfa)
+        pdf_path: Çıkış PDF dosyası yolu
+        dpi: Yerleşim boyutunda hedef çözünürlük
+        quality: JPEG kalitesi
+        workers: Görselleri hazırlayacak en fazla paralel işçi süreç sayısı
+
+    Returns:
+        Yazılan sayfa sayısı
+    """
+    work_dir = tempfile.mkdtemp(prefix="scan_to_pdf_")
+    writer = None
+    try:
+        jobs = [
+            (image_path, os.path.join(work_dir, f"page_{index:05d}.img"), dpi, quality)
+            for index, image_path in enumerate(image_paths)
+        ]
+
+        writer = ImagePDFWriter(pdf_path)
+
+        # Süreç havuzu içinde (ör. converter_worker işçileri) alt süreç açılamaz
+        parallel = len(jobs) > 1 and workers > 1 and not multiprocessing.current_process().daemon
+        if parallel:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                # Sonuçlar sırayla gelir; her sayfa yazılır yazılmaz ara dosyası silinir
+                for page in executor.map(_prepare_job, jobs):
+                    writer.add_page(page)
+                    if page["temporary"]:
+                        os.unlink(page["path"])
+        else:
+            for job in jobs:
+                page = _prepare_job(job)
+                writer.add_page(page)
+                if page["temporary"]:
+                    os.unlink(page["path"])
+
+        writer.close()
+        writer = None
+        return len(jobs)
+    finally:
+        if writer is not None:
+            writer.abort()
+            if os.path.exists(pdf_path):
+                os.unlink(pdf_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
 
 def image_to_pdf(image_path, pdf_path):
     """
     Görsel dosyasını PDF'e dönüştürür
-    
+
     Args:
         image_path: Giriş görsel dosyası yolu
         pdf_path: Çıkış PDF dosyası yolu
     """
     try:
-        # Görseli aç ve boyutlarını al
-        with Image.open(image_path) as img:
-            # RGBA modunda ise RGB'ye dönüştür
-            if img.mode == 'RGBA':
-                img = img.convert('RGB')
-            
-            img_width, img_height = img.size
-            
-            # PDF oluştur
-            pdf = FPDF()
-            
-            # A4 sayfa boyutları (mm)
-            page_width = 210
-            page_height = 297
-            
-            # Görsel oranını koru ve sayfaya sığdır
-            aspect_ratio = img_width / img_height
-            
-            if aspect_ratio > page_width / page_height:
-                # Görsel daha geniş, genişliğe göre ayarla
-                pdf_img_width = page_width - 20  # 10mm kenar boşluğu
-                pdf_img_height = pdf_img_width / aspect_ratio
-            else:
-                # Görsel daha uzun, yüksekliğe göre ayarla
-                pdf_img_height = page_height - 20  # 10mm kenar boşluğu
-                pdf_img_width = pdf_img_height * aspect_ratio
-            
-            # Ortalamak için pozisyon hesapla
-            x = (page_width - pdf_img_width) / 2
-            y = (page_height - pdf_img_height) / 2
-            
-            # Sayfa ekle ve görseli yerleştir
-            pdf.add_page()
-            pdf.image(image_path, x=x, y=y, w=pdf_img_width, h=pdf_img_height)
-            
-            # PDF'i kaydet
-            pdf.output(pdf_path)
-            
-            print(f"PDF başarıyla oluşturuldu: {pdf_path}")
-            return True
-            
+        images_to_pdf([image_path], pdf_path)
+        print(f"PDF başarıyla oluşturuldu: {pdf_path}")
+        return True
+
     except Exception as e:
         print(f"Hata: {str(e)}", file=sys.stderr)
         return False
 
+
 def main():
     """
     Ana fonksiyon - komut satırı argümanlarını işle
     """
-    if len(sys.argv) != 3:
-        print("Kullanım: python3 scan_to_pdf.py input_image.jpg output.pdf", file=sys.stderr)
+    parser = argparse.ArgumentParser(
+        description="Görselleri PDF'e dönüştürür",
+        usage="python3 scan_to_pdf.py input_image.jpg [input_image2.jpg ...] output.pdf"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--metrics", action="store_true",
+                        help="Aşama sürelerini ve bayt sayılarını JSON satırı olarak yazdır")
+    args = parser.parse_args()
+    collector = metrics.begin("scan_to_pdf", args.metrics or None)
+
+    if len(args.paths) < 2:
+        print("Kullanım: python3 scan_to_pdf.py input_image.jpg [input_image2.jpg ...] output.pdf", file=sys.stderr)
         sys.exit(1)
-    
-    image_path = sys.argv[1]
-    pdf_path = sys.argv[2]
-    
-    # Giriş dosyasının varlığını kontrol et
-    if not os.path.exists(image_path):
-        print(f"Hata: Görsel dosyası bulunamadı: {image_path}", file=sys.stderr)
+    if args.dpi < 1 or args.workers < 1 or not 1 <= args.quality <= 95:
+        print("Hata: --dpi ve --workers pozitif, --quality 1-95 arasında olmalı", file=sys.stderr)
         sys.exit(1)
-    
+
+    image_paths = args.paths[:-1]
+    pdf_path = args.paths[-1]
+
+    # Giriş dosyalarının varlığını kontrol et
+    for image_path in image_paths:
+        if not os.path.exists(image_path):
+            print(f"Hata: Görsel dosyası bulunamadı: {image_path}", file=sys.stderr)
+            sys.exit(1)
+
     # Çıkış klasörünü oluştur
     output_dir = os.path.dirname(pdf_path)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
+
     # Dönüştürme işlemini gerçekleştir
-    success = image_to_pdf(image_path, pdf_path)
-    
-    if success:
-        sys.exit(0)
-    else:
+    collector.add_bytes_in(sum(os.path.getsize(image_path) for image_path in image_paths))
+    try:
+        with collector.stage("images_to_pdf"):
+            page_count = images_to_pdf(image_paths, pdf_path, args.dpi, args.quality, args.workers)
+    except Exception as e:
+        print(f"Hata: {str(e)}", file=sys.stderr)
+        collector.record("error")
         sys.exit(1)
+    collector.add_bytes_out(os.path.getsize(pdf_path))
+    collector.record("ok")
+
+    print(f"PDF başarıyla oluşturuldu: {pdf_path} ({page_count} sayfa)")
+    if collector.include:
+        print(json.dumps({"metrics": collector.snapshot()}))
+    sys.exit(0)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
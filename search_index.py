@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tam Metin Arama Dizini
+Yüklenen PDF'lerin sayfa metinlerini PyMuPDF ile süreç havuzunda çıkarır ve
+belge başına kalıcı, sıkıştırılmış bir ters dizin (terim → sayfa listesi) yazar.
+Sorgular dizin dosyasını mmap ile açıp terim tablosunda ikili arama yaptığından
+binlerce sayfalık belgelerde de milisaniyeler içinde yanıtlanır.
+
+Belge değiştiğinde yalnızca içerik akışı değişen sayfaların metni yeniden
+çıkarılır; diğer sayfaların terimleri mevcut dizinden alınır.
+
+Terimler büyük/küçük harf ve aksan farkı gözetmeden eşleşir ("İŞLEM", "işlem"
+ve "islem" aynı terimdir). Sorguda "*" ile biten terimler önek araması yapar.
+
+Dizin dosyası biçimi (küçük endian):
+    "NVIX" + u16 biçim sürümü
+    u32 üst veri uzunluğu + üst veri JSON (sayfa sayısı, sayfa özetleri, sürüm)
+    u32 terim sayısı
+    terim tablosu: (terim_ofseti, liste_ofseti, sayfa_sayısı) u32 üçlüleri,
+                   sonda uzunlukları belirleyen bir bekçi kaydı
+    terimler: UTF-8 baytları, bayt sırasına göre sıralı
+    listeler: artan sayfa numaraları, fark olarak varint kodlanmış
+
+Ortam değişkenleri:
+    NOVAPDF_INDEX_DIR               Dizin dosyalarının dizini (varsayılan: <tmp>/novapdf-index)
+
+Kullanım:
+    python3 search_index.py build (--input <pdf> | --stdin | <base64>) [belge_kimliği] [--workers N]
+    python3 search_index.py query <belge_kimliği> <sorgu> [--any] [--limit N]
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import tempfile
+import unicodedata
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
+
+import metrics
+from transport import Transport, ArgumentParser
+from tool_io import workspace_dir
+from result_cache import hash_file, source_version
+
+DEFAULT_INDEX_DIR = os.path.join(tempfile.gettempdir(), "novapdf-index")
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+MAGIC = b"NVIX"
+FORMAT_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# Bir işçiye tek seferde verilen en fazla sayfa (belge her parçada bir kez açılır)
+MAX_CHUNK_PAGES = 32
+
+# Dizine alınan terim uzunluğu sınırları (tek harfler ve anlamsız uzun dizgiler atlanır)
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+
+# Önek aramasında genişletilecek en fazla terim
+MAX_PREFIX_TERMS = 1000
+
+_HEADER = struct.Struct("<4sH")
+_LENGTH = struct.Struct("<I")
+_TERM_ENTRY = struct.Struct("<III")
+
+_TOKEN = re.compile(r"\w+")
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+# Türkçe noktalı/noktasız i casefold ile tek harfe inmez
+_DOTTED_I = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_DOCUMENT_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def normalize(text):
+    """Metni büyük/küçük harf ve aksanlardan arındırır"""
+    text = unicodedata.normalize("NFKD", text.translate(_DOTTED_I).casefold())
+    return _COMBINING.sub("", text)
+
+
+def tokenize(text):
+    """Metindeki dizine alınacak terimlerin kümesini döndürür"""
+    return {
+        token for token in _TOKEN.findall(normalize(text))
+        if MIN_TERM_LENGTH <= len(token) <= MAX_TERM_LENGTH
+    }
+
+
+def index_dir():
+    """Dizin dosyalarının yazılacağı dizini döndürür"""
+    return os.environ.get("NOVAPDF_INDEX_DIR") or DEFAULT_INDEX_DIR
+
+
+def index_path_for(document_id):
+    """
+    Belge kimliğine karşılık gelen dizin dosyası yolunu döndürür
+
+    Args:
+        document_id: Harf, rakam, "_", "-" ve "." içeren belge kimliği
+    """
+    if not _DOCUMENT_ID.match(document_id) or document_id.startswith("."):
+        raise ValueError(f"Geçersiz belge kimliği: {document_id}")
+    return os.path.join(index_dir(), document_id + INDEX_SUFFIX)
+
+
+def page_hashes(document):
+    """
+    Sayfaların içerik özetlerini döndürür. Metin çıkarmadan çok daha ucuzdur;
+    sayfa nesnesi (kaynak başvuruları dahil) ve içerik akışlarının ham baytları özetlenir.
+    """
+    hashes = []
+    for page in document:
+        digest = hashlib.sha256(document.xref_object(page.xref, compressed=True).encode("utf-8"))
+        for xref in page.get_contents():
+            digest.update(document.xref_stream_raw(xref) or b"")
+        hashes.append(digest.hexdigest()[:16])
+    return hashes
+
+
+def _extract_chunk(job):
+    """Süreç havuzunda çalışır; belgeyi bir kez açıp parçadaki sayfaların terimlerini çıkarır"""
+    pdf_path, pages = job
+    with pymupdf.open(pdf_path) as document:
+        return [(page, sorted(tokenize(document[page].get_text("text")))) for page in pages]
+
+
+def extract_terms(pdf_path, pages, workers=DEFAULT_WORKERS):
+    """
+    Sayfaların terimlerini paralel olarak çıkarır
+
+    Args:
+        pdf_path: PDF dosya yolu
+        pages: 0'dan başlayan sayfa numaraları
+        workers: En fazla işçi süreç sayısı
+
+    Returns:
+        {sayfa: terim listesi} sözlüğü
+    """
+    workers = min(max(1, workers), len(pages))
+    chunk_size = max(1, min(MAX_CHUNK_PAGES, len(pages) // max(1, workers * 4)))
+    jobs = [(pdf_path, pages[start:start + chunk_size]) for start in range(0, len(pages), chunk_size)]
+
+    terms = {}
+    # Süreç havuzu içinde (ör. converter_worker işçileri) alt süreç açılamaz
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        for job in jobs:
+            terms.update(_extract_chunk(job))
+        return terms
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_extract_chunk, jobs):
+            terms.update(chunk)
+    return terms
+
+
+def _encode_postings(pages):
+    out = bytearray()
+    previous = -1
+    for page in pages:
+        delta = page - previous
+        previous = page
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return out
+
+
+def _decode_postings(buffer, start, end):
+    pages = []
+    page = -1
+    delta = 0
+    shift = 0
+    for position in range(start, end):
+        byte = buffer[position]
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        page += delta
+        pages.append(page)
+        delta = 0
+        shift = 0
+    return pages
+
+
+def write_index(path, postings, meta):
+    """
+    Ters dizini dosyaya atomik olarak yazar
+
+    Args:
+        path: Dizin dosyası yolu
+        postings: {terim: artan sayfa listesi}
+        meta: Üst veri sözlüğü
+
+    Returns:
+        Yazılan bayt sayısı
+    """
+    encoded = sorted((term.encode("utf-8"), pages) for term, pages in postings.items())
+    table = bytearray()
+    terms = bytearray()
+    lists = bytearray()
+    for term, pages in encoded:
+        table += _TERM_ENTRY.pack(len(terms), len(lists), len(pages))
+        terms += term
+        lists += _encode_postings(pages)
+    table += _TERM_ENTRY.pack(len(terms), len(lists), 0)
+
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".index-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            f.write(_LENGTH.pack(len(meta_bytes)))
+            f.write(meta_bytes)
+            f.write(_LENGTH.pack(len(encoded)))
+            f.write(table)
+            f.write(terms)
+            f.write(lists)
+        # Sorgular eski dosyayı okurken yenisi yerine geçer
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return os.path.getsize(path)
+
+
+class SearchIndex:
+    """
+    Dizin dosyasını mmap ile açar ve sorguları yanıtlar
+
+    Args:
+        path: Dizin dosyası yolu
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version = _HEADER.unpack_from(self._buffer, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Desteklenmeyen dizin dosyası: {path}")
+            offset = _HEADER.size
+            (meta_length,) = _LENGTH.unpack_from(self._buffer, offset)
+            offset += _LENGTH.size
+            self.meta = json.loads(self._buffer[offset:offset + meta_length])
+            offset += meta_length
+            (self.term_count,) = _LENGTH.unpack_from(self._buffer, offset)
+            self._table = offset + _LENGTH.size
+            self._terms = self._table + (self.term_count + 1) * _TERM_ENTRY.size
+            terms_length = self._entry(self.term_count)[0]
+            self._lists = self._terms + terms_length
+        except Exception:
+            self._buffer.close()
+            raise
+
+    @property
+    def page_count(self):
+        return self.meta["page_count"]
+
+    def close(self):
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _entry(self, index):
+        return _TERM_ENTRY.unpack_from(self._buffer, self._table + index * _TERM_ENTRY.size)
+
+    def _term(self, index):
+        start = self._entry(index)[0]
+        end = self._entry(index + 1)[0]
+        return self._buffer[self._terms + start:self._terms + end]
+
+    def _pages(self, index):
+        start = self._entry(index)[1]
+        end = self._entry(index + 1)[1]
+        return _decode_postings(self._buffer, self._lists + start, self._lists + end)
+
+    def _lower_bound(self, key):
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, term):
+        """
+        Normalize edilmiş bir terimin geçtiği sayfaları döndürür
+
+        Returns:
+            0'dan başlayan artan sayfa listesi
+        """
+        key = term.encode("utf-8")
+        index = self._lower_bound(key)
+        if index < self.term_count and self._term(index) == key:
+            return self._pages(index)
+        return []
+
+    def lookup_prefix(self, prefix):
+        """Önekle başlayan terimlerin geçtiği sayfaların birleşimini döndürür"""
+        key = prefix.encode("utf-8")
+        pages = set()
+        index = self._lower_bound(key)
+        end = min(self.term_count, index + MAX_PREFIX_TERMS)
+        while index < end and self._term(index).startswith(key):
+            pages.update(self._pages(index))
+            index += 1
+        return sorted(pages)
+
+    def search(self, query, match_all=True):
+        """
+        Sorgudaki terimlerin geçtiği sayfaları bulur
+
+        Dizine hiç alınmayan uzunluktaki terimler (tokenize ile aynı sınırlar)
+        yok sayılır; tek harfli bir sözcük diğer terimlerin sonucunu boşaltmaz.
+
+        Args:
+            query: Boşlukla ayrılmış terimler ("önek*" önek araması yapar)
+            match_all: True ise tüm terimleri, False ise herhangi birini içeren sayfalar
+
+        Returns:
+            (1'den başlayan sayfa listesi, {terim: eşleşen sayfa sayısı})
+        """
+        result = None
+        counts = {}
+        for word in query.split():
+            prefix = word.endswith("*")
+            for term in _TOKEN.findall(normalize(word)):
+                # Önekler kısa olabilir, ancak en uzun terimden uzun önek hiçbir terime uymaz
+                if len(term) > MAX_TERM_LENGTH or (not prefix and len(term) < MIN_TERM_LENGTH):
+                    continue
+                pages = self.lookup_prefix(term) if prefix else self.lookup(term)
+                counts[term + ("*" if prefix else "")] = len(pages)
+                if result is None:
+                    result = set(pages)
+                elif match_all:
+                    result.intersection_update(pages)
+                else:
+                    result.update(pages)
+        return [page + 1 for page in sorted(result or ())], counts
+
+    def postings(self):
+        """Tüm dizini {terim: sayfa listesi} olarak döndürür (artımlı güncelleme için)"""
+        return {self._term(index).decode("utf-8"): self._pages(index) for index in range(self.term_count)}
+
+
+def _index_version():
+    return f"{FORMAT_VERSION}|{pymupdf.VersionBind}|{source_version(os.path.abspath(__file__))}"
+
+
+def build_index(pdf_path, index_path, workers=DEFAULT_WORKERS):
+    """
+    Belgenin ters dizinini oluşturur veya günceller. Mevcut dizin aynı
+    sürümle yazılmışsa yalnızca değişen ve yeni sayfaların metni çıkarılır.
+
+    Args:
+        pdf_path: PDF dosya yolu
+        index_path: Dizin dosyası yolu
+        workers: Metin çıkaracak en fazla işçi süreç sayısı
+
+    Returns:
+        Dizin istatistikleri sözlüğü
+    """
+    start = time.perf_counter()
+    version = _index_version()
+    with pymupdf.open(pdf_path) as document:
+        with metrics.stage("page_hashes"):
+            hashes = page_hashes(document)
+
+    postings = {}
+    previous_hashes = []
+    if os.path.exists(index_path):
+        try:
+            with SearchIndex(index_path) as previous:
+                if previous.meta.get("version") == version:
+                    previous_hashes = previous.meta["page_hashes"]
+                    if previous_hashes != hashes:
+                        with metrics.stage("load_index"):
+                            postings = previous.postings()
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Mevcut dizin okunamadı, yeniden oluşturuluyor: {e}", file=sys.stderr)
+            previous_hashes = []
+
+    changed = [
+        page for page, digest in enumerate(hashes)
+        if page >= len(previous_hashes) or previous_hashes[page] != digest
+    ]
+    stats = {
+        "page_count": len(hashes),
+        "pages_extracted": len(changed),
+        "pages_reused": len(hashes) - len(changed)
+    }
+    if previous_hashes == hashes:
+        # Belge değişmemiş; dizin olduğu gibi kullanılır
+        with SearchIndex(index_path) as existing:
+            stats["terms"] = existing.term_count
+        stats["index_bytes"] = os.path.getsize(index_path)
+        stats["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return stats
+
+    with metrics.stage("extract"):
+        page_terms = extract_terms(pdf_path, changed, workers)
+
+    with metrics.stage("merge"):
+        # Değişen ve silinen sayfaların eski kayıtlarını çıkar
+        stale = set(changed) | set(range(len(hashes), len(previous_hashes)))
+        if stale and postings:
+            for term in list(postings):
+                pages = [page for page in postings[term] if page not in stale]
+                if pages:
+                    postings[term] = pages
+                else:
+                    del postings[term]
+        added = {}
+        for page in changed:
+            for term in page_terms[page]:
+                added.setdefault(term, []).append(page)
+        for term, pages in added.items():
+            if term in postings:
+                postings[term] = sorted(set(postings[term]).union(pages))
+            else:
+                postings[term] = pages
+
+    meta = {"version": version, "page_count": len(hashes), "page_hashes": hashes, "built": round(time.time(), 3)}
+    with metrics.stage("write_index"):
+        stats["index_bytes"] = write_index(index_path, postings, meta)
+    stats["terms"] = len(postings)
+    stats["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return stats
+
+
+def query_index(document_id, query, match_all=True, limit=None):
+    """
+    Belgenin dizininde sorgu çalıştırır
+
+    Args:
+        document_id: Belge kimliği
+        query: Sorgu metni
+        match_all: True ise tüm terimleri içeren sayfalar döner
+        limit: En fazla döndürülecek sayfa sayısı
+
+    Returns:
+        Sonuç sözlüğü
+    """
+    start = time.perf_counter()
+    path = index_path_for(document_id)
+    if not os.path.exists(path):
+        raise ValueError(f"Belge için dizin bulunamadı: {document_id}")
+    with SearchIndex(path) as index:
+        pages, counts = index.search(query, match_all)
+        page_count = index.page_count
+    result = {
+        "document_id": document_id,
+        "page_count": page_count,
+        "matches": len(pages),
+        "pages": pages[:limit] if limit else pages,
+        "terms": counts,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
+    return result
+
+
+def _build_main(argv):
+    transport = None
+    temp_path = None
+    try:
+        transport = Transport(argv)
+        parser = ArgumentParser(description="PDF arama dizini oluşturma")
+        parser.add_argument("document_id", nargs="?")
+        parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+        args = parser.parse_args(transport.args)
+
+        if not transport.has_input:
+            raise ValueError("PDF içeriği verilmedi")
+
+        # İşçi süreçler belgeyi yoldan açar; diskte değilse bellekteki çalışma dizinine yazılır
+        if transport.input_path:
+            pdf_path = transport.input_path
+        else:
+            fd, temp_path = tempfile.mkstemp(suffix=".pdf", dir=workspace_dir())
+            os.close(fd)
+            pdf_path = temp_path
+            transport.write_input_file(pdf_path)
+
+        # Kimlik verilmezse içerik özeti kullanılır (bu durumda artımlı güncelleme olmaz)
+        document_id = args.document_id or hash_file(pdf_path)[:32]
+        index_path = index_path_for(document_id)
+        stats = build_index(pdf_path, index_path, args.workers)
+        transport.emit(dict(stats, document_id=document_id, index_path=index_path, error=None))
+
+    except Exception as e:
+        result = {"error": str(e)}
+        if transport is not None:
+            transport.emit(result)
+        else:
+            print(json.dumps(result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+
+def _query_main(argv):
+    parser = ArgumentParser(description="PDF arama dizininde sorgu")
+    parser.add_argument("document_id")
+    parser.add_argument("query", nargs="+")
+    parser.add_argument("--any", action="store_true", help="Terimlerden herhangi birini içeren sayfalar")
+    parser.add_argument("--limit", type=int, default=None)
+    try:
+        args = parser.parse_args(argv)
+        result = query_index(args.document_id, " ".join(args.query), not args.any, args.limit)
+        print(json.dumps(dict(result, error=None)))
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+
+
+def main():
+    """
+    Komut satırından çağrıldığında çalışır.
+    İlk argüman "build" (dizin oluşturma/güncelleme) veya "query" (sorgu) olmalıdır.
+    """
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "query"):
+        print(json.dumps({"error": "Kullanım: search_index.py (build | query) ..."}))
+        sys.exit(1)
+    if sys.argv[1] == "build":
+        _build_main(sys.argv[2:])
+    else:
+        _query_main(sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
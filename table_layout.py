@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vektörel Tablo Yerleşim Motoru
+Tablo hücrelerini tek tek `pdf.cell` ile yazmak yerine her sütunu pandas/NumPy
+metin işlemleriyle toplu olarak biçimlendirir (metne çevirme, latin-1'e indirgeme,
+kısaltma, PDF kaçışları) ve bir sayfaya düşen tüm satırları tek seferde sayfa
+içerik akışına yazar. Sütun genişlikleri örneklenen içerikten hesaplanır ve
+başlık satırı her sayfada tekrarlanır.
+
+Unicode (TTF) fontta hücreler latin-1'e indirgenmez; FPDF'in Identity-H
+kodlamasına uygun UTF-16BE onaltılık dizgeler olarak yazılır (bkz. pdf_fonts.py).
+"""
+
+import math
+from itertools import chain, repeat
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import pdf_fonts
+
+# Varsayılan tablo düzeni (mm)
+ROW_HEIGHT = 10
+TABLE_WIDTH = 180
+PAGE_BOTTOM_MARGIN = 15
+MIN_COL_WIDTH = 12
+
+# Genişlik hesabında kullanılacak örnek satır sayısı
+SAMPLE_ROWS = 200
+
+# Hücre metni hiçbir zaman bu uzunluğun altına kısaltılmaz (eski 40 mm'lik
+# hücrelerde 15 karakter kısaltılmadan yazılıyordu)
+MIN_CELL_CHARS = 15
+
+# Ortalama karakter genişliği hesabı için örnek metin
+_WIDTH_SAMPLE = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 .,-"
+
+# Sütun birleştirilirken hücreleri ayıran karakter (latin-1'de var, metinde beklenmez)
+_CELL_SEPARATOR = "\x00"
+
+# Her hücre metnini kapatan içerik akışı komutları (latin-1 ve Unicode fontlar)
+_CELL_SUFFIX = ") Tj ET\n"
+_HEX_CELL_SUFFIX = "> Tj ET\n"
+
+# Onaltılık dizgede ayırıcının kodlaması (2 baytlık birimler boşlukla ayrıldığından
+# yalnızca birim sınırında eşleşir)
+_HEX_SEPARATOR = "0000"
+
+
+class FPDFDocument:
+    """
+    Düz bir FPDF nesnesini TableRenderer'ın beklediği belge arayüzüne uyarlar
+    (SegmentedPDF ile aynı `pdf` özelliği ve `add_page` yöntemi)
+    """
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+
+    def add_page(self):
+        self.pdf.add_page()
+
+
+def to_text(values):
+    """Bir sütunu metne çevirir; boş değerler boş metin olur"""
+    series = pd.Series(values, dtype=object) if not isinstance(values, pd.Series) else values
+    if series.dtype != object or series.isna().any():
+        series = series.astype(object).where(series.notna(), "")
+    return series.astype(str)
+
+
+def format_column(values, max_chars, glyphs=None):
+    """
+    Bir sütunun tüm hücrelerini tek seferde PDF'e yazılabilir hale getirir.
+    Hücreler tek bir metinde birleştirilir; satır sonu temizliği, latin-1'e
+    indirgeme ve PDF kaçışları bu metin üzerinde bir kez uygulanır.
+
+    Args:
+        values: Sütun değerleri (Series veya liste)
+        max_chars: Hücreye sığan en fazla karakter
+        glyphs: Verilirse hücreler Unicode font için UTF-16BE onaltılık dizgeye
+                çevrilir ve temel alt küme dışındaki karakterler bu kümeye eklenir
+
+    Returns:
+        PDF metin kaçışları uygulanmış (veya onaltılık) str Series
+    """
+    text = to_text(values)
+    cells = text.tolist()
+    if not cells:
+        return text
+
+    joined = _CELL_SEPARATOR.join(cells)
+    if joined.count(_CELL_SEPARATOR) != len(cells) - 1:
+        # Ayırıcıyı içeren hücreler var; birleştirmeden önce temizle
+        cells = [cell.replace(_CELL_SEPARATOR, " ") for cell in cells]
+        joined = _CELL_SEPARATOR.join(cells)
+
+    joined = joined.replace("\r", " ").replace("\n", " ")
+    if glyphs is None:
+        joined = joined.encode('latin-1', 'replace').decode('latin-1')
+    elif not joined.isascii():
+        joined = pdf_fonts.unicode_text(joined)
+        glyphs.update(pdf_fonts.extra_glyphs(joined))
+    cells = joined.split(_CELL_SEPARATOR)
+
+    cut = max(1, max_chars - 3)
+    lengths = np.fromiter(map(len, cells), dtype=np.int64, count=len(cells))
+    for index in np.flatnonzero(lengths > max_chars).tolist():
+        cells[index] = cells[index][:cut] + "..."
+
+    joined = _CELL_SEPARATOR.join(cells)
+    if glyphs is not None:
+        cells = joined.encode("utf-16-be").hex(" ", 2).split(_HEX_SEPARATOR)
+        return pd.Series(cells, index=text.index, dtype=object)
+    joined = joined.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return pd.Series(joined.split(_CELL_SEPARATOR), index=text.index, dtype=object)
+
+
+def compute_column_widths(pdf, headers, sample, table_width=TABLE_WIDTH, min_width=MIN_COL_WIDTH,
+                          header_char_width=None):
+    """
+    Örneklenen içerikten sütun genişliklerini hesaplar. Genişlikler %90'lık
+    içerik uzunluğuna göre belirlenir; tablo genişliğinden artan alan önce
+    içeriği sığmayan sütunlara (en uzun örnek hücreye kadar), kalanı eşit
+    olarak tüm sütunlara dağıtılır.
+
+    Args:
+        pdf: Gövde fontu seçili FPDF nesnesi (karakter genişliği ölçümü için)
+        headers: Sütun başlıkları
+        sample: Örnek satırları içeren DataFrame
+        table_width: Tablonun en fazla genişliği (mm)
+        min_width: Bir sütunun en az genişliği (mm)
+        header_char_width: Başlık fontunun ortalama karakter genişliği (varsayılan gövdeninki)
+
+    Returns:
+        Sütun genişlikleri listesi (mm)
+    """
+    column_count = len(headers)
+    if column_count == 0:
+        return []
+
+    char_width = pdf.get_string_width(_WIDTH_SAMPLE) / len(_WIDTH_SAMPLE)
+    header_char_width = header_char_width or char_width
+    padding = 2 * pdf.c_margin
+
+    desired = np.empty(column_count)
+    longest = np.empty(column_count)
+    for index in range(column_count):
+        header_width = len(str(headers[index])) * header_char_width
+        if sample is not None and index < sample.shape[1] and len(sample):
+            # Uç değerler tabloyu bozmasın diye %90'lık dilim kullanılır
+            lengths = to_text(sample.iloc[:, index]).str.len()
+            content_length = lengths.quantile(0.9)
+            longest_length = lengths.max()
+        else:
+            content_length = longest_length = 0
+        desired[index] = max(header_width, max(content_length, 1) * char_width) + padding
+        longest[index] = max(header_width, max(longest_length, 1) * char_width) + padding
+
+    widths = np.maximum(desired, min_width)
+    total = widths.sum()
+    if total > table_width:
+        if column_count * min_width >= table_width:
+            widths = np.full(column_count, table_width / column_count)
+        else:
+            # Önce en geniş sütunları kırp: tüm sütunlar ortak bir üst sınırla
+            # sınırlanır, sınırın altında kalan dar sütunlar olduğu gibi kalır
+            ordered = np.sort(widths)
+            remaining = table_width
+            cap = ordered[-1]
+            for index, width in enumerate(ordered):
+                share = remaining / (column_count - index)
+                if width > share:
+                    cap = share
+                    break
+                remaining -= width
+            widths = np.minimum(widths, cap)
+    else:
+        spare = table_width - total
+        needs = np.maximum(longest - widths, 0)
+        if needs.sum() > 0:
+            grow = needs * min(1.0, spare / needs.sum())
+            widths = widths + grow
+            spare -= grow.sum()
+        widths = widths + spare / column_count
+    return widths.tolist()
+
+
+class TableRenderer:
+    """
+    Satırları sayfa sayfa, tek bir içerik akışı bloğu olarak yazan tablo motoru
+    """
+
+    def __init__(self, document, headers, sample=None, row_height=ROW_HEIGHT,
+                 header_font_size=12, body_font_size=10, table_width=TABLE_WIDTH,
+                 bottom_margin=PAGE_BOTTOM_MARGIN, font_family=None):
+        """
+        Args:
+            document: `pdf` özelliği ve `add_page` yöntemi olan belge (SegmentedPDF, FPDFDocument)
+            headers: Sütun başlıkları
+            sample: Genişlik hesabı için örnek satırlar (DataFrame)
+            row_height: Satır yüksekliği (mm)
+            header_font_size: Başlık font boyutu
+            body_font_size: Gövde font boyutu
+            table_width: Tablonun en fazla genişliği (mm)
+            bottom_margin: Sayfa alt boşluğu (mm)
+            font_family: Font ailesi (varsayılan: belgeye kayıtlı Unicode font, yoksa Arial)
+        """
+        self.document = document
+        self.headers = [str(header) for header in headers]
+        self.column_count = len(self.headers)
+        self.row_height = row_height
+        self.header_font_size = header_font_size
+        self.body_font_size = body_font_size
+        self.bottom_margin = bottom_margin
+        self.font_family = font_family or pdf_fonts.font_family(document.pdf)
+        self.rows_written = 0
+        self._layouts = {}
+
+        pdf = document.pdf
+        font_family = self.font_family
+        pdf.set_font(font_family, 'B', size=header_font_size)
+        self.unicode = pdf_fonts.is_unicode(pdf)
+        self._cell_open, self._cell_suffix = ("<", _HEX_CELL_SUFFIX) if self.unicode else ("(", _CELL_SUFFIX)
+        header_char = pdf.get_string_width(_WIDTH_SAMPLE) / len(_WIDTH_SAMPLE)
+        pdf.set_font(font_family, size=body_font_size)
+        body_char = pdf.get_string_width(_WIDTH_SAMPLE) / len(_WIDTH_SAMPLE)
+
+        self.widths = compute_column_widths(pdf, self.headers, sample, table_width, header_char_width=header_char)
+        self.max_chars = [
+            max(MIN_CELL_CHARS, int((width - 2 * pdf.c_margin) / body_char)) for width in self.widths
+        ]
+
+        pdf.set_font(font_family, 'B', size=header_font_size)
+        self.header_glyphs = set() if self.unicode else None
+        self.header_cells = np.array([
+            format_column([header], max(MIN_CELL_CHARS, int((width - 2 * pdf.c_margin) / header_char)),
+                          self.header_glyphs).iloc[0]
+            for header, width in zip(self.headers, self.widths)
+        ], dtype=object).reshape(1, -1)
+        pdf.set_font(font_family, size=body_font_size)
+
+    def _capacity(self):
+        """Geçerli sayfada kalan satır sayısı"""
+        pdf = self.document.pdf
+        return int(math.floor((pdf.h - self.bottom_margin - pdf.get_y()) / self.row_height + 1e-9))
+
+    def _block_layout(self, y0, row_count, font_size):
+        """
+        Verilen konum ve satır sayısı için ızgara çizgilerini ve her hücrenin metin
+        konumlandırma önekini üretir. Gövde blokları her sayfada aynı konumdan
+        başladığından sonuç önbellekte tutulur.
+        """
+        key = (round(y0, 4), row_count, font_size)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            return layout
+
+        pdf = self.document.pdf
+        k = pdf.k
+        h = self.row_height
+
+        # Hücre sınırları: her satır sınırında yatay, her sütun sınırında dikey çizgi
+        x_edges = pdf.l_margin + np.concatenate(([0.0], np.cumsum(self.widths)))
+        y_edges = y0 + np.arange(row_count + 1) * h
+        left, right = x_edges[0] * k, x_edges[-1] * k
+        top, bottom = (pdf.h - y_edges[0]) * k, (pdf.h - y_edges[-1]) * k
+        grid = [f"{left:.2f} {y:.2f} m {right:.2f} {y:.2f} l" for y in (pdf.h - y_edges) * k]
+        grid += [f"{x * k:.2f} {top:.2f} m {x * k:.2f} {bottom:.2f} l" for x in x_edges]
+        grid.append("S\n")
+
+        # Metin konumları FPDF.cell ile aynı hesaplanır
+        font_size_mm = font_size / k
+        text_y = (pdf.h - (y_edges[:-1] + 0.5 * h + 0.3 * font_size_mm)) * k
+        text_x = [(x + pdf.c_margin) * k for x in x_edges[:-1]]
+        prefixes = [f"BT {x:.2f} {y:.2f} Td {self._cell_open}" for y in text_y for x in text_x]
+
+        layout = ("\n".join(grid), prefixes, float(y_edges[-1]))
+        self._layouts[key] = layout
+        return layout
+
+    def _emit_block(self, cells, font_size, glyphs=None):
+        """
+        Satır bloğunu (2 boyutlu, kaçışları uygulanmış metin dizisi) geçerli
+        sayfaya tek bir içerik akışı parçası olarak yazar; Unicode fontta
+        bloktaki ek glifler geçerli fontun alt kümesine eklenir
+        """
+        pdf = self.document.pdf
+        if glyphs:
+            pdf.current_font['subset'].extend(glyphs)
+        grid, prefixes, next_y = self._block_layout(pdf.get_y(), cells.shape[0], font_size)
+        text = "".join(chain.from_iterable(zip(prefixes, cells.ravel().tolist(), repeat(self._cell_suffix))))
+        pdf._out(grid + text)
+        pdf.set_y(next_y)
+
+    def write_header(self):
+        """Başlık satırını geçerli konuma yazar"""
+        if self.column_count == 0:
+            return
+        pdf = self.document.pdf
+        if self._capacity() < 2:
+            self.document.add_page()
+            pdf = self.document.pdf
+        pdf.set_font(self.font_family, 'B', size=self.header_font_size)
+        self._emit_block(self.header_cells, self.header_font_size, self.header_glyphs)
+        pdf.set_font(self.font_family, size=self.body_font_size)
+
+    def write_frame(self, frame):
+        """
+        DataFrame satırlarını yazar; sayfa dolduğunda yeni sayfa açar ve başlığı tekrarlar
+
+        Args:
+            frame: Yazılacak satırlar (sütun sırası başlıklarla aynı kabul edilir)
+        """
+        if self.column_count == 0 or frame.empty:
+            return
+
+        # Sütun sayısını başlıklara eşitle (eksik sütunlar boş, fazlası atılır)
+        if frame.shape[1] != self.column_count:
+            frame = frame.set_axis(range(frame.shape[1]), axis=1)
+            frame = frame.reindex(columns=range(self.column_count), fill_value="")
+
+        glyphs = set() if self.unicode else None
+        with metrics.stage("format_cells"):
+            cells = np.empty((len(frame), self.column_count), dtype=object)
+            for column in range(self.column_count):
+                cells[:, column] = format_column(
+                    frame.iloc[:, column], self.max_chars[column], glyphs
+                ).to_numpy(dtype=object)
+
+        with metrics.stage("layout"):
+            start = 0
+            while start < len(cells):
+                capacity = self._capacity()
+                if capacity <= 0:
+                    self.document.add_page()
+                    self.write_header()
+                    continue
+                block = cells[start:start + capacity]
+                self.document.pdf.set_font(self.font_family, size=self.body_font_size)
+                self._emit_block(block, self.body_font_size, glyphs)
+                start += len(block)
+
+        self.rows_written += len(cells)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ortak test ayarları: her test kendi geçici önbellek, dizin ve zamanlayıcı
+dizinlerini kullanır; ölçüm dosyası ve ortam bayrakları testleri etkilemez.
+"""
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def isolated_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOVAPDF_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("NOVAPDF_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("NOVAPDF_SCHEDULER_DIR", str(tmp_path / "scheduler"))
+    for name in ("NOVAPDF_CACHE", "NOVAPDF_CACHE_MAX_BYTES", "NOVAPDF_METRICS", "NOVAPDF_METRICS_FILE",
+                 "NOVAPDF_PREFLIGHT"):
+        monkeypatch.delenv(name, raising=False)
+    # Her test yeni bir ölçüm toplayıcısıyla başlar
+    metrics.begin("test")
+    yield
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""image_compressor hedef boyut araması (deneme seçimi ve ikiye bölme)"""
+
+import pytest
+
+import image_compressor
+from image_compressor import _pick_probes, compress_to_target_size, TARGET_LADDER
+
+ORIGINAL_SIZE = 2000
+
+
+class SerialExecutor:
+    """ProcessPoolExecutor yerine işleri aynı süreçte sırayla çalıştırır"""
+
+    instances = []
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.shut_down = False
+        SerialExecutor.instances.append(self)
+
+    def map(self, function, jobs):
+        return [function(job) for job in jobs]
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+@pytest.mark.parametrize("low, high, center, count, expected", [
+    (0, 10, 5, 4, [2, 3, 4, 5]),
+    (0, 10, 1, 4, [0, 1]),
+    (0, 10, 10, 1, [10]),
+    (3, 10, None, 1, [6]),
+    (0, 10, None, 4, [0, 3, 7, 10]),
+    (4, 5, None, 4, [4, 5]),
+    (2, 2, None, 3, [2]),
+])
+def test_pick_probes(low, high, center, count, expected):
+    assert _pick_probes(low, high, center, count) == expected
+
+
+@pytest.fixture
+def fake_search(tmp_path, monkeypatch):
+    """
+    Analiz, tahmin ve deneme sıkıştırmasını sahteler. Döndürülen işlev
+    basamak başına gerçek ve tahmini boyutları ayarlar; denenen basamaklar
+    `probed` listesinde toplanır.
+    """
+    input_path = tmp_path / "in.pdf"
+    input_path.write_bytes(b"x" * ORIGINAL_SIZE)
+    state = {"sizes": [], "estimates": [], "probed": []}
+
+    def probe(job):
+        _, output_path, settings, _ = job
+        index = TARGET_LADDER.index(settings)
+        state["probed"].append(index)
+        size = state["sizes"][index]
+        with open(output_path, "wb") as f:
+            f.write(b"y" * size)
+        return size
+
+    monkeypatch.setattr(image_compressor, "analyze_pdf", lambda path: {"images": 1, "file_size": ORIGINAL_SIZE})
+    monkeypatch.setattr(image_compressor, "estimate_size",
+                        lambda analysis, settings: state["estimates"][TARGET_LADDER.index(settings)])
+    monkeypatch.setattr(image_compressor, "_probe", probe)
+    monkeypatch.setattr(image_compressor, "ProcessPoolExecutor", SerialExecutor)
+    SerialExecutor.instances = []
+
+    def run(sizes, estimates, target, workers=1):
+        state.update(sizes=sizes, estimates=estimates, probed=[])
+        output_path = tmp_path / "out.pdf"
+        stats = compress_to_target_size(str(input_path), str(output_path), target, workers)
+        return stats, output_path, state["probed"]
+
+    return run
+
+
+SIZES = [1100 - 100 * index for index in range(len(TARGET_LADDER))]
+
+
+@pytest.mark.parametrize("estimates", [
+    SIZES,
+    [size + 300 for size in SIZES],
+    [size - 300 for size in SIZES],
+    [100] * len(TARGET_LADDER),
+    [5000] * len(TARGET_LADDER),
+], ids=["exact", "pessimistic", "optimistic", "all-pass", "none-pass"])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_target_search_picks_least_lossy_passing_step(fake_search, estimates, workers):
+    stats, output_path, probed = fake_search(SIZES, estimates, 650, workers)
+    assert stats["target_met"]
+    assert stats["settings"] == TARGET_LADDER[5]
+    assert output_path.stat().st_size == SIZES[5]
+    assert stats["probes"] == len(probed)
+    # İkiye bölme tüm basamakları denemez
+    assert len(set(probed)) < len(TARGET_LADDER)
+
+
+def test_target_search_uses_estimate_first(fake_search):
+    stats, _, probed = fake_search(SIZES, SIZES, 650, workers=1)
+    assert stats["estimated_step"] == 5
+    assert probed[0] == 5
+    assert stats["rounds"] == stats["probes"]
+
+
+def test_target_search_parallel_rounds(fake_search):
+    stats, _, probed = fake_search(SIZES, SIZES, 650, workers=4)
+    # İlk tur tahmin edilen basamak ve daha az kayıplı üç komşusudur
+    assert probed[:4] == [2, 3, 4, 5]
+    assert stats["rounds"] == 1
+    assert SerialExecutor.instances and all(executor.shut_down for executor in SerialExecutor.instances)
+
+
+def test_target_not_met_returns_smallest(fake_search):
+    stats, output_path, _ = fake_search(SIZES, SIZES, 50)
+    assert not stats["target_met"]
+    assert stats["settings"] == TARGET_LADDER[-1]
+    assert output_path.stat().st_size == SIZES[-1]
+
+
+def test_no_reduction_returns_original(fake_search):
+    sizes = [ORIGINAL_SIZE + 10] * len(TARGET_LADDER)
+    stats, output_path, _ = fake_search(sizes, sizes, 500)
+    assert not stats["target_met"]
+    assert stats["settings"] is None
+    assert output_path.stat().st_size == ORIGINAL_SIZE
+
+
+def test_input_already_under_target(fake_search):
+    stats, output_path, probed = fake_search(SIZES, SIZES, ORIGINAL_SIZE)
+    assert stats["target_met"]
+    assert stats["settings"] is None
+    assert stats["probes"] == 0 and probed == []
+    assert output_path.stat().st_size == ORIGINAL_SIZE
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""result_cache.ResultCache isabet/ıskalama, tahliye ve toplu mod"""
+
+import os
+import json
+
+import pytest
+
+import result_cache
+from result_cache import ResultCache, cached_bytes_operation, cached_file_operation
+
+
+def _key(name):
+    return ResultCache.make_key(name, "ghostscript", "/ebook", "10.0")
+
+
+def _stats(cache):
+    with open(os.path.join(cache.cache_dir, result_cache.STATS_FILE)) as f:
+        return json.load(f)
+
+
+def _set_mtime(cache, key, mtime):
+    os.utime(cache._entry_path(key), (mtime, mtime))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+
+
+def test_make_key_depends_on_every_part():
+    base = ResultCache.make_key("abc", "ghostscript", "/ebook", "10.0")
+    assert base == ResultCache.make_key("abc", "ghostscript", "/ebook", "10.0")
+    assert base != ResultCache.make_key("abd", "ghostscript", "/ebook", "10.0")
+    assert base != ResultCache.make_key("abc", "qpdf", "/ebook", "10.0")
+    assert base != ResultCache.make_key("abc", "ghostscript", "/screen", "10.0")
+    assert base != ResultCache.make_key("abc", "ghostscript", "/ebook", "10.1")
+
+
+def test_miss_then_hit(cache):
+    key = _key("a")
+    data, info = cache.fetch(key)
+    assert data is None
+    assert info == {"hit": False, "hits": 0, "misses": 1}
+
+    cache.store(key, data=b"sonuc")
+    data, info = cache.fetch(key)
+    assert data == b"sonuc"
+    assert info == {"hit": True, "hits": 1, "misses": 1}
+    assert _stats(cache)["bytes"] == len(b"sonuc")
+
+
+def test_fetch_without_record_leaves_counters(cache):
+    key = _key("a")
+    assert cache.fetch(key, record=False) == (None, None)
+    cache.store(key, data=b"x")
+    assert cache.fetch(key, record=False) == (b"x", None)
+    stats = _stats(cache)
+    assert (stats["hits"], stats["misses"]) == (0, 0)
+
+
+def test_fetch_to_destination_and_store_from_file(cache, tmp_path):
+    source = tmp_path / "src.pdf"
+    source.write_bytes(b"%PDF dosya")
+    key = _key("a")
+    cache.store(key, src_path=str(source))
+
+    dest = tmp_path / "dest.pdf"
+    found, info = cache.fetch(key, str(dest))
+    assert found is True and info["hit"]
+    assert dest.read_bytes() == b"%PDF dosya"
+
+    found, info = cache.fetch(_key("b"), str(tmp_path / "missing.pdf"))
+    assert found is None and not info["hit"]
+    assert not (tmp_path / "missing.pdf").exists()
+
+
+def test_overwrite_keeps_byte_total(cache):
+    key = _key("a")
+    cache.store(key, data=b"x" * 100)
+    cache.store(key, data=b"x" * 40)
+    assert _stats(cache)["bytes"] == 40 == cache._scan()[1]
+
+
+def test_eviction_removes_least_recently_used(cache):
+    for index, name in enumerate(("a", "b", "c")):
+        cache.store(_key(name), data=b"x" * 400)
+        _set_mtime(cache, _key(name), 1000 + index)
+    # "c" eklenince bütçe aşıldı, en eski "a" silindi
+    assert cache.fetch(_key("a"))[0] is None
+    assert _stats(cache)["bytes"] == 800
+
+    # "b" okununca en yeni kullanılan olur; sonraki tahliye "c"yi siler
+    _set_mtime(cache, _key("c"), 2000)
+    assert cache.fetch(_key("b"))[0] is not None
+    cache.store(_key("d"), data=b"x" * 400)
+    assert cache.fetch(_key("b"))[0] is not None
+    assert cache.fetch(_key("c"))[0] is None
+    assert cache.fetch(_key("d"))[0] is not None
+    assert _stats(cache)["bytes"] == 800 == cache._scan()[1]
+
+
+def test_missing_byte_total_is_rescanned(cache):
+    cache.store(_key("a"), data=b"x" * 300)
+    os.unlink(os.path.join(cache.cache_dir, result_cache.STATS_FILE))
+    cache.store(_key("b"), data=b"x" * 200)
+    assert _stats(cache)["bytes"] == 500
+
+
+def test_batch_mode_defers_counters(cache):
+    cache.begin_batch()
+    assert cache.fetch(_key("a")) == (None, {"hit": False})
+    cache.store(_key("a"), data=b"x" * 10)
+    assert cache.fetch(_key("a")) == (b"x" * 10, {"hit": True})
+    assert not os.path.exists(os.path.join(cache.cache_dir, result_cache.STATS_FILE))
+
+    cache.end_batch()
+    assert _stats(cache) == {"hits": 1, "misses": 1, "bytes": 10}
+
+
+def test_batch_mode_evicts_at_end(cache):
+    cache.begin_batch()
+    for index, name in enumerate(("a", "b", "c")):
+        cache.store(_key(name), data=b"x" * 400)
+        _set_mtime(cache, _key(name), 1000 + index)
+    assert cache._scan()[1] == 1200
+    cache.end_batch()
+    assert _stats(cache)["bytes"] == 800
+    assert cache.fetch(_key("a"), record=False)[0] is None
+
+
+def test_insecure_default_directory_is_rejected(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    monkeypatch.delenv("NOVAPDF_CACHE_DIR")
+    monkeypatch.setattr(result_cache, "DEFAULT_CACHE_DIR", str(shared))
+    with pytest.raises(OSError):
+        ResultCache()
+
+
+def test_cached_bytes_operation_runs_operation_once():
+    calls = []
+
+    def operation():
+        calls.append(1)
+        return b"cikti"
+
+    data, info = cached_bytes_operation("ghostscript", "/ebook", "1", b"girdi", operation)
+    assert (data, info["hit"]) == (b"cikti", False)
+    data, info = cached_bytes_operation("ghostscript", "/ebook", "1", b"girdi", operation)
+    assert (data, info["hit"]) == (b"cikti", True)
+    assert len(calls) == 1
+
+
+def test_cached_file_operation(tmp_path):
+    source = tmp_path / "in.pdf"
+    source.write_bytes(b"girdi")
+    calls = []
+
+    def operation(src, dst):
+        calls.append(src)
+        with open(dst, "wb") as f:
+            f.write(b"cikti")
+
+    for name in ("out1.pdf", "out2.pdf"):
+        cached_file_operation("qpdf", "high", "1", str(source), str(tmp_path / name), operation)
+        assert (tmp_path / name).read_bytes() == b"cikti"
+    assert len(calls) == 1
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setenv("NOVAPDF_CACHE", "0")
+    calls = []
+    for _ in range(2):
+        data, info = cached_bytes_operation("ghostscript", "/ebook", "1", b"girdi",
+                                            lambda: calls.append(1) or b"cikti")
+        assert (data, info) == (b"cikti", None)
+    assert len(calls) == 2
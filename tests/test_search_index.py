@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""search_index kodlama, sorgu ve artımlı güncelleme"""
+
+import pymupdf
+import pytest
+
+import search_index
+from search_index import (
+    SearchIndex, build_index, query_index, index_path_for, write_index,
+    normalize, tokenize, _encode_postings, _decode_postings
+)
+
+PAGES = [
+    "Fatura ISLEM kaydi",
+    "Sözleşme ve fatura eki",
+    "Rapor özeti",
+]
+
+
+def make_pdf(path, texts):
+    with pymupdf.open() as document:
+        for text in texts:
+            page = document.new_page()
+            page.insert_text((72, 72), text, fontname="helv")
+        document.save(str(path))
+
+
+@pytest.mark.parametrize("pages", [
+    [],
+    [0],
+    [0, 1, 2, 3],
+    [5, 200, 201, 20000, 3000000],
+])
+def test_postings_roundtrip(pages):
+    encoded = _encode_postings(pages)
+    assert _decode_postings(encoded, 0, len(encoded)) == pages
+
+
+def test_postings_use_delta_varints():
+    # 0 ve 1 için birer bayt, 129 sayfalık boşluk için iki bayt
+    assert bytes(_encode_postings([0, 1, 130])) == bytes([1, 1, 0x81, 0x01])
+
+
+def test_normalize_folds_case_and_accents():
+    assert normalize("İŞLEM") == normalize("işlem") == normalize("ISLEM") == "islem"
+    assert normalize("Çığ") == "cig"
+    assert tokenize("a bc Def bc") == {"bc", "def"}
+
+
+def test_write_and_read_index(tmp_path):
+    path = tmp_path / "doc.idx"
+    postings = {"fatura": [0, 1], "rapor": [2], "rapo": [1], "sozlesme": [1]}
+    write_index(str(path), postings, {"page_count": 3})
+    with SearchIndex(str(path)) as index:
+        assert index.page_count == 3
+        assert index.term_count == 4
+        assert index.lookup("fatura") == [0, 1]
+        assert index.lookup("yok") == []
+        assert index.lookup_prefix("rap") == [1, 2]
+        assert index.postings() == postings
+        assert index.search("fatura rapor") == ([], {"fatura": 2, "rapor": 1})
+        assert index.search("fatura rapor", match_all=False) == ([1, 2, 3], {"fatura": 2, "rapor": 1})
+        assert index.search("Rap*") == ([2, 3], {"rap*": 2})
+
+
+def test_invalid_index_file(tmp_path):
+    path = tmp_path / "bad.idx"
+    path.write_bytes(b"XXXX\x01\x00" + b"\x00" * 16)
+    with pytest.raises(ValueError):
+        SearchIndex(str(path))
+
+
+def test_index_path_for_rejects_unsafe_ids():
+    assert index_path_for("belge-1.v2").endswith("belge-1.v2.idx")
+    for document_id in ("../x", ".gizli", "a/b", ""):
+        with pytest.raises(ValueError):
+            index_path_for(document_id)
+
+
+def test_build_and_query(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    make_pdf(pdf_path, PAGES)
+    stats = build_index(str(pdf_path), index_path_for("doc"), workers=1)
+    assert stats["page_count"] == 3
+    assert stats["pages_extracted"] == 3
+    assert stats["pages_reused"] == 0
+
+    result = query_index("doc", "fatura")
+    assert result["pages"] == [1, 2]
+    assert result["page_count"] == 3
+    assert query_index("doc", "İşlem")["pages"] == [1]
+    # Tek harfli sözcükler sonucu boşaltmaz
+    assert query_index("doc", "fatura e")["pages"] == [1, 2]
+    assert query_index("doc", "fatura rapor", match_all=False, limit=2)["pages"] == [1, 2]
+
+    with pytest.raises(ValueError):
+        query_index("yok", "fatura")
+
+
+def test_incremental_update(tmp_path):
+    pdf_path = tmp_path / "doc.pdf"
+    index_path = index_path_for("doc")
+    make_pdf(pdf_path, PAGES)
+    build_index(str(pdf_path), index_path, workers=1)
+
+    unchanged = build_index(str(pdf_path), index_path, workers=1)
+    assert unchanged["pages_extracted"] == 0
+    assert unchanged["pages_reused"] == 3
+
+    make_pdf(pdf_path, [PAGES[0], "Sözleşme iptal edildi", PAGES[2]])
+    updated = build_index(str(pdf_path), index_path, workers=1)
+    assert updated["pages_extracted"] == 1
+    assert updated["pages_reused"] == 2
+    assert query_index("doc", "fatura")["pages"] == [1]
+    assert query_index("doc", "iptal")["pages"] == [2]
+    assert query_index("doc", "eki")["pages"] == []
+
+    make_pdf(pdf_path, PAGES[:2])
+    shrunk = build_index(str(pdf_path), index_path, workers=1)
+    assert shrunk["page_count"] == 2
+    assert query_index("doc", "rapor")["pages"] == []
+    with SearchIndex(index_path) as index:
+        assert all(max(pages) < 2 for pages in index.postings().values())
+
+
+def test_version_change_rebuilds(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "doc.pdf"
+    index_path = index_path_for("doc")
+    make_pdf(pdf_path, PAGES)
+    build_index(str(pdf_path), index_path, workers=1)
+
+    monkeypatch.setattr(search_index, "_index_version", lambda: "yeni")
+    stats = build_index(str(pdf_path), index_path, workers=1)
+    assert stats["pages_extracted"] == 3
+    assert query_index("doc", "fatura")["pages"] == [1, 2]
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""table_layout çıktısının eski hücre hücre `pdf.cell` yazımıyla karşılaştırılması"""
+
+import math
+
+import fitz
+import numpy as np
+import pandas as pd
+import pytest
+from fpdf import FPDF
+
+from table_layout import (
+    FPDFDocument, TableRenderer, format_column, compute_column_widths,
+    MIN_CELL_CHARS, ROW_HEIGHT, PAGE_BOTTOM_MARGIN, _WIDTH_SAMPLE
+)
+
+
+def baseline_cell(value, max_chars):
+    """Eski yöntemle tek bir hücrenin metni (kaçışlar hariç)"""
+    text = "" if value is None or (isinstance(value, float) and math.isnan(value)) else str(value)
+    text = text.replace("\r", " ").replace("\n", " ")
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    if len(text) > max_chars:
+        text = text[:max(1, max_chars - 3)] + "..."
+    return text
+
+
+def pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_frame(rows):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "isim": [("şçğ(x)\\"[: n % 8] + "a" * n) for n in rng.integers(0, 40, rows)],
+        "tutar": rng.integers(0, 10 ** 6, rows),
+        "oran": [float("nan") if n % 7 == 0 else n / 3 for n in range(rows)],
+        "aciklama": ["satır\nsonu" if n % 5 == 0 else "€ işareti" for n in range(rows)],
+    })
+
+
+def new_pdf():
+    pdf = FPDF()
+    pdf.set_auto_page_break(False)
+    pdf.add_page()
+    return pdf
+
+
+def render_layout(frame):
+    pdf = new_pdf()
+    renderer = TableRenderer(FPDFDocument(pdf), list(frame.columns), frame, font_family="Arial")
+    renderer.write_header()
+    renderer.write_frame(frame)
+    return pdf, renderer
+
+
+def render_baseline(frame, renderer):
+    """Aynı genişliklerle eski `pdf.cell(border=1)` döngüsü"""
+    pdf = new_pdf()
+    pdf.set_font("Arial", 'B', size=12)
+    header_char = pdf.get_string_width(_WIDTH_SAMPLE) / len(_WIDTH_SAMPLE)
+    header_chars = [max(MIN_CELL_CHARS, int((width - 2 * pdf.c_margin) / header_char))
+                    for width in renderer.widths]
+
+    def write_header():
+        pdf.set_font("Arial", 'B', size=12)
+        for header, width, max_chars in zip(frame.columns, renderer.widths, header_chars):
+            pdf.cell(width, ROW_HEIGHT, baseline_cell(header, max_chars), border=1)
+        pdf.ln()
+        pdf.set_font("Arial", size=10)
+
+    write_header()
+    for row in frame.itertuples(index=False):
+        if pdf.get_y() + ROW_HEIGHT > pdf.h - PAGE_BOTTOM_MARGIN:
+            pdf.add_page()
+            write_header()
+        for value, width, max_chars in zip(row, renderer.widths, renderer.max_chars):
+            pdf.cell(width, ROW_HEIGHT, baseline_cell(value, max_chars), border=1)
+        pdf.ln()
+    return pdf
+
+
+def page_words(pdf):
+    """Her sayfadaki sözcükler ve yuvarlanmış konumları"""
+    with fitz.open(stream=pdf.output(dest='S').encode('latin-1'), filetype="pdf") as document:
+        return [
+            sorted((word[4], round(word[0], 1), round(word[1], 1)) for word in page.get_text("words"))
+            for page in document
+        ]
+
+
+@pytest.mark.parametrize("values, max_chars", [
+    (["kısa", "tam on beş kar.", "on beşten uzun bir hücre metni"], 15),
+    ([1, 2.5, None, float("nan")], 15),
+    (["a(b)c\\d", "satır\r\nsonu", "€ ve ş"], 20),
+    (["uzun metin"], 2),
+])
+def test_format_column_matches_per_cell_baseline(values, max_chars):
+    expected = [pdf_escape(baseline_cell(value, max_chars)) for value in values]
+    assert format_column(values, max_chars).tolist() == expected
+
+
+def test_format_column_separator_in_cell():
+    assert format_column(["a\x00b", "c"], 15).tolist() == ["a b", "c"]
+
+
+def test_format_column_empty():
+    assert format_column([], 15).tolist() == []
+
+
+def test_column_widths_fit_table():
+    pdf = new_pdf()
+    pdf.set_font("Arial", size=10)
+    frame = make_frame(50)
+    widths = compute_column_widths(pdf, list(frame.columns), frame, table_width=180)
+    assert len(widths) == 4
+    assert sum(widths) == pytest.approx(180)
+    # En uzun içerikli sütun en geniş olanıdır
+    assert widths[0] == max(widths)
+
+    many = [f"s{index}" for index in range(30)]
+    assert compute_column_widths(pdf, many, None, table_width=180) == pytest.approx([6.0] * 30)
+    assert compute_column_widths(pdf, [], None) == []
+
+
+@pytest.mark.parametrize("rows", [1, 26, 27, 120])
+def test_layout_matches_cell_baseline(rows):
+    frame = make_frame(rows)
+    pdf, renderer = render_layout(frame)
+    baseline = render_baseline(frame, renderer)
+
+    assert renderer.rows_written == rows
+    assert pdf.page_no() == baseline.page_no()
+    assert page_words(pdf) == page_words(baseline)
+
+
+def test_header_repeated_on_each_page():
+    frame = make_frame(120)
+    pdf, _ = render_layout(frame)
+    pages = page_words(pdf)
+    assert len(pages) > 1
+    for words in pages:
+        assert "aciklama" in [word[0] for word in words]
+
+
+def test_frame_with_missing_columns_is_padded():
+    frame = make_frame(3)
+    pdf, renderer = render_layout(frame)
+    renderer.write_frame(frame.iloc[:, :2])
+    assert renderer.rows_written == 6
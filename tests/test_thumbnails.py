@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""thumbnails.parse_pages sayfa belirtimi ayrıştırma"""
+
+import pytest
+
+from thumbnails import parse_pages
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("all", [0, 1, 2, 3, 4]),
+    ("", [0, 1, 2, 3, 4]),
+    (None, [0, 1, 2, 3, 4]),
+    ("1", [0]),
+    ("5", [4]),
+    ("1-3,5", [0, 1, 2, 4]),
+    ("4, 2-3 ,2", [1, 2, 3]),
+    ("3-3", [2]),
+])
+def test_parse_pages(spec, expected):
+    assert parse_pages(spec, 5) == expected
+
+
+@pytest.mark.parametrize("spec", ["a", "1-", "-2", "1-x", "1,,2", "2-1-3"])
+def test_parse_pages_invalid(spec):
+    with pytest.raises(ValueError, match="Geçersiz sayfa belirtimi"):
+        parse_pages(spec, 5)
+
+
+@pytest.mark.parametrize("spec", ["0", "6", "4-6", "3-2"])
+def test_parse_pages_out_of_range(spec):
+    with pytest.raises(ValueError, match="Sayfa aralığı belge dışında"):
+        parse_pages(spec, 5)
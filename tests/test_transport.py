@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""transport.Transport argüman ayrıştırma, girdi ve çıktı modları"""
+
+import io
+import sys
+import json
+import base64
+
+import pytest
+
+from transport import Transport, ArgumentParser
+
+PDF = b"%PDF-1.4 test\n%%EOF\n"
+
+
+def _binary_stdout(monkeypatch):
+    """stdout'u bayt olarak okunabilen bir akışla değiştirir"""
+    stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    monkeypatch.setattr(sys, "stdout", stream)
+    return stream
+
+
+def _read_binary(stream):
+    stream.flush()
+    return stream.buffer.getvalue()
+
+
+def test_transport_flags_are_removed_from_args():
+    transport = Transport(["--input", "/tmp/a.pdf", "high", "--output", "/tmp/b.pdf", "--progress", "--x", "1"])
+    assert transport.input_path == "/tmp/a.pdf"
+    assert transport.output_path == "/tmp/b.pdf"
+    assert transport.progress
+    assert transport.args == ["high", "--x", "1"]
+    assert not transport.legacy_input
+
+
+def test_legacy_input_takes_first_positional_argument():
+    encoded = base64.b64encode(PDF).decode()
+    transport = Transport([encoded, "medium"])
+    assert transport.legacy_input
+    assert transport.has_input
+    assert transport.args == ["medium"]
+    assert transport.read_input() == PDF
+
+
+def test_legacy_input_missing():
+    transport = Transport([])
+    assert not transport.has_input
+    with pytest.raises(ValueError):
+        transport.read_input()
+
+
+@pytest.mark.parametrize("argv", [
+    ["--input"],
+    ["--output"],
+    ["--stdin", "--input", "a.pdf"],
+    ["--binary-stdout", "--output", "b.pdf"],
+])
+def test_invalid_transport_flags(argv):
+    with pytest.raises(ValueError):
+        Transport(argv)
+
+
+def test_input_file_is_memory_mapped(tmp_path):
+    path = tmp_path / "in.pdf"
+    path.write_bytes(PDF)
+    transport = Transport(["--input", str(path)])
+    try:
+        data = transport.read_input()
+        assert not isinstance(data, bytes)
+        assert bytes(data) == PDF
+        assert transport.read_input_bytes() == PDF
+    finally:
+        transport.close()
+
+
+def test_empty_input_file(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+    transport = Transport(["--input", str(path)])
+    assert transport.read_input() == b""
+
+
+def test_stdin_input(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(PDF)))
+    transport = Transport(["--stdin"])
+    assert transport.has_input
+    assert transport.read_input() == PDF
+
+
+def test_emit_default_mode_embeds_base64(capsys):
+    transport = Transport([base64.b64encode(PDF).decode()])
+    transport.emit({"original_size": 1}, PDF, "compressed_pdf")
+    result = json.loads(capsys.readouterr().out)
+    assert result["original_size"] == 1
+    assert base64.b64decode(result["compressed_pdf"]) == PDF
+
+
+def test_emit_output_path(tmp_path, capsys):
+    output = tmp_path / "out.pdf"
+    transport = Transport(["--stdin", "--output", str(output)])
+    transport.emit({"success": True}, PDF)
+    result = json.loads(capsys.readouterr().out)
+    assert result == {"success": True, "output_path": str(output)}
+    assert output.read_bytes() == PDF
+
+
+def test_emit_binary_stdout_writes_header_then_payload(monkeypatch):
+    binary_stdout = _binary_stdout(monkeypatch)
+    transport = Transport(["--stdin", "--binary-stdout"])
+    transport.emit({"success": True}, PDF)
+    header, payload = _read_binary(binary_stdout).split(b"\n", 1)
+    assert json.loads(header) == {"success": True, "payload_size": len(PDF)}
+    assert payload == PDF
+
+
+def test_emit_error_without_payload(capsys):
+    transport = Transport(["--stdin", "--output", "/nonexistent/out.pdf"])
+    transport.emit({"error": "bozuk"})
+    assert json.loads(capsys.readouterr().out) == {"error": "bozuk"}
+
+
+def test_emit_event_precedes_result(capsys):
+    transport = Transport(["--stdin", "--progress"])
+    callback = transport.progress_callback()
+    callback({"event": "progress", "percent": 50})
+    transport.emit({"success": True})
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines == [{"event": "progress", "percent": 50}, {"success": True}]
+
+
+def test_progress_callback_disabled_by_default():
+    assert Transport(["--stdin"]).progress_callback() is None
+
+
+@pytest.mark.parametrize("mode", ["default", "output", "binary"])
+def test_emit_file(mode, tmp_path, capsys, monkeypatch):
+    source = tmp_path / "result.pdf"
+    source.write_bytes(PDF)
+    argv = ["--stdin"]
+    output = tmp_path / "out.pdf"
+    stream = None
+    if mode == "output":
+        argv += ["--output", str(output)]
+    elif mode == "binary":
+        stream = _binary_stdout(monkeypatch)
+        argv.append("--binary-stdout")
+    transport = Transport(argv)
+    transport.emit_file({"success": True}, str(source), "compressed_pdf")
+
+    if mode == "default":
+        result = json.loads(capsys.readouterr().out)
+        assert base64.b64decode(result["compressed_pdf"]) == PDF
+    elif mode == "output":
+        result = json.loads(capsys.readouterr().out)
+        assert result["output_path"] == str(output)
+        assert output.read_bytes() == PDF
+    else:
+        header, payload = _read_binary(stream).split(b"\n", 1)
+        assert json.loads(header)["payload_size"] == len(PDF)
+        assert payload == PDF
+
+
+def test_emit_file_to_same_output_path(tmp_path, capsys):
+    output = tmp_path / "out.pdf"
+    output.write_bytes(PDF)
+    transport = Transport(["--stdin", "--output", str(output)])
+    transport.emit_file({"success": True}, str(output))
+    assert json.loads(capsys.readouterr().out)["output_path"] == str(output)
+    assert output.read_bytes() == PDF
+
+
+def test_metrics_flag_attaches_metrics(capsys):
+    transport = Transport(["--stdin", "--metrics"])
+    transport.emit({"success": True})
+    result = json.loads(capsys.readouterr().out)
+    assert result["metrics"]["entry_point"] == "test"
+
+
+def test_argument_parser_raises_value_error():
+    parser = ArgumentParser()
+    parser.add_argument("--workers", type=int)
+    with pytest.raises(ValueError, match="Geçersiz argüman"):
+        parser.parse_args(["--workers", "x"])
+    with pytest.raises(ValueError, match="Geçersiz argüman"):
+        parser.parse_args(["--bogus"])
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sayfa Önizleme ve Küçük Resimleri
+PDF sayfalarını PyMuPDF ile sabit yakınlaştırma seviyelerinde PNG olarak çizer.
+Çizilen sayfalar belge içeriğinin özetiyle anahtarlanan disk önbelleğinde
+(bkz. result_cache.py) tutulur; aynı belgenin sayfası ikinci kez çizilmez.
+
+İstenen ilk sayfa havuz beklenmeden ana süreçte hemen çizilip yazılır, kalan
+sayfalar süreç havuzunda parça parça çizilir ve hazır oldukça yazılır.
+
+Çıktı (JSON satırları): her sayfa için
+    {"event": "page", "page": 1, "level": "thumbnail", "width": 153, "height": 198,
+     "cached": false, "image_base64": "..."}      (--output-dir ile "path")
+ardından özet sonuç satırı.
+
+Kullanım:
+    python3 thumbnails.py (--input <pdf> | --stdin | <base64>) [seviye] [sayfalar] [--output-dir DİZİN]
+    seviye: thumbnail (0.25x), preview (1x), zoom (2x)
+    sayfalar: "all" (varsayılan) veya "1-3,7" biçiminde 1'den başlayan sayfa listesi
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import struct
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pymupdf
+
+import metrics
+from transport import Transport
+from tool_io import workspace_dir
+from result_cache import ResultCache, cache_enabled, hash_file, source_version
+
+# Sabit yakınlaştırma seviyeleri (1.0 = 72 dpi)
+ZOOM_LEVELS = {
+    "thumbnail": 0.25,
+    "preview": 1.0,
+    "zoom": 2.0,
+}
+DEFAULT_LEVEL = "thumbnail"
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+# Bir işçiye tek seferde verilen en fazla sayfa; belge her parçada bir kez açılır,
+# küçük parçalar ise sayfaların daha erken yazılmasını sağlar
+MAX_CHUNK_PAGES = 8
+
+ENGINE = "thumbnail"
+
+
+def parse_pages(spec, page_count):
+    """
+    Sayfa belirtimini 0'dan başlayan sıralı sayfa numaralarına çevirir
+
+    Args:
+        spec: "all" veya "1-3,7" biçiminde 1'den başlayan sayfa listesi
+        page_count: Belgedeki sayfa sayısı
+
+    Returns:
+        Sayfa numaraları listesi
+    """
+    if not spec or spec == "all":
+        return list(range(page_count))
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        try:
+            if "-" in part:
+                first, last = (int(value) for value in part.split("-", 1))
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Geçersiz sayfa belirtimi: {part}") from None
+        if first < 1 or last > page_count or first > last:
+            raise ValueError(f"Sayfa aralığı belge dışında: {part} (sayfa sayısı {page_count})")
+        pages.update(range(first - 1, last))
+    return sorted(pages)
+
+
+def png_size(data):
+    """PNG verisinin (genişlik, yükseklik) değerini IHDR başlığından okur"""
+    return struct.unpack(">II", data[16:24])
+
+
+def render_page(document, page_number, zoom):
+    """
+    Açık belgenin bir sayfasını PNG olarak çizer
+
+    Args:
+        document: pymupdf belgesi
+        page_number: 0'dan başlayan sayfa numarası
+        zoom: Yakınlaştırma katsayısı
+
+    Returns:
+        PNG baytları
+    """
+    pixmap = document[page_number].get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+    return pixmap.tobytes("png")
+
+
+def _render_chunk(job):
+    """Süreç havuzunda çalışır; belgeyi bir kez açıp parçadaki sayfaları çizer"""
+    pdf_path, pages, zoom = job
+    with pymupdf.open(pdf_path) as document:
+        return [(page, render_page(document, page, zoom)) for page in pages]
+
+
+class ThumbnailRenderer:
+    """
+    Bir belgenin sayfalarını önbellek üzerinden çizer
+
+    Args:
+        pdf_path: PDF dosya yolu (işçi süreçler belgeyi bu yoldan açar)
+        level: Yakınlaştırma seviyesi adı (bkz. ZOOM_LEVELS)
+        workers: En fazla işçi süreç sayısı
+    """
+
+    def __init__(self, pdf_path, level=DEFAULT_LEVEL, workers=DEFAULT_WORKERS):
+        if level not in ZOOM_LEVELS:
+            raise ValueError(f"Bilinmeyen yakınlaştırma seviyesi: {level} ({', '.join(ZOOM_LEVELS)})")
+        self.pdf_path = pdf_path
+        self.level = level
+        self.zoom = ZOOM_LEVELS[level]
+        self.workers = max(1, workers)
+        self.document = pymupdf.open(pdf_path)
+        self.page_count = self.document.page_count
+        self.version = f"{pymupdf.VersionBind}|{source_version(os.path.abspath(__file__))}"
+        self.cache = None
+        self.document_hash = None
+        if cache_enabled():
+            try:
+                self.cache = ResultCache()
+                with metrics.stage("hash"):
+                    self.document_hash = hash_file(pdf_path)
+            except OSError:
+                self.cache = None
+
+    def close(self):
+        self.document.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _key(self, page):
+        return self.cache.make_key(self.document_hash, ENGINE, f"{self.level}|{page}", self.version)
+
+    def _fetch(self, page):
+        if self.cache is None:
+            return None
+        try:
+            data, _ = self.cache.fetch(self._key(page))
+        except OSError:
+            return None
+        return data
+
+    def _store(self, page, data):
+        if self.cache is None:
+            return
+        try:
+            self.cache.store(self._key(page), data=data)
+        except OSError:
+            pass
+
+    def _entry(self, page, data, cached):
+        width, height = png_size(data)
+        return {"page": page + 1, "level": self.level, "width": width, "height": height,
+                "cached": cached, "data": data}
+
+    def render(self, page):
+        """
+        Tek bir sayfayı ana süreçte (havuz başlatılmadan) çizer
+
+        Args:
+            page: 0'dan başlayan sayfa numarası
+
+        Returns:
+            Sayfa bilgisi sözlüğü ("data" PNG baytlarıdır)
+        """
+        with metrics.stage("cache"):
+            data = self._fetch(page)
+        if data is not None:
+            return self._entry(page, data, True)
+        with metrics.stage("render"):
+            data = render_page(self.document, page, self.zoom)
+        with metrics.stage("cache"):
+            self._store(page, data)
+        return self._entry(page, data, False)
+
+    def render_many(self, pages):
+        """
+        Sayfaları çizer ve hazır oldukça verir (önbellektekiler önce, sonra
+        havuzda çizilenler tamamlanma sırasıyla)
+
+        Args:
+            pages: 0'dan başlayan sayfa numaraları
+
+        Yields:
+            Sayfa bilgisi sözlükleri
+        """
+        # Sayfa başına değil, çağrı başına bir kez sayaç yazımı ve tahliye kontrolü
+        if self.cache is not None:
+            self.cache.begin_batch()
+        try:
+            yield from self._render_many(pages)
+        finally:
+            if self.cache is not None:
+                try:
+                    self.cache.end_batch()
+                except OSError:
+                    pass
+
+    def _render_many(self, pages):
+        missing = []
+        for page in pages:
+            with metrics.stage("cache"):
+                data = self._fetch(page)
+            if data is None:
+                missing.append(page)
+            else:
+                yield self._entry(page, data, True)
+
+        # Süreç havuzu içinde (ör. converter_worker işçileri) alt süreç açılamaz
+        workers = min(self.workers, len(missing))
+        if workers <= 1 or multiprocessing.current_process().daemon:
+            for page in missing:
+                with metrics.stage("render"):
+                    data = render_page(self.document, page, self.zoom)
+                self._store(page, data)
+                yield self._entry(page, data, False)
+            return
+
+        chunk_size = max(1, min(MAX_CHUNK_PAGES, len(missing) // (workers * 2)))
+        jobs = [(self.pdf_path, missing[start:start + chunk_size], self.zoom)
+                for start in range(0, len(missing), chunk_size)]
+        with metrics.stage("render"), ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_render_chunk, job) for job in jobs]
+            for future in as_completed(futures):
+                for page, data in future.result():
+                    self._store(page, data)
+                    yield self._entry(page, data, False)
+
+
+def _page_event(entry, output_dir):
+    event = {"event": "page"}
+    event.update((key, value) for key, value in entry.items() if key != "data")
+    if output_dir:
+        path = os.path.join(output_dir, f"page_{entry['page']:05d}_{entry['level']}.png")
+        with open(path, "wb") as f:
+            f.write(entry["data"])
+        event["path"] = path
+    else:
+        event["image_base64"] = base64.b64encode(entry["data"]).decode("utf-8")
+    return event
+
+
+def main():
+    """
+    Komut satırından çağrıldığında çalışır.
+    Beklenen argümanlar:
+    1. Base64 formatında PDF içeriği
+    2. Yakınlaştırma seviyesi (thumbnail, preview, zoom)
+    3. Sayfalar ("all" veya "1-3,7")
+
+    Base64 yerine --stdin veya --input <yol> ile ham PDF kullanılabilir
+    (bkz. transport.py). --output-dir verilirse PNG'ler dosyaya yazılır.
+    """
+    transport = None
+    temp_path = None
+    start = time.perf_counter()
+    try:
+        transport = Transport()
+        output_dir = None
+        if "--output-dir" in transport.args:
+            index = transport.args.index("--output-dir")
+            if index + 1 >= len(transport.args):
+                raise ValueError("--output-dir bir dizin gerektirir")
+            output_dir = transport.args[index + 1]
+            del transport.args[index:index + 2]
+            os.makedirs(output_dir, exist_ok=True)
+        if not transport.has_input:
+            raise ValueError("PDF içeriği verilmedi")
+
+        level = transport.args[0] if transport.args else DEFAULT_LEVEL
+        spec = transport.args[1] if len(transport.args) > 1 else "all"
+
+        # İşçi süreçler belgeyi yoldan açar; diskte değilse bellekteki çalışma dizinine yazılır
+        if transport.input_path:
+            pdf_path = transport.input_path
+        else:
+            fd, temp_path = tempfile.mkstemp(suffix=".pdf", dir=workspace_dir())
+            os.close(fd)
+            pdf_path = temp_path
+            transport.write_input_file(pdf_path)
+
+        with ThumbnailRenderer(pdf_path, level) as renderer:
+            pages = parse_pages(spec, renderer.page_count)
+            counts = {"rendered": 0, "cached": 0}
+            first_page_ms = None
+
+            def write(entry):
+                counts["cached" if entry["cached"] else "rendered"] += 1
+                transport.emit_event(_page_event(entry, output_dir))
+
+            if pages:
+                # İlk sayfa havuz başlatılmadan hemen yazılır
+                write(renderer.render(pages[0]))
+                first_page_ms = round((time.perf_counter() - start) * 1000, 2)
+                for entry in renderer.render_many(pages[1:]):
+                    write(entry)
+
+            transport.emit({
+                "page_count": renderer.page_count,
+                "level": level,
+                "pages": len(pages),
+                "rendered": counts["rendered"],
+                "cached": counts["cached"],
+                "first_page_ms": first_page_ms,
+                "total_ms": round((time.perf_counter() - start) * 1000, 2),
+                "error": None
+            })
+
+    except Exception as e:
+        result = {"error": str(e)}
+        if transport is not None:
+            transport.emit(result)
+        else:
+            print(json.dumps(result))
+        sys.exit(1)
+
+    finally:
+        if transport is not None:
+            transport.close()
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    main()
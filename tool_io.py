@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Harici Araç G/Ç Yardımcıları
+Ghostscript ve qpdf'e belgeyi disk üzerindeki geçici dosyalar yerine bellekte
+tutulan dosyalarla vermek ve sonucu boru üzerinden almak için kullanılır.
+Ağ tabanlı disklerde geçici dosya yazma/okuma gecikmenin büyük bölümünü
+oluşturur.
+
+Girdi/çıktı dosyaları sırasıyla şunlarla sağlanır:
+    1. memfd (Linux): Anonim bellek dosyası, alt sürece /proc/self/fd/N yoluyla verilir
+    2. tmpfs çalışma dizini: NOVAPDF_WORKSPACE, yoksa /dev/shm, yoksa sistem geçici dizini
+
+Araç stdout'a yazabiliyorsa (gs -sOutputFile=-) çıktı dosyası hiç oluşturulmaz.
+"""
+
+import os
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+
+import metrics
+import tool_scheduler
+
+MEMFD_AVAILABLE = hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd")
+
+# Bellekteki dosyaya yazarken kullanılan parça boyutu (mmap girdileri kopyalanmadan yazılır)
+WRITE_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Araç stdout'unu ilerleme izlenirken okuma parça boyutu
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def workspace_dir():
+    """
+    memfd kullanılamadığında dosyaların yazılacağı dizini döndürür
+    (tercihen bellekte tutulan bir tmpfs)
+    """
+    configured = os.environ.get("NOVAPDF_WORKSPACE")
+    if configured:
+        return configured
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+class ToolFile:
+    """
+    Alt sürece yol olarak verilebilen, bellekte tutulan dosya.
+    memfd kullanılıyorsa `path` /proc/self/fd/N biçimindedir ve `pass_fds`
+    alt sürece aktarılması gereken tanımlayıcıları içerir.
+    """
+
+    def __init__(self, name="belge.pdf"):
+        self.fd = None
+        self.temp_path = None
+        if MEMFD_AVAILABLE:
+            self.fd = os.memfd_create(name, 0)
+            os.set_inheritable(self.fd, True)
+            self.path = f"/proc/self/fd/{self.fd}"
+        else:
+            fd, self.temp_path = tempfile.mkstemp(suffix=os.path.splitext(name)[1], dir=workspace_dir())
+            os.close(fd)
+            self.path = self.temp_path
+
+    @property
+    def pass_fds(self):
+        return (self.fd,) if self.fd is not None else ()
+
+    def write(self, data):
+        """Dosyanın içeriğini verilen baytlarla değiştirir"""
+        view = memoryview(data)
+        with open(self.path, "wb") as f:
+            for start in range(0, len(view), WRITE_CHUNK_SIZE):
+                f.write(view[start:start + WRITE_CHUNK_SIZE])
+
+    def read(self):
+        """Dosyanın (alt sürecin yazdığı) içeriğini döndürür"""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def size(self):
+        return os.fstat(self.fd).st_size if self.fd is not None else os.path.getsize(self.path)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.temp_path:
+            try:
+                os.unlink(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+@contextmanager
+def tool_input(input_data=None, input_path=None, name="input.pdf"):
+    """
+    Alt sürecin okuyabileceği bir girdi yolu sağlar
+
+    Args:
+        input_data: Bellekteki belge (bytes, memoryview veya mmap)
+        input_path: Belge zaten diskteyse yolu (kopyalanmaz)
+        name: memfd adı (tanılama için)
+
+    Yields:
+        (yol, pass_fds)
+    """
+    if input_path:
+        yield input_path, ()
+        return
+    with ToolFile(name) as tool_file:
+        with metrics.stage("stage_input"):
+            tool_file.write(input_data)
+        yield tool_file.path, tool_file.pass_fds
+
+
+def run_tool(command, pass_fds=(), capture_stdout=False, input_size=0, page_count=None, on_message=None):
+    """
+    Harici aracı zamanlayıcıdan kabul aldıktan sonra kaynak sınırları ve zaman
+    aşımıyla çalıştırır (aracın tanılama mesajları stderr'e akar)
+
+    Args:
+        command: Komut argümanları listesi
+        pass_fds: Alt sürece aktarılacak dosya tanımlayıcıları
+        capture_stdout: True ise stdout baytları döndürülür
+        input_size: Maliyet tahmini için girdi boyutu (bayt)
+        page_count: Maliyet tahmini için sayfa sayısı (bilinmiyorsa None)
+        on_message: Verilirse aracın mesaj satırlarıyla on_message(satır, okunan_çıktı_baytı)
+                    şeklinde çağrılır (ilerleme ayrıştırma)
+
+    Returns:
+        capture_stdout True ise stdout baytları, değilse None
+    """
+    tool = os.path.basename(command[0])
+    with tool_scheduler.admit(tool, input_size, page_count) as slot, metrics.stage("run"):
+        if on_message is None:
+            process = slot.popen(command, stdout=subprocess.PIPE if capture_stdout else None, pass_fds=pass_fds)
+            try:
+                stdout, _ = process.communicate(timeout=slot.timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise RuntimeError(f"{tool} {slot.timeout:g} saniye içinde tamamlanamadı") from None
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+        else:
+            process, stdout, timed_out = _run_with_messages(slot, command, pass_fds, capture_stdout, on_message)
+            if timed_out:
+                raise RuntimeError(f"{tool} {slot.timeout:g} saniye içinde tamamlanamadı")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return stdout
+
+
+def _run_with_messages(slot, command, pass_fds, capture_stdout, on_message):
+    """
+    Aracın mesajlarını satır satır okuyarak çalıştırır. Çıktı stdout'tan
+    alınıyorsa mesajlar stderr'den, alınmıyorsa birleştirilmiş stdout/stderr'den
+    okunur; stdout ayrı bir iş parçacığında boşaltılır.
+
+    Returns:
+        (süreç, stdout baytları veya None, zaman aşımı oldu mu)
+    """
+    process = slot.popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if capture_stdout else subprocess.STDOUT,
+        pass_fds=pass_fds
+    )
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(slot.timeout, expire)
+    timer.start()
+    chunks = []
+    received = [0]
+    reader = None
+    if capture_stdout:
+        def drain():
+            for chunk in iter(lambda: process.stdout.read(READ_CHUNK_SIZE), b""):
+                chunks.append(chunk)
+                received[0] += len(chunk)
+
+        reader = threading.Thread(target=drain, daemon=True)
+        reader.start()
+    messages = process.stderr if capture_stdout else process.stdout
+
+    try:
+        for raw_line in iter(messages.readline, b""):
+            on_message(raw_line.decode("utf-8", errors="replace").rstrip("\r\n"), received[0])
+        if reader is not None:
+            reader.join()
+        process.wait()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        messages.close()
+        if reader is None:
+            process.stdout.close()
+
+    return process, b"".join(chunks) if capture_stdout else None, timed_out.is_set()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Harici Araç Zamanlayıcısı
+Ghostscript, qpdf ve pandoc alt süreçlerinin aynı anda kaç tane çalışacağını
+sınırlar. Her yükleme ayrı bir Python süreci olduğundan kayıt defteri dosya
+kilidiyle korunan ortak bir JSON dosyasında tutulur.
+
+Kabul: Her iş için girdi boyutu ve (biliniyorsa) sayfa sayısından CPU ve bellek
+maliyeti tahmin edilir. İş, kuyrukta kendinden önce gelen işlerin maliyeti
+ayrıldıktan sonra kalan bütçeye sığıyorsa başlar; sığmıyorsa bekler. Kuyruk
+önceliğe (büyük önce), eşitlikte geliş sırasına göre işlenir. Bütçeden büyük
+işler bütçeye kırpılır, yani en kötü durumda tek başına çalışır.
+
+Sınırlar: Her alt sürece tahmini belleğe göre RLIMIT_AS, zaman aşımına göre
+RLIMIT_CPU uygulanır ve duvar saati zaman aşımı verilir.
+
+Kuyrukta bekleme ve çalışma süreleri ölçümlere ayrı aşamalar olarak yazılır
+("<motor>/queue_wait", "<motor>/run").
+
+Ortam değişkenleri:
+    NOVAPDF_SCHEDULER=0             Kuyruğu devre dışı bırakır (sınırlar yine uygulanır)
+    NOVAPDF_SCHEDULER_DIR           Kayıt defteri dizini (varsayılan: <tmp>/novapdf-scheduler)
+    NOVAPDF_TOOL_CPUS               CPU bütçesi (varsayılan: CPU sayısı)
+    NOVAPDF_TOOL_MEMORY_MB          Bellek bütçesi (varsayılan: toplam belleğin %60'ı)
+    NOVAPDF_TOOL_TIMEOUT            Duvar saati zaman aşımı üst sınırı, saniye (varsayılan: 600)
+    NOVAPDF_TOOL_AS_LIMIT=0         RLIMIT_AS uygulanmaz
+    NOVAPDF_PRIORITY                Bu sürecin işlerinin önceliği (varsayılan: 0)
+
+Kullanım: python3 tool_scheduler.py --status
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import fcntl
+import resource
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+import metrics
+
+DEFAULT_STATE_DIR = os.path.join(tempfile.gettempdir(), "novapdf-scheduler")
+LEDGER_FILE = "ledger.json"
+LOCK_FILE = ".lock"
+
+DEFAULT_TIMEOUT = 600
+
+PRLIMIT_AVAILABLE = hasattr(resource, "prlimit")
+
+# Kuyrukta beklerken yoklama aralığı (saniye); beklendikçe üst sınıra kadar artar
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.2
+
+# RLIMIT_AS tahmini belleğin bu katı olarak verilir (sanal bellek RSS'ten büyüktür)
+ADDRESS_SPACE_FACTOR = 4
+MIN_ADDRESS_SPACE_MB = 1024
+
+# Araç başına maliyet modeli: sabit bellek + girdi MB'ı ve sayfa başına bellek,
+# sabit süre + girdi MB'ı başına süre
+TOOL_COSTS = {
+    "gs": {"cpu": 1, "base_mb": 96, "per_input_mb": 3.0, "per_page_mb": 0.5,
+           "base_seconds": 30, "seconds_per_mb": 3.0},
+    "qpdf": {"cpu": 1, "base_mb": 48, "per_input_mb": 2.5, "per_page_mb": 0.05,
+             "base_seconds": 20, "seconds_per_mb": 1.0},
+    "pandoc": {"cpu": 1, "base_mb": 160, "per_input_mb": 8.0, "per_page_mb": 0,
+               "base_seconds": 30, "seconds_per_mb": 5.0},
+    # auto_compressor gs ve qpdf'i aynı anda yarıştırır
+    "race": {"cpu": 2, "base_mb": 144, "per_input_mb": 5.5, "per_page_mb": 0.55,
+             "base_seconds": 30, "seconds_per_mb": 3.0},
+}
+DEFAULT_COST = TOOL_COSTS["gs"]
+
+
+def cpu_budget():
+    """Aynı anda çalışabilecek araçlar için CPU bütçesi"""
+    configured = os.environ.get("NOVAPDF_TOOL_CPUS")
+    return max(1, int(configured)) if configured else (os.cpu_count() or 1)
+
+
+def memory_budget_mb():
+    """Aynı anda çalışabilecek araçlar için bellek bütçesi (MB)"""
+    configured = os.environ.get("NOVAPDF_TOOL_MEMORY_MB")
+    if configured:
+        return max(1, int(configured))
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(int(line.split()[1]) / 1024 * 0.6)
+    except OSError:
+        pass
+    return 2048
+
+
+def default_priority():
+    try:
+        return int(os.environ.get("NOVAPDF_PRIORITY", "0"))
+    except ValueError:
+        return 0
+
+
+def estimate_cost(tool, input_size, page_count=None):
+    """
+    Bir aracın kaynak ihtiyacını tahmin eder
+
+    Args:
+        tool: Araç adı (gs, qpdf, pandoc, race)
+        input_size: Girdi boyutu (bayt)
+        page_count: Sayfa sayısı (bilinmiyorsa None)
+
+    Returns:
+        {"cpu", "memory_mb", "timeout"} sözlüğü
+    """
+    model = TOOL_COSTS.get(tool, DEFAULT_COST)
+    size_mb = input_size / (1024 * 1024)
+    memory_mb = model["base_mb"] + model["per_input_mb"] * size_mb + model["per_page_mb"] * (page_count or 0)
+    timeout = model["base_seconds"] + model["seconds_per_mb"] * size_mb
+    max_timeout = float(os.environ.get("NOVAPDF_TOOL_TIMEOUT", DEFAULT_TIMEOUT))
+    return {
+        "cpu": model["cpu"],
+        "memory_mb": int(memory_mb),
+        "timeout": round(min(timeout, max_timeout), 1)
+    }
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Slot:
+    """Kabul edilmiş bir işin hakları: zaman aşımı ve alt süreç sınırları"""
+
+    def __init__(self, tool, cost, queue_wait):
+        self.tool = tool
+        self.cpu = cost["cpu"]
+        self.memory_mb = cost["memory_mb"]
+        self.timeout = cost["timeout"]
+        self.queue_wait = queue_wait
+        self.address_space_mb = None
+        if os.environ.get("NOVAPDF_TOOL_AS_LIMIT", "1") != "0":
+            self.address_space_mb = max(MIN_ADDRESS_SPACE_MB, self.memory_mb * ADDRESS_SPACE_FACTOR)
+
+    def _limits(self):
+        limits = [(resource.RLIMIT_CPU, int(self.timeout) + 1)]
+        if self.address_space_mb:
+            limits.append((resource.RLIMIT_AS, self.address_space_mb * 1024 * 1024))
+        return limits
+
+    def limit_resources(self):
+        """
+        Sınırları geçerli sürece uygular (subprocess preexec_fn olarak).
+        Yalnızca yumuşak sınırları düşürür; mevcut sert sınırlar aşılmaz.
+        """
+        for kind, value in self._limits():
+            soft, hard = resource.getrlimit(kind)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.setrlimit(kind, (value, hard))
+
+    def limit_process(self, pid):
+        """
+        Sınırları başlatılmış bir alt sürece uygular (Linux prlimit).
+        preexec_fn iş parçacıklı süreçlerde güvenli olmadığından tercih edilir.
+        """
+        for kind, value in self._limits():
+            soft, hard = resource.prlimit(pid, kind)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.prlimit(pid, kind, (value, hard))
+
+    def popen(self, command, **kwargs):
+        """
+        Komutu bu işin sınırlarıyla başlatır
+
+        Returns:
+            subprocess.Popen
+        """
+        if not PRLIMIT_AVAILABLE:
+            kwargs["preexec_fn"] = self.limit_resources
+        process = subprocess.Popen(command, **kwargs)
+        if PRLIMIT_AVAILABLE:
+            try:
+                self.limit_process(process.pid)
+            except ProcessLookupError:
+                # Süreç çoktan bitti
+                pass
+        return process
+
+    def info(self):
+        return {
+            "tool": self.tool,
+            "cpu": self.cpu,
+            "memory_mb": self.memory_mb,
+            "timeout": self.timeout,
+            "queue_wait_ms": round(self.queue_wait * 1000, 2)
+        }
+
+
+class ToolScheduler:
+    """
+    Süreçler arası paylaşılan, dosya kilitli kayıt defteri üzerinden çalışan
+    kabul denetleyicisi
+    """
+
+    def __init__(self, state_dir=None, cpus=None, memory_mb=None):
+        self.state_dir = state_dir or os.environ.get("NOVAPDF_SCHEDULER_DIR") or DEFAULT_STATE_DIR
+        self.cpus = cpus or cpu_budget()
+        self.memory_mb = memory_mb or memory_budget_mb()
+        os.makedirs(self.state_dir, mode=0o700, exist_ok=True)
+        if self.state_dir == DEFAULT_STATE_DIR:
+            # Varsayılan dizin paylaşılan geçici dizindedir; başka bir kullanıcının
+            # önceden oluşturduğu veya yazabildiği kayıt defteri kullanılmaz
+            info = os.stat(self.state_dir)
+            if info.st_uid != os.getuid() or info.st_mode & 0o022:
+                raise OSError(f"Zamanlayıcı dizini güvenli değil: {self.state_dir}")
+        self.ledger_path = os.path.join(self.state_dir, LEDGER_FILE)
+
+    @contextmanager
+    def _ledger(self):
+        """Kayıt defterini kilitli olarak açar; blok sonunda değişiklikleri yazar"""
+        with open(os.path.join(self.state_dir, LOCK_FILE), "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.ledger_path) as f:
+                        ledger = json.load(f)
+                except (OSError, ValueError):
+                    ledger = {}
+                ledger.setdefault("running", {})
+                ledger.setdefault("waiting", {})
+                # Çökmüş süreçlerin kayıtlarını temizle
+                for section in ("running", "waiting"):
+                    for job_id in [j for j, job in ledger[section].items() if not _alive(job["pid"])]:
+                        del ledger[section][job_id]
+                yield ledger
+                fd, temp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(ledger, f)
+                    os.replace(temp_path, self.ledger_path)
+                except BaseException:
+                    try:
+                        os.unlink(temp_path)
+                    except OSError:
+                        pass
+                    raise
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _try_start(self, ledger, job_id):
+        """İş sırası geldiyse ve bütçeye sığıyorsa çalışanlara taşır"""
+        free_cpu = self.cpus - sum(job["cpu"] for job in ledger["running"].values())
+        free_memory = self.memory_mb - sum(job["memory_mb"] for job in ledger["running"].values())
+        queue = sorted(ledger["waiting"].items(), key=lambda item: (-item[1]["priority"], item[1]["enqueued"]))
+        for waiting_id, job in queue:
+            if waiting_id == job_id:
+                if job["cpu"] <= free_cpu and job["memory_mb"] <= free_memory:
+                    ledger["running"][job_id] = dict(job, started=time.time())
+                    del ledger["waiting"][job_id]
+                    return True
+                return False
+            # Öndeki işlerin payı ayrılır; büyük işler küçüklerin arkasında aç kalmaz
+            free_cpu -= job["cpu"]
+            free_memory -= job["memory_mb"]
+        return False
+
+    @contextmanager
+    def admit(self, tool, input_size=0, page_count=None, priority=None):
+        """
+        İş bütçeye kabul edilene kadar bekler
+
+        Args:
+            tool: Araç adı (gs, qpdf, pandoc, race)
+            input_size: Girdi boyutu (bayt)
+            page_count: Sayfa sayısı (bilinmiyorsa None)
+            priority: Öncelik (büyük önce; None ise NOVAPDF_PRIORITY)
+
+        Yields:
+            Slot
+        """
+        cost = estimate_cost(tool, input_size, page_count)
+        job = {
+            "pid": os.getpid(),
+            "tool": tool,
+            "priority": default_priority() if priority is None else priority,
+            "enqueued": time.time(),
+            # Bütçeden büyük işler bütçeye kırpılır, yalnız başına çalışabilsin
+            "cpu": min(cost["cpu"], self.cpus),
+            "memory_mb": min(cost["memory_mb"], self.memory_mb)
+        }
+        job_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        start = time.perf_counter()
+        interval = POLL_INTERVAL
+        try:
+            with metrics.stage("queue_wait"):
+                with self._ledger() as ledger:
+                    ledger["waiting"][job_id] = job
+                    started = self._try_start(ledger, job_id)
+                while not started:
+                    time.sleep(interval)
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
+                    with self._ledger() as ledger:
+                        started = self._try_start(ledger, job_id)
+            yield Slot(tool, cost, time.perf_counter() - start)
+        finally:
+            with self._ledger() as ledger:
+                ledger["running"].pop(job_id, None)
+                ledger["waiting"].pop(job_id, None)
+
+    def status(self):
+        """Bütçeleri, çalışan ve bekleyen işleri döndürür"""
+        with self._ledger() as ledger:
+            return {
+                "cpus": self.cpus,
+                "memory_mb": self.memory_mb,
+                "running": list(ledger["running"].values()),
+                "waiting": list(ledger["waiting"].values())
+            }
+
+
+def scheduler_enabled():
+    return os.environ.get("NOVAPDF_SCHEDULER", "1") != "0"
+
+
+@contextmanager
+def admit(tool, input_size=0, page_count=None, priority=None):
+    """
+    Ortak zamanlayıcı üzerinden iş kabulü; zamanlayıcı kapalıysa veya kayıt
+    defteri kullanılamıyorsa iş beklemeden, yalnızca sınırlarla çalışır
+    """
+    scheduler = None
+    if scheduler_enabled():
+        try:
+            scheduler = ToolScheduler()
+        except OSError as e:
+            print(f"Zamanlayıcı kullanılamıyor: {e}", file=sys.stderr)
+    if scheduler is None:
+        yield Slot(tool, estimate_cost(tool, input_size, page_count), 0.0)
+        return
+    with scheduler.admit(tool, input_size, page_count, priority) as slot:
+        yield slot
+
+
+def main():
+    if "--status" in sys.argv[1:]:
+        print(json.dumps(ToolScheduler().status(), indent=2))
+    else:
+        print("Kullanım: python3 tool_scheduler.py --status", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
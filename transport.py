@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ortak Girdi/Çıktı Taşıma Katmanı
+Sıkıştırma ve dönüştürme betiklerinin belgeyi nasıl alıp nasıl döndüreceğini belirler.
+Belgeyi base64 olarak argv içinde taşımak büyük dosyalarda çekirdeğin argüman
+boyutu sınırına takılır ve belleğin birkaç kopyasını aynı anda tutar; bu modül
+ham bayt ve dosya yolu tabanlı alternatifler sunar.
+
+Girdi modları:
+    (varsayılan)        Belge base64 olarak ilk argümanda (geriye dönük uyumluluk)
+    --stdin             Ham belge baytları stdin'den okunur
+    --input YOL         Belge dosyadan mmap ile okunur
+
+Çıktı modları:
+    (varsayılan)        Sonuç JSON, belge base64 olarak JSON içinde
+    --output YOL        Belge dosyaya yazılır, JSON içinde "output_path" döner
+    --binary-stdout     Önce tek satırlık JSON başlık ("payload_size" içerir),
+                        ardından ham belge baytları stdout'a yazılır
+
+Ölçümler:
+    --metrics           Aşama süreleri, bayt sayıları ve en yüksek RSS sonuç
+                        JSON'una "metrics" anahtarıyla eklenir (bkz. metrics.py)
+
+İlerleme:
+    --progress          Uzun gs/qpdf işlerinde sonuçtan önce stdout'a
+                        {"event": "progress", ...} satırları yazılır (bkz. progress.py);
+                        sonuç her zaman "event" anahtarı olmayan son JSON satırıdır
+"""
+
+import sys
+import os
+import mmap
+import json
+import base64
+import shutil
+import argparse
+
+import metrics
+
+# Dosyaları stdout'a aktarırken kullanılan parça boyutu
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class Transport:
+    """
+    Komut satırı argümanlarından taşıma modunu çözümler.
+    Taşıma bayrakları dışındaki argümanlar sırasıyla `args` içinde kalır.
+    """
+
+    def __init__(self, argv=None):
+        argv = list(sys.argv[1:] if argv is None else argv)
+
+        self.input_path = None
+        self.output_path = None
+        self.use_stdin = False
+        self.binary_stdout = False
+        self.progress = False
+        self.args = []
+        self.metrics = metrics.current()
+
+        i = 0
+        while i < len(argv):
+            arg = argv[i]
+            if arg == "--stdin":
+                self.use_stdin = True
+            elif arg == "--binary-stdout":
+                self.binary_stdout = True
+            elif arg == "--metrics":
+                self.metrics.include = True
+            elif arg == "--progress":
+                self.progress = True
+            elif arg in ("--input", "--output"):
+                if i + 1 >= len(argv):
+                    raise ValueError(f"{arg} bir dosya yolu gerektirir")
+                if arg == "--input":
+                    self.input_path = argv[i + 1]
+                else:
+                    self.output_path = argv[i + 1]
+                i += 1
+            else:
+                self.args.append(arg)
+            i += 1
+
+        if self.use_stdin and self.input_path:
+            raise ValueError("--stdin ve --input birlikte kullanılamaz")
+        if self.binary_stdout and self.output_path:
+            raise ValueError("--binary-stdout ve --output birlikte kullanılamaz")
+
+        # Eski mod: ilk konumsal argüman base64 belge içeriğidir
+        self.legacy_input = not (self.use_stdin or self.input_path)
+        self._base64_data = None
+        if self.legacy_input and self.args:
+            self._base64_data = self.args.pop(0)
+
+        self._mmap = None
+        # Girdi dosyası araçlara doğrudan verilebildiğinden boyutu burada sayılır
+        if self.input_path and os.path.isfile(self.input_path):
+            self.metrics.add_bytes_in(os.path.getsize(self.input_path))
+        self._stdout = sys.stdout.buffer if hasattr(sys.stdout, "buffer") else None
+
+        # İkili çıktıda tanılama mesajları veri akışını bozmasın
+        if self.binary_stdout:
+            sys.stdout = sys.stderr
+
+    @property
+    def has_input(self):
+        """Girdi belgesinin sağlanıp sağlanmadığını döndürür"""
+        return not self.legacy_input or self._base64_data is not None
+
+    def read_input(self):
+        """
+        Girdi belgesini okur
+
+        Returns:
+            Bayt benzeri nesne (--input modunda kopyasız mmap, diğerlerinde bytes)
+        """
+        with self.metrics.stage("read_input"):
+            data = self._read_input()
+        if not self.input_path:
+            self.metrics.add_bytes_in(len(data))
+        return data
+
+    def _read_input(self):
+        if self.input_path:
+            if self._mmap is None:
+                with open(self.input_path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        return b""
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+        if self.use_stdin:
+            return sys.stdin.buffer.read()
+
+        if self._base64_data is None:
+            raise ValueError("Girdi belgesi verilmedi")
+        data = base64.b64decode(self._base64_data)
+        # base64 kopyasını bellekte tutma
+        self._base64_data = None
+        return data
+
+    def write_input_file(self, path):
+        """
+        Girdi belgesini dosyaya yazar (gs/qpdf gibi dosya isteyen araçlar için)
+
+        Args:
+            path: Yazılacak dosya yolu
+        """
+        data = self.read_input()
+        with self.metrics.stage("write_temp"), open(path, "wb") as f:
+            f.write(data)
+
+    def read_input_bytes(self):
+        """Girdi belgesini her zaman bytes olarak döndürür"""
+        data = self.read_input()
+        return data if isinstance(data, bytes) else bytes(data)
+
+    def progress_callback(self):
+        """--progress verilmişse ilerleme olaylarını yazan fonksiyonu, değilse None döndürür"""
+        return self.emit_event if self.progress else None
+
+    def emit_event(self, event):
+        """
+        Sonuçtan önce gelen bir olayı (ilerleme, hazır sayfa, ...) tek JSON
+        satırı olarak hemen yazar
+
+        Args:
+            event: Olay sözlüğü
+        """
+        self._write_line(json.dumps(event))
+
+    def emit(self, result, payload=None, payload_key="pdf_base64"):
+        """
+        Sonucu seçili çıktı moduna göre yazar
+
+        Args:
+            result: JSON olarak yazılacak sonuç sözlüğü
+            payload: Belge baytları (hata sonuçlarında None)
+            payload_key: Eski modda base64 belgenin JSON içindeki anahtarı
+        """
+        if payload is None:
+            self._write_header(result)
+            self.metrics.record(_status(result))
+            return
+
+        self.metrics.add_bytes_out(len(payload))
+        with self.metrics.stage("emit"):
+            self._emit_payload(result, payload, payload_key)
+        self.metrics.record(_status(result))
+
+    def _emit_payload(self, result, payload, payload_key):
+        if self.output_path:
+            with open(self.output_path, "wb") as f:
+                f.write(payload)
+            self._write_header(dict(result, output_path=self.output_path))
+        elif self.binary_stdout:
+            self._write_header(dict(result, payload_size=len(payload)))
+            self._stdout.write(payload)
+            self._stdout.flush()
+        else:
+            output = {payload_key: base64.b64encode(payload).decode('utf-8')}
+            output.update(result)
+            self._write_header(output)
+
+    def emit_file(self, result, path, payload_key="pdf_base64"):
+        """
+        Diskteki bir sonuç dosyasını belleğe tamamen almadan yazar
+
+        Args:
+            result: JSON olarak yazılacak sonuç sözlüğü
+            path: Sonuç belgesinin dosya yolu
+            payload_key: Eski modda base64 belgenin JSON içindeki anahtarı
+        """
+        self.metrics.add_bytes_out(os.path.getsize(path))
+        with self.metrics.stage("emit"):
+            self._emit_file(result, path, payload_key)
+        self.metrics.record(_status(result))
+
+    def _emit_file(self, result, path, payload_key):
+        if self.output_path:
+            if os.path.abspath(path) != os.path.abspath(self.output_path):
+                shutil.copyfile(path, self.output_path)
+            self._write_header(dict(result, output_path=self.output_path))
+        elif self.binary_stdout:
+            self._write_header(dict(result, payload_size=os.path.getsize(path)))
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self._stdout, COPY_CHUNK_SIZE)
+            self._stdout.flush()
+        else:
+            with open(path, "rb") as f:
+                payload = f.read()
+            self._emit_payload(result, payload, payload_key)
+
+    def _write_header(self, result):
+        self._write_line(json.dumps(self.metrics.attach(result)))
+
+    def _write_line(self, line):
+        if self.binary_stdout:
+            self._stdout.write(line.encode("utf-8") + b"\n")
+            self._stdout.flush()
+        else:
+            print(line, flush=True)
+
+    def close(self):
+        """
+        mmap ile açılmış girdiyi kapatır; sonuç yazılmadan kapanıyorsa
+        ölçümleri hata olarak kaydeder
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self.metrics.record("error")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """
+    Hatalı argümanda kullanım metnini yazıp 2 koduyla çıkmak yerine ValueError
+    fırlatan ayrıştırıcı; betikler hatayı diğer hatalar gibi JSON sonucu olarak yazar
+    """
+
+    def error(self, message):
+        raise ValueError(f"Geçersiz argüman: {message}")
+
+
+def _status(result):
+    """Sonuç sözlüğünden ölçüm durumunu çıkarır"""
+    if result.get("error") or result.get("success") is False:
+        return "error"
+    return "ok"
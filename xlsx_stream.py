@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Akış Tabanlı XLSX'ten PDF'e Dönüştürme
+Çalışma kitabı openpyxl'in salt okunur modunda açılır ve satırlar tek tek okunur;
+tüm kitap hiçbir zaman bellekte kurulmaz. Her çalışma sayfası kendi sayfa dizisine
+işlenir, bağımsız sayfalar ayrı işçi süreçlerinde paralel dönüştürülür ve sonuçlar
+sırasıyla birleştirilir (çıkış yolu verilirse birleştirilmiş PDF belleğe alınmadan
+dosyaya yazılır). Önizlemeler için satır/hücre sınırı uygulanabilir.
+
+Ortam değişkenleri:
+    NOVAPDF_XLSX_MAX_ROWS       Sayfa başına en fazla satır (varsayılan: sınırsız)
+    NOVAPDF_XLSX_MAX_CELLS      Sayfa başına en fazla hücre (varsayılan: sınırsız)
+"""
+
+import os
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import pandas as pd
+
+from pdf_fonts import font_family, pdf_text
+from pdf_spool import SegmentedPDF
+from table_layout import TableRenderer, SAMPLE_ROWS, PAGE_BOTTOM_MARGIN
+
+# Tabloya toplu yazılmadan önce biriktirilecek satır sayısı
+ROW_BATCH = 2000
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+
+def _env_limit(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def render_sheet(xlsx_path, sheet_index, output_path, title_size=14, max_rows=None, max_cells=None):
+    """
+    Tek bir çalışma sayfasını satır satır okuyarak PDF'e dönüştürür.
+    İlk satır başlık kabul edilir ve her sayfada tekrarlanır.
+
+    Args:
+        xlsx_path: XLSX dosya yolu
+        sheet_index: Çalışma sayfasının sırası
+        output_path: Sayfanın PDF çıktısının yazılacağı yol
+        title_size: Başlık font boyutu
+        max_rows: En fazla işlenecek satır (None: sınırsız)
+        max_cells: En fazla işlenecek hücre (None: sınırsız)
+
+    Returns:
+        İşlenen satır sayısı ve sınıra takılıp takılmadığı
+    """
+    workbook = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_index]
+
+        with SegmentedPDF() as document:
+            document.add_page()
+            family = font_family(document.pdf)
+            document.pdf.set_font(family, 'B', size=title_size)
+            document.pdf.cell(0, 10, pdf_text(document.pdf, f"Çalışma Sayfası: {sheet.title}"), ln=True)
+            document.pdf.ln(5)
+
+            renderer = None
+            batch = []
+            row_count = 0
+            cell_count = 0
+            truncated = False
+
+            def flush():
+                nonlocal renderer
+                if not batch:
+                    return
+                frame = pd.DataFrame(batch)
+                batch.clear()
+                if renderer is None:
+                    # İlk satır başlıktır; genişlikler ilk partiden örneklenir
+                    headers = ["" if value is None else value for value in frame.iloc[0]]
+                    frame = frame.iloc[1:]
+                    renderer = TableRenderer(document, headers, frame.head(SAMPLE_ROWS),
+                                             header_font_size=10)
+                    renderer.write_header()
+                renderer.write_frame(frame)
+
+            for row in sheet.iter_rows(values_only=True):
+                if (max_rows is not None and row_count >= max_rows) or \
+                        (max_cells is not None and cell_count + len(row) > max_cells):
+                    truncated = True
+                    break
+
+                batch.append(row)
+                row_count += 1
+                cell_count += len(row)
+                if len(batch) >= ROW_BATCH:
+                    flush()
+            flush()
+
+            if truncated:
+                document.pdf.set_font(family, size=10)
+                if document.pdf.get_y() + 15 > document.pdf.h - PAGE_BOTTOM_MARGIN:
+                    document.add_page()
+                document.pdf.ln(5)
+                document.pdf.cell(0, 10, pdf_text(document.pdf, f"... önizleme sınırı: ilk {row_count} satır gösteriliyor"), ln=True)
+
+            document.save(output_path)
+    finally:
+        # Salt okunur modda dosya tanıtıcısı açık kalır
+        workbook.close()
+
+    return {"rows": row_count, "truncated": truncated}
+
+
+def _render_sheet_job(job):
+    return render_sheet(*job)
+
+
+def _render_empty(output_path, title_size):
+    """Çalışma sayfası olmayan (ör. yalnızca grafik sayfalı) kitap için bilgi sayfası yazar"""
+    with SegmentedPDF() as document:
+        document.add_page()
+        document.pdf.set_font(font_family(document.pdf), 'B', size=title_size)
+        document.pdf.cell(0, 10, pdf_text(document.pdf, "Çalışma kitabında tablo içeren sayfa yok"), ln=True)
+        document.save(output_path)
+
+
+def stream_xlsx_to_pdf(input_data, title_size=14, max_rows=None, max_cells=None, workers=DEFAULT_WORKERS, stats=None,
+                       output_path=None):
+    """
+    XLSX içeriğini sayfa sayfa, gerekirse paralel olarak PDF'e dönüştürür
+
+    Args:
+        input_data (bytes): XLSX dosya içeriği
+        title_size: Sayfa başlıklarının font boyutu
+        max_rows: Çalışma sayfası başına satır sınırı (None: ortam değişkeni veya sınırsız)
+        max_cells: Çalışma sayfası başına hücre sınırı (None: ortam değişkeni veya sınırsız)
+        workers: En fazla paralel işçi süreç sayısı
+        stats: Verilirse sayfa bazında satır sayıları ve sınır bilgisiyle doldurulur
+        output_path: Verilirse PDF belleğe alınmadan bu dosyaya yazılır
+
+    Returns:
+        bytes: PDF içeriği (output_path verildiyse None)
+    """
+    if max_rows is None:
+        max_rows = _env_limit("NOVAPDF_XLSX_MAX_ROWS")
+    if max_cells is None:
+        max_cells = _env_limit("NOVAPDF_XLSX_MAX_CELLS")
+
+    work_dir = tempfile.mkdtemp(prefix="xlsx_stream_")
+    try:
+        xlsx_path = os.path.join(work_dir, "input.xlsx")
+        with open(xlsx_path, "wb") as f:
+            f.write(input_data)
+
+        workbook = openpyxl.load_workbook(xlsx_path, read_only=True)
+        # sheetnames grafik sayfalarını da içerir; render_sheet worksheets sırasını kullanır
+        sheet_names = [sheet.title for sheet in workbook.worksheets]
+        workbook.close()
+
+        jobs = [
+            (xlsx_path, index, os.path.join(work_dir, f"sheet_{index:04d}.pdf"), title_size, max_rows, max_cells)
+            for index in range(len(sheet_names))
+        ]
+
+        # Süreç havuzu içinde (ör. converter_worker işçileri) alt süreç açılamaz
+        parallel = len(jobs) > 1 and workers > 1 and not multiprocessing.current_process().daemon
+        if parallel:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                results = list(executor.map(_render_sheet_job, jobs))
+        else:
+            results = [_render_sheet_job(job) for job in jobs]
+
+        if stats is not None:
+            stats["sheets"] = [
+                dict(result, name=name) for name, result in zip(sheet_names, results)
+            ]
+
+        merged_path = output_path or os.path.join(work_dir, "merged.pdf")
+        if not jobs:
+            _render_empty(merged_path, title_size)
+        elif len(jobs) == 1:
+            shutil.move(jobs[0][2], merged_path)
+        else:
+            import pymupdf
+
+            # Sayfaları özgün sırasıyla birleştir
+            with pymupdf.open() as merged:
+                for job in jobs:
+                    with pymupdf.open(job[2]) as sheet_pdf:
+                        merged.insert_pdf(sheet_pdf)
+                    os.unlink(job[2])
+                merged.save(merged_path, garbage=1, deflate=True)
+
+        if output_path:
+            return None
+        with open(merged_path, "rb") as f:
+            return f.read()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)